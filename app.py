@@ -25,6 +25,7 @@ from pages.ipi import render_ipi
 from pages.macro_pbi_emae import render_macro_pbi_emae
 from pages.comex import render_comex
 from pages.morosidad import render_morosidad
+from pages.comovimiento import render_comovimiento
 
 # ----------------------------
 # Warnings (limpia consola)
@@ -159,6 +160,11 @@ elif sec == "morosidad":
         go_to("home")
     render_morosidad(go_to)
 
+elif sec == "comovimiento":
+    if st.button("← Volver a secciones"):
+        go_to("home")
+    render_comovimiento(go_to)
+
 else:
     st.warning("Sección desconocida. Volviendo al inicio.")
     go_to("home")
@@ -4,8 +4,8 @@ import plotly.graph_objects as go
 import streamlit as st
 import streamlit.components.v1 as components
 
-from services.metrics import calc_var, fmt, obtener_nombre_mes
-from services.comex_data import fetch_ica
+from services.metrics import fmt, obtener_nombre_mes
+from services.comex_data import get_comex_metrics
 
 MESES_ES = ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"]
 
@@ -46,16 +46,10 @@ def _fmt_pct(x, dec=1):
         return "s/d"
     return f"{float(x):.{dec}f}%".replace(".", ",")
 
-def _calc_ytd_pct(df_, col):
-    if col not in df_.columns:
-        return np.nan
-    last = df_["fecha"].iloc[-1]
-    y, m = last.year, last.month
-    cur  = df_[(df_["fecha"].dt.year == y)   & (df_["fecha"].dt.month <= m)][col].sum()
-    prev = df_[(df_["fecha"].dt.year == y-1) & (df_["fecha"].dt.month <= m)][col].sum()
-    if prev == 0:
-        return np.nan
-    return (cur / prev - 1) * 100
+def _ult(m, col, metrica):
+    """Valor del último mes de una métrica (NaN si la columna no existe)."""
+    ult = m["ultimo"]
+    return ult.at[col, metrica] if col in ult.index else np.nan
 
 
 def _cx_card(title, tipo, yoy, ytd):
@@ -120,12 +114,12 @@ EVOL_SERIES = {
 }
 
 
-def _bar_fig(df, rows, mode, bar_color_pos, bar_color_neg):
+def _bar_fig(m, rows, mode, bar_color_pos, bar_color_neg):
     data = []
     for label, key, _ in rows:
-        if key not in df.columns:
+        if key not in m["ultimo"].index:
             continue
-        val = calc_var(df[key], 12) if mode == "anual" else _calc_ytd_pct(df, key)
+        val = _ult(m, key, "yoy" if mode == "anual" else "ytd")
         if val is None or np.isnan(val):
             continue
         data.append({"Rubro": label, "val": float(val)})
@@ -223,15 +217,14 @@ def render_comex(go_to):
 </style>""", unsafe_allow_html=True)
 
     with st.spinner("Cargando ICA (INDEC)..."):
-        df = fetch_ica()
+        m = get_comex_metrics()
 
-    if df is None or df.empty or "fecha" not in df.columns:
+    if not m:
         st.error("No se pudieron cargar los datos de ICA.")
         return
 
-    df = df.copy()
-    df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce")
-    df = df.dropna(subset=["fecha"]).sort_values("fecha")
+    df    = m["data"]
+    nivel = m["nivel"]
 
     ult_f   = df["fecha"].iloc[-1]
     mes_txt = obtener_nombre_mes(ult_f)
@@ -241,16 +234,12 @@ def render_comex(go_to):
     def _arrow(x):
         return "\u25b2" if (x is not None and not pd.isna(x) and x >= 0) else "\u25bc"
 
-    expo  = df.get("expo_total")
-    impo  = df.get("impo_total")
-    saldo = df.get("saldo")
-
-    expo_i   = calc_var(expo, 12)      if expo  is not None else np.nan
-    impo_i   = calc_var(impo, 12)      if impo  is not None else np.nan
-    saldo_di = saldo.diff(12).iloc[-1] if saldo is not None else np.nan
-    expo_last  = expo.iloc[-1]  if expo  is not None else np.nan
-    impo_last  = impo.iloc[-1]  if impo  is not None else np.nan
-    saldo_last = saldo.iloc[-1] if saldo is not None else np.nan
+    expo_i     = _ult(m, "expo_total", "yoy")
+    impo_i     = _ult(m, "impo_total", "yoy")
+    saldo_di   = _ult(m, "saldo", "dif_12")
+    expo_last  = _ult(m, "expo_total", "nivel")
+    impo_last  = _ult(m, "impo_total", "nivel")
+    saldo_last = _ult(m, "saldo", "nivel")
 
     st.markdown(
         f'<div class="com-wrap">'
@@ -344,8 +333,8 @@ def render_comex(go_to):
             if item is None:
                 continue
             label, key, tipo = item
-            yoy = calc_var(df[key], 12)
-            ytd = _calc_ytd_pct(df, key)
+            yoy = _ult(m, key, "yoy")
+            ytd = _ult(m, key, "ytd")
             cols[j].markdown(_cx_card(label, tipo, yoy, ytd), unsafe_allow_html=True)
 
     # ── Graficos paralelos ───────────────────────────────────
@@ -372,7 +361,7 @@ def render_comex(go_to):
     col_expo, col_impo = st.columns(2, gap="large")
     with col_expo:
         st.markdown('<div class="cx-chart-header cx-chart-header-expo"><div class="cx-chart-dot cx-chart-dot-expo"></div><span class="cx-chart-label cx-chart-label-expo">Exportaciones</span></div>', unsafe_allow_html=True)
-        fig_expo = _bar_fig(df, EXP_ROWS, mode, "rgba(37,99,235,0.65)", "rgba(37,99,235,0.35)")
+        fig_expo = _bar_fig(m, EXP_ROWS, mode, "rgba(37,99,235,0.65)", "rgba(37,99,235,0.35)")
         if fig_expo:
             st.plotly_chart(fig_expo, use_container_width=True, config={"displayModeBar":False,"scrollZoom":False,"doubleClick":False}, key="cx_chart_expo")
         else:
@@ -380,7 +369,7 @@ def render_comex(go_to):
 
     with col_impo:
         st.markdown('<div class="cx-chart-header cx-chart-header-impo"><div class="cx-chart-dot cx-chart-dot-impo"></div><span class="cx-chart-label cx-chart-label-impo">Importaciones</span></div>', unsafe_allow_html=True)
-        fig_impo = _bar_fig(df, IMP_ROWS, mode, "rgba(234,88,12,0.65)", "rgba(234,88,12,0.35)")
+        fig_impo = _bar_fig(m, IMP_ROWS, mode, "rgba(234,88,12,0.65)", "rgba(234,88,12,0.35)")
         if fig_impo:
             st.plotly_chart(fig_impo, use_container_width=True, config={"displayModeBar":False,"scrollZoom":False,"doubleClick":False}, key="cx_chart_impo")
         else:
@@ -417,7 +406,7 @@ def render_comex(go_to):
         format_func=fmt_mes_es, label_visibility="collapsed", key="cx_evol_range")
     evol_start_ts = pd.Timestamp(evol_start).to_period("M").to_timestamp()
     evol_end_ts   = pd.Timestamp(evol_end).to_period("M").to_timestamp()
-    df_evol = df[(df["fecha"] >= evol_start_ts) & (df["fecha"] <= evol_end_ts)].copy()
+    rango = (nivel.index >= evol_start_ts) & (nivel.index <= evol_end_ts)
 
     if not sel_rubros:
         st.warning("Seleccion\u00e1 al menos un rubro.")
@@ -427,49 +416,36 @@ def render_comex(go_to):
 
         for rubro in sel_rubros:
             col = avail_evol[rubro]
-            if col not in df_evol.columns:
+            if col not in nivel.columns:
                 continue
-            serie = df_evol[["fecha", col]].copy().sort_values("fecha")
-            serie[col] = pd.to_numeric(serie[col], errors="coerce")
             color = "#2563eb" if rubro.startswith("Expo") else "#ea580c"
 
             if evol_mode == "Nivel (millones USD)":
-                y_vals = serie[col]
+                y_vals = nivel.loc[rango, col]
                 ytitle = "Millones USD"
                 hover  = "%{y:,.0f} M USD"
             elif evol_mode == "Variaci\u00f3n interanual (%)":
-                full = df[["fecha", col]].copy().sort_values("fecha")
-                full[col] = pd.to_numeric(full[col], errors="coerce")
-                full["yoy"] = (full[col] / full[col].shift(12) - 1) * 100
-                merged = full[["fecha","yoy"]].merge(serie[["fecha"]], on="fecha", how="inner")
-                y_vals = merged["yoy"]
-                serie  = merged
+                y_vals = m["yoy"].loc[rango, col]
                 ytitle = "Variaci\u00f3n interanual (%)"
                 hover  = "%{y:.1f}%"
             else:
                 # Variación acumulada dinámica:
                 # base = valor del mes anterior al inicio del slider
                 # cada punto = (valor_mes / base_val - 1) * 100
-                full = df[["fecha", col]].copy().sort_values("fecha")
-                full[col] = pd.to_numeric(full[col], errors="coerce")
                 base_month = evol_start_ts - pd.DateOffset(months=1)
-                base_row   = full[full["fecha"] == base_month][col]
-                if base_row.empty or base_row.iloc[0] == 0 or pd.isna(base_row.iloc[0]):
-                    base_row = full[full["fecha"] == evol_start_ts][col]
-                base_val = float(base_row.iloc[0]) if not base_row.empty else np.nan
-                rng = full[(full["fecha"] >= evol_start_ts) & (full["fecha"] <= evol_end_ts)].copy()
+                base_val   = nivel[col].get(base_month, np.nan)
+                if base_val == 0 or pd.isna(base_val):
+                    base_val = nivel[col].get(evol_start_ts, np.nan)
                 if not pd.isna(base_val) and base_val != 0:
-                    rng["acum_pct"] = (rng[col] / base_val - 1) * 100
+                    y_vals = (nivel.loc[rango, col] / base_val - 1) * 100
                 else:
-                    rng["acum_pct"] = np.nan
-                serie  = rng[["fecha", "acum_pct"]].copy()
-                y_vals = serie["acum_pct"]
+                    y_vals = pd.Series(np.nan, index=nivel.index[rango])
                 base_lbl = f"{MESES_ES[base_month.month-1]}-{str(base_month.year)[-2:]}"
                 ytitle = f"Variaci\u00f3n vs {base_lbl} (%)"
                 hover  = "%{y:.1f}%"
 
             fig_evol.add_trace(go.Scatter(
-                x=serie["fecha"], y=y_vals, mode="lines+markers", name=rubro,
+                x=y_vals.index, y=y_vals, mode="lines+markers", name=rubro,
                 line=dict(color=color, width=2), marker=dict(size=4),
                 hovertemplate=f"{rubro}<br>{hover}<extra></extra>"))
 
@@ -0,0 +1,274 @@
+# pages/comovimiento.py
+import textwrap
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from services.comovement import GRUPOS, MAX_SERIES, MEDIDAS, get_comovement, load_group
+
+
+# ============================================================
+# Config
+# ============================================================
+VENTANAS = [12, 24, 36, 60]
+DEFAULT_GRUPOS = ["Empleo registrado SIPA (s.e.)", "Tipo de cambio"]
+DEFAULT_N_SERIES = 8
+MESES_ES = ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"]
+
+CORR_SCALE = [[0.0, "#b91c1c"], [0.5, "#f8fafc"], [1.0, "#1d4ed8"]]
+LAG_SCALE = [[0.0, "#7c3aed"], [0.5, "#f8fafc"], [1.0, "#0f766e"]]
+
+
+# ============================================================
+# Helpers
+# ============================================================
+def _month_label_es(dt: pd.Timestamp) -> str:
+    return f"{MESES_ES[dt.month - 1]}-{str(dt.year)[2:]}"
+
+
+def _short(name: str, n: int = 34) -> str:
+    return name if len(name) <= n else name[: n - 1] + "…"
+
+
+def _inject_css():
+    st.markdown(
+        textwrap.dedent(
+            """
+        <style>
+          .cm-title{
+            font-size: 23px;
+            font-weight: 900;
+            letter-spacing: -0.01em;
+            color: #14324f;
+            margin: 4px 0 10px 0;
+          }
+          .cm-sub{
+            font-size: 13px;
+            color: #2b4660;
+            margin-bottom: 14px;
+          }
+          .cm-label{
+            font-size: 13px;
+            font-weight: 800;
+            color: #14324f;
+            margin-bottom: 4px;
+          }
+          .cm-caption{
+            color: rgba(20,50,79,0.70);
+            font-size: 12px;
+          }
+        </style>
+        """
+        ),
+        unsafe_allow_html=True,
+    )
+
+
+def _fig_heatmap(z: np.ndarray, names: list, colorscale, zmin: float, zmax: float, text=None, hover: str = "") -> go.Figure:
+    labels = [_short(n) for n in names]
+    fig = go.Figure(
+        go.Heatmap(
+            z=z,
+            x=labels,
+            y=labels,
+            zmin=zmin,
+            zmax=zmax,
+            colorscale=colorscale,
+            text=text,
+            customdata=np.array(names, dtype=object)[None, :].repeat(len(names), axis=0),
+            hovertemplate=hover,
+        )
+    )
+    fig.update_layout(
+        height=160 + 24 * len(names),
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis=dict(tickangle=-40, tickfont=dict(size=10)),
+        yaxis=dict(autorange="reversed", tickfont=dict(size=10)),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        dragmode=False,
+    )
+    return fig
+
+
+def _pair_selector(names: list, key: str):
+    c1, c2 = st.columns(2, gap="large")
+    with c1:
+        st.markdown("<div class='cm-label'>Serie A</div>", unsafe_allow_html=True)
+        a = st.selectbox("", names, index=0, key=f"{key}_a", label_visibility="collapsed")
+    with c2:
+        st.markdown("<div class='cm-label'>Serie B</div>", unsafe_allow_html=True)
+        b = st.selectbox("", names, index=min(1, len(names) - 1), key=f"{key}_b", label_visibility="collapsed")
+    return names.index(a), names.index(b)
+
+
+# ============================================================
+# Main
+# ============================================================
+def render_comovimiento(go_to):
+    _inject_css()
+    st.markdown("<div class='cm-title'>🔗 Co-movimiento entre series</div>", unsafe_allow_html=True)
+    st.markdown(
+        "<div class='cm-sub'>Correlación móvil y adelantos / rezagos entre series mensuales del tablero "
+        "(IPI, EMAE, empleo SIPA y tipo de cambio).</div>",
+        unsafe_allow_html=True,
+    )
+
+    # =========================
+    # Selección de series
+    # =========================
+    c1, c2 = st.columns(2, gap="large")
+    with c1:
+        st.markdown("<div class='cm-label'>Seleccioná los grupos</div>", unsafe_allow_html=True)
+        grupos = st.multiselect(
+            "", list(GRUPOS), default=DEFAULT_GRUPOS, key="cm_grupos", label_visibility="collapsed"
+        )
+
+    with st.spinner("Cargando series..."):
+        frames = [load_group(g) for g in grupos]
+        disponibles = []
+        for w in frames:
+            disponibles += [c for c in w.columns if c not in disponibles]
+
+    with c2:
+        st.markdown(f"<div class='cm-label'>Seleccioná las series (máx. {MAX_SERIES})</div>", unsafe_allow_html=True)
+        # al cambiar de grupos se conservan las series que siguen disponibles
+        prev = [s for s in st.session_state.get("cm_series", []) if s in disponibles]
+        if prev:
+            st.session_state["cm_series"] = prev
+        else:
+            st.session_state.pop("cm_series", None)
+        series = st.multiselect(
+            "",
+            disponibles,
+            default=disponibles[:DEFAULT_N_SERIES] if "cm_series" not in st.session_state else None,
+            max_selections=MAX_SERIES,
+            key="cm_series",
+            label_visibility="collapsed",
+        )
+
+    c3, c4, c5 = st.columns(3, gap="large")
+    with c3:
+        st.markdown("<div class='cm-label'>Medida</div>", unsafe_allow_html=True)
+        medida = st.selectbox(
+            "", list(MEDIDAS), format_func=MEDIDAS.get, key="cm_medida", label_visibility="collapsed"
+        )
+    with c4:
+        st.markdown("<div class='cm-label'>Ventana (meses)</div>", unsafe_allow_html=True)
+        window = st.selectbox("", VENTANAS, index=1, key="cm_window", label_visibility="collapsed")
+    with c5:
+        st.markdown("<div class='cm-label'>Rezago máximo (meses)</div>", unsafe_allow_html=True)
+        max_lag = st.slider("", 0, 24, 12, key="cm_maxlag", label_visibility="collapsed")
+
+    if len(series) < 2:
+        st.info("Elegí al menos dos series para calcular el co-movimiento.")
+        return
+
+    with st.spinner("Calculando correlaciones..."):
+        res = get_comovement(frames, series, medida=medida, window=window, max_lag=max_lag)
+
+    if not res or len(res["names"]) < 2:
+        st.warning("Sin datos suficientes para las series elegidas.")
+        return
+
+    names = res["names"]
+    roll = res["roll"]
+    dates = res["dates"]
+
+    tab_roll, tab_lag = st.tabs(["🧭 Correlación móvil", "⏱️ Adelantos y rezagos"])
+
+    # =========================
+    # Correlación móvil
+    # =========================
+    with tab_roll:
+        ok_t = np.flatnonzero(np.isfinite(roll).any(axis=(1, 2)))
+        if ok_t.size == 0:
+            st.info(f"Ningún par tiene {window} meses completos en común.")
+        else:
+            opts = [dates[i] for i in ok_t]
+            st.markdown("<div class='cm-label'>Ventana que termina en</div>", unsafe_allow_html=True)
+            fin = st.select_slider(
+                "", options=opts, value=opts[-1], format_func=_month_label_es,
+                key="cm_fin", label_visibility="collapsed",
+            )
+            t = int(dates.get_loc(fin))
+            z = roll[t]
+            st.plotly_chart(
+                _fig_heatmap(
+                    z, names, CORR_SCALE, -1.0, 1.0,
+                    hover="%{customdata}<br>%{y}<br>r = %{z:.2f}<extra></extra>",
+                ),
+                use_container_width=True,
+                config={"displayModeBar": False},
+                key="cm_heat_roll",
+            )
+
+            i, j = _pair_selector(names, "cm_roll_pair")
+            fig = go.Figure(
+                go.Scatter(
+                    x=dates, y=roll[:, i, j], mode="lines", name="r",
+                    hovertemplate="%{x|%m/%Y}<br>r = %{y:.2f}<extra></extra>",
+                )
+            )
+            fig.add_hline(y=0, line_width=1, line_color="rgba(80,80,80,0.7)")
+            fig.update_layout(
+                height=380,
+                margin=dict(l=10, r=10, t=10, b=40),
+                yaxis=dict(range=[-1.05, 1.05]),
+                hovermode="x",
+                showlegend=False,
+                dragmode=False,
+            )
+            st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key="cm_line_roll")
+
+    # =========================
+    # Adelantos y rezagos
+    # =========================
+    with tab_lag:
+        lag, r = res["best_lag"], res["best_r"]
+        text = np.where(np.isfinite(r), np.vectorize(lambda v: f"{v:.2f}".replace(".", ","))(np.nan_to_num(r)), "")
+        st.plotly_chart(
+            _fig_heatmap(
+                lag, names, LAG_SCALE, -float(max(max_lag, 1)), float(max(max_lag, 1)), text=text,
+                hover="%{y} → %{customdata}<br>rezago: %{z} meses<br>r = %{text}<extra></extra>",
+            ),
+            use_container_width=True,
+            config={"displayModeBar": False},
+            key="cm_heat_lag",
+        )
+
+        i, j = _pair_selector(names, "cm_lag_pair")
+        prof = res["leadlag"][:, i, j]
+        fig = go.Figure(
+            go.Bar(
+                x=res["lags"], y=prof,
+                marker_color=np.where(np.nan_to_num(prof) >= 0, "#1d4ed8", "#b91c1c"),
+                hovertemplate="rezago %{x}<br>r = %{y:.2f}<extra></extra>",
+            )
+        )
+        fig.update_layout(
+            height=360,
+            margin=dict(l=10, r=10, t=10, b=40),
+            xaxis=dict(title="meses (> 0: A adelanta a B)", dtick=1 if max_lag <= 12 else 2),
+            yaxis=dict(range=[-1.05, 1.05]),
+            showlegend=False,
+            dragmode=False,
+        )
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key="cm_bar_lag")
+
+    export = pd.DataFrame(res["full"], index=names, columns=names)
+    st.download_button(
+        "⬇️ Descargar matriz (muestra completa)",
+        export.to_csv().encode("utf-8"),
+        file_name=f"comovimiento_{medida}.csv",
+        mime="text/csv",
+        key="cm_dl",
+    )
+    st.markdown(
+        "<div class='cm-caption'>Correlaciones por pares sobre meses con dato en ambas series. "
+        "Rezago k &gt; 0: la serie de la fila adelanta k meses a la de la columna. "
+        "Fuente: CEU-UIA en base a INDEC, BCRA, SIPA y Yahoo Finance.</div>",
+        unsafe_allow_html=True,
+    )
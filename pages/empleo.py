@@ -6,8 +6,8 @@ import plotly.graph_objects as go
 import streamlit as st
 import streamlit.components.v1 as components
 
-from services.metrics import calc_var, fmt, obtener_nombre_mes
-from services.sipa_data import cargar_sipa_excel
+from services.metrics import fmt, obtener_nombre_mes
+from services.sipa_data import get_sipa_kpis
 
 
 # ============================================================
@@ -51,44 +51,7 @@ def _arrow_cls(v):
     if v is None or (isinstance(v, float) and np.isnan(v)):
         return ("", "")
     return ("▲", "fx-up") if v >= 0 else ("▼", "fx-down")
-def _calc_yoy_by_date(fechas: pd.Series, serie: pd.Series) -> float:
-    df = pd.DataFrame({
-        "fecha": pd.to_datetime(fechas),
-        "valor": pd.to_numeric(serie, errors="coerce")
-    }).dropna().sort_values("fecha")
 
-    if df.empty:
-        return np.nan
-
-    fecha_actual = df["fecha"].iloc[-1]
-    fecha_prev   = fecha_actual - pd.DateOffset(years=1)
-
-    prev = df.loc[df["fecha"] == fecha_prev, "valor"]
-    if prev.empty or prev.iloc[0] == 0:
-        return np.nan
-
-    val_actual = df["valor"].iloc[-1]
-    return ((val_actual / prev.iloc[0]) - 1) * 100
-
-
-def _calc_yoy_diff_by_date(fechas: pd.Series, serie: pd.Series, scale: int = 1) -> float:
-    df = pd.DataFrame({
-        "fecha": pd.to_datetime(fechas),
-        "valor": pd.to_numeric(serie, errors="coerce")
-    }).dropna().sort_values("fecha")
-
-    if df.empty:
-        return np.nan
-
-    fecha_actual = df["fecha"].iloc[-1]
-    fecha_prev   = fecha_actual - pd.DateOffset(years=1)
-
-    prev = df.loc[df["fecha"] == fecha_prev, "valor"]
-    if prev.empty:
-        return np.nan
-
-    val_actual = df["valor"].iloc[-1]
-    return (val_actual - prev.iloc[0]) * scale
 
 # ============================================================
 # CSS
@@ -562,14 +525,13 @@ def render_empleo(go_to):
         go_to("home")
 
     with st.spinner("Cargando SIPA..."):
-        df_total, df_sec_orig, df_sec_sa, df_sub_orig, df_sub_sa = cargar_sipa_excel()
+        kpis = get_sipa_kpis()
 
-    if df_total.empty:
+    if not kpis:
         st.error("No se pudieron cargar los datos SIPA desde el Excel.")
         return
 
-    target_date = pd.Timestamp("2023-08-01")
-    ult_f       = df_total["fecha"].iloc[-1]
+    ult_f       = kpis["ultima_fecha"]
     mes_txt     = obtener_nombre_mes(ult_f)
     MESES_ES = {
     1: "ene", 2: "feb", 3: "mar", 4: "abr",
@@ -578,27 +540,8 @@ def render_empleo(go_to):
 }
 
     mes_label = f"{MESES_ES[ult_f.month]}-{str(ult_f.year)[-2:]}"
-
-    s_orig = df_total["orig"]
-    s_sa   = df_total["sa"]
-
-    try:
-        scale = 1000 if pd.to_numeric(s_sa.dropna()).median() < 1_000_000 else 1
-    except Exception:
-        scale = 1000
-
-    # ── KPIs totales ──
-    m_e  = calc_var(s_sa, 1)
-    m_p  = s_sa.diff().iloc[-1] * scale
-    i_e  = _calc_yoy_by_date(df_total["fecha"], s_orig)
-    i_p  = _calc_yoy_diff_by_date(df_total["fecha"], s_orig, scale=scale)
-
-    try:
-        val_23  = df_total.loc[df_total["fecha"] == target_date, "sa"].iloc[0]
-        v23_pct = ((s_sa.iloc[-1] / val_23) - 1) * 100 if val_23 != 0 else np.nan
-        v23_p   = (s_sa.iloc[-1] - val_23) * scale
-    except Exception:
-        v23_pct = v23_p = np.nan
+    scale     = kpis["scale"]
+    tot       = kpis["total"]
 
     INFORME_URL = "https://uia.org.ar/centro-de-estudios/documentos/actualidad-industrial/?q=Laborales"
 
@@ -609,8 +552,8 @@ def render_empleo(go_to):
         _apply_panel_wrap("emp_total_marker")
         _render_kpi_block(
             title="Empleo Privado Registrado", subtitle="Total", icon="💼",
-            mes_txt=mes_txt, m_e=m_e, m_p=m_p, i_e=i_e, i_p=i_p,
-            v23_pct=v23_pct, v23_p=v23_p, report_url=INFORME_URL,
+            mes_txt=mes_txt, m_e=tot["m_e"], m_p=tot["m_p"], i_e=tot["i_e"], i_p=tot["i_p"],
+            v23_pct=tot["v23_e"], v23_p=tot["v23_p"], report_url=INFORME_URL,
         )
 
     # =========================================================
@@ -618,62 +561,13 @@ def render_empleo(go_to):
     # =========================================================
     st.divider()
 
-    if df_sec_orig.empty or df_sec_sa.empty:
+    if not kpis["sectores_ok"]:
         st.warning("No se pudieron leer las hojas de sectores.")
         return
 
-    sectores = [c for c in df_sec_orig.columns if c != "fecha"]
-    tmp_sec  = (df_sec_orig
-                .merge(df_sec_sa, on="fecha", how="inner", suffixes=("_orig", "_sa"))
-                .sort_values("fecha"))
-
-    sector_rows = []
-    ind_data    = None
-
-    for sec in sectores:
-        # excluir filas de total que vienen en los datos
-        if "total" in sec.lower():
-            continue
-
-        col_o = f"{sec}_orig"
-        col_s = f"{sec}_sa"
-        if col_o not in tmp_sec.columns or col_s not in tmp_sec.columns:
-            continue
-
-        ss_orig = tmp_sec[col_o]
-        ss_sa   = tmp_sec[col_s]
-
-        if "industria" in sec.lower():
-            ind_data = {"orig": ss_orig, "sa": ss_sa, "name": sec, "tmp": tmp_sec}
-
-        abs_val = ss_orig.iloc[-1] * scale if not ss_orig.empty else np.nan
-
-        try:
-            v23_sec  = tmp_sec.loc[tmp_sec["fecha"] == target_date, col_s].iloc[0]
-            pct_23   = ((ss_sa.iloc[-1] / v23_sec) - 1) * 100 if v23_sec != 0 else np.nan
-            delta_23 = (ss_sa.iloc[-1] - v23_sec) * scale
-        except Exception:
-            pct_23 = delta_23 = np.nan
-
-        sector_rows.append({
-            "name":    sec,
-            "abs_val": abs_val,
-            "m_p":     ss_sa.diff().iloc[-1] * scale,
-            "m_e":     calc_var(ss_sa, 1),
-            "i_p":     _calc_yoy_diff_by_date(tmp_sec["fecha"], ss_orig, scale=scale),
-            "i_e":     _calc_yoy_by_date(tmp_sec["fecha"], ss_orig),
-            "v23_p":   delta_23,
-            "v23_e":   pct_23,
-        })
-
-    total_row = {
-        "name":    "Total Empleo Privado",
-        "abs_val": s_orig.iloc[-1] * scale,
-        "m_p": m_p,    "m_e": m_e,
-        "i_p": i_p,    "i_e": i_e,
-        "v23_p": v23_p, "v23_e": v23_pct,
-        "is_total": True,
-    }
+    sector_rows = kpis["sectores"]
+    ind         = kpis["industria"]
+    total_row   = {**tot, "is_total": True}
 
     with st.container():
         _apply_panel_wrap("emp_sec_marker")
@@ -703,8 +597,8 @@ def render_empleo(go_to):
 
     # ── Gráfico serie s.e. total empleo privado ──
     _render_empleo_chart(
-        serie=s_sa,
-        fechas=df_total["fecha"],
+        serie=kpis["total_sa"]["valor"],
+        fechas=kpis["total_sa"]["fecha"],
         titulo="Empleo privado registrado total (s.e.) — Asalariados",
         chart_key="chart_emp_total_sa",
         scale=scale,
@@ -715,31 +609,13 @@ def render_empleo(go_to):
     # =========================================================
     st.divider()
 
-    mi_e = mi_p = ii_e = ii_p = iv23_pct = iv23_p = np.nan
-
-    if ind_data is not None:
-        isa   = ind_data["sa"]
-        iorig = ind_data["orig"]
-        tmp2  = ind_data["tmp"]
-
-        mi_e = calc_var(isa, 1)
-        mi_p = isa.diff().iloc[-1] * scale
-        ii_e = _calc_yoy_by_date(tmp2["fecha"], iorig)
-        ii_p = _calc_yoy_diff_by_date(tmp2["fecha"], iorig, scale=scale)
-
-        try:
-            ival_23  = tmp2.loc[tmp2["fecha"] == target_date, ind_data["name"] + "_sa"].iloc[0]
-            iv23_pct = ((isa.iloc[-1] / ival_23) - 1) * 100 if ival_23 != 0 else np.nan
-            iv23_p   = (isa.iloc[-1] - ival_23) * scale
-        except Exception:
-            iv23_pct = iv23_p = np.nan
-
+    if ind is not None:
         with st.container():
             _apply_panel_wrap("emp_ind_marker")
             _render_kpi_block(
                 title="Empleo Industrial", subtitle="Industria manufacturera", icon="🏭",
-                mes_txt=mes_txt, m_e=mi_e, m_p=mi_p, i_e=ii_e, i_p=ii_p,
-                v23_pct=iv23_pct, v23_p=iv23_p, report_url=None,
+                mes_txt=mes_txt, m_e=ind["m_e"], m_p=ind["m_p"], i_e=ind["i_e"], i_p=ind["i_p"],
+                v23_pct=ind["v23_e"], v23_p=ind["v23_p"], report_url=None,
             )
 
     # =========================================================
@@ -747,59 +623,14 @@ def render_empleo(go_to):
     # =========================================================
     st.divider()
 
-    if df_sub_orig.empty or df_sub_sa.empty:
+    if not kpis["subsectores_ok"]:
         st.info("No se encontraron datos de subsectores industriales.")
         return
 
-    subs    = [c for c in df_sub_orig.columns if c != "fecha"]
-    tmp_sub = (df_sub_orig
-               .merge(df_sub_sa, on="fecha", how="inner", suffixes=("_orig", "_sa"))
-               .sort_values("fecha"))
-
-    sub_rows = []
-    for sb in subs:
-        # excluir filas de total que vienen en los datos
-        if "total" in sb.lower():
-            continue
-
-        col_o_s = f"{sb}_orig"
-        col_s_s = f"{sb}_sa"
-        if col_o_s not in tmp_sub.columns or col_s_s not in tmp_sub.columns:
-            continue
-
-        sbs_orig = tmp_sub[col_o_s]
-        sbs_sa   = tmp_sub[col_s_s]
-        abs_val  = sbs_orig.iloc[-1] * scale if not sbs_orig.empty else np.nan
-
-        try:
-            v23_sb  = tmp_sub.loc[tmp_sub["fecha"] == target_date, col_s_s].iloc[0]
-            p23_sb  = ((sbs_sa.iloc[-1] / v23_sb) - 1) * 100 if v23_sb != 0 else np.nan
-            d23_sb  = (sbs_sa.iloc[-1] - v23_sb) * scale
-        except Exception:
-            p23_sb = d23_sb = np.nan
-
-        sub_rows.append({
-            "name":    sb,
-            "abs_val": abs_val,
-            "m_p":     sbs_sa.diff().iloc[-1] * scale,
-            "m_e":     calc_var(sbs_sa, 1),
-            "i_p":     _calc_yoy_diff_by_date(tmp_sub["fecha"], sbs_orig, scale=scale),
-            "i_e":     _calc_yoy_by_date(tmp_sub["fecha"], sbs_orig),
-            "v23_p":   d23_sb,
-            "v23_e":   p23_sb,
-        })
-
     # fila total industria al pie
-    ind_total_rows = sub_rows.copy()
-    if ind_data is not None:
-        ind_total_rows.append({
-            "name":    "Total Industria",
-            "abs_val": ind_data["orig"].iloc[-1] * scale,
-            "m_p": mi_p, "m_e": mi_e,
-            "i_p": ii_p, "i_e": ii_e,
-            "v23_p": iv23_p, "v23_e": iv23_pct,
-            "is_total": True,
-        })
+    ind_total_rows = list(kpis["subsectores"])
+    if ind is not None:
+        ind_total_rows.append({**ind, "name": "Total Industria", "is_total": True})
 
     with st.container():
         _apply_panel_wrap("emp_sub_marker")
@@ -828,10 +659,10 @@ def render_empleo(go_to):
         )
 
     # ── Gráfico serie s.e. empleo industrial ──
-    if ind_data is not None:
+    if ind is not None:
         _render_empleo_chart(
-            serie=ind_data["sa"],
-            fechas=ind_data["tmp"]["fecha"],
+            serie=kpis["industria_sa"]["valor"],
+            fechas=kpis["industria_sa"]["fecha"],
             titulo="Empleo industrial (s.e.) — Asalariados",
             chart_key="chart_emp_ind_sa",
             scale=scale,
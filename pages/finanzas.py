@@ -7,16 +7,16 @@ import io
 import requests
 import streamlit.components.v1 as components
 
-from ui.common import safe_pct
+from ui.common import SERIES_COLORS, add_pyramid_trace, pyramid_note, safe_pct
 
 # ✅ services
 from services.market_data import get_ccl_ypf_df_fast
-
-# yfinance opcional (solo para ^MERV)
-try:
-    import yfinance as yf
-except Exception:
-    yf = None
+from services.quote_snapshot import fmt_snapshot_age, get_quote_snapshot_service
+from services.yahoo_scheduler import pick_close, yahoo_fetch
+from services.alignment import align_asof, series_from_df
+from services import pyramid as pm
+from services.dtypes import lean_frame
+from services.shared import shared_dataset
 
 
 # ============================================================
@@ -117,7 +117,8 @@ def _load_embi_long_from_bcra() -> pd.DataFrame:
 
     # ✅ pasar a puntos
     long["Value"] = long["Value"] * 100.0
-    return long.reset_index(drop=True)
+    # Value queda float64: llega al CSV de descarga
+    return lean_frame(long.reset_index(drop=True), "embi_long", category=["Serie"])
 
 
 @st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
@@ -145,79 +146,41 @@ def _load_riesgo_pais() -> pd.DataFrame:
 
 
 # ============================================================
-# MERVAL ARS (^MERV) desde Yahoo
+# Yahoo (vía scheduler batcheado) -> DataFrame Date, <value_col>
 # ============================================================
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
-def _load_merval_ars(start: str = "1990-01-01") -> pd.DataFrame:
-    if yf is None:
-        return pd.DataFrame(columns=["Date", "merval_ars"])
-
-    try:
-        dl = yf.download(
-            "^MERV",
-            start=start,
-            progress=False,
-            auto_adjust=False,
-            interval="1d",
-            group_by="column",
-            threads=True,
-        )
-    except Exception:
-        dl = None
-
-    if dl is None or getattr(dl, "empty", True):
+def _yahoo_close_df(
+    ticker: str,
+    start: str = "2000-01-01",
+    prefer_adj: bool = True,
+    value_col: str = "value",
+) -> pd.DataFrame:
+    """
+    Serie diaria 1-col desde Yahoo. Pide por start y, si viene vacío,
+    reintenta con period="max". Descargas batcheadas + backoff (services).
+    """
+    s = pd.Series(dtype="float64")
+    for kw in ({"start": start}, {"period": "max"}):
         try:
-            dl = yf.download(
-                "^MERV",
-                period="max",
-                progress=False,
-                auto_adjust=False,
-                interval="1d",
-                group_by="column",
-                threads=True,
-            )
+            data = yahoo_fetch([ticker], **kw)
         except Exception:
-            dl = None
+            continue
+        s = pick_close(data.get(ticker), prefer_adj=prefer_adj)
+        if not s.empty:
+            break
 
-    if dl is None or getattr(dl, "empty", True):
-        return pd.DataFrame(columns=["Date", "merval_ars"])
+    if s.empty:
+        return pd.DataFrame(columns=["Date", value_col])
 
-    s = None
-    if isinstance(dl, pd.DataFrame):
-        if isinstance(dl.columns, pd.MultiIndex):
-            if ("Close", "^MERV") in dl.columns:
-                s = dl[("Close", "^MERV")]
-            else:
-                if "Close" in dl.columns.get_level_values(0):
-                    tmp = dl.xs("Close", axis=1, level=0)
-                    if tmp.shape[1] == 1:
-                        s = tmp.iloc[:, 0]
-                    elif "^MERV" in tmp.columns:
-                        s = tmp["^MERV"]
-        else:
-            if "Close" in dl.columns:
-                s = dl["Close"]
+    out = s.rename(value_col).rename_axis("Date").reset_index()
+    return out.dropna(subset=["Date", value_col]).reset_index(drop=True)
 
-    if s is None:
-        return pd.DataFrame(columns=["Date", "merval_ars"])
 
-    s = pd.to_numeric(s, errors="coerce")
-    idx = pd.to_datetime(s.index, errors="coerce")
-    try:
-        idx = idx.tz_localize(None)
-    except Exception:
-        pass
-
-    out = pd.DataFrame({"Date": idx, "merval_ars": s.values})
-    out["Date"] = pd.to_datetime(out["Date"], errors="coerce").dt.normalize()
-    out["merval_ars"] = pd.to_numeric(out["merval_ars"], errors="coerce")
-    out = (
-        out.dropna(subset=["Date", "merval_ars"])
-        .drop_duplicates(subset=["Date"])
-        .sort_values("Date")
-        .reset_index(drop=True)
-    )
-    return out
+# ============================================================
+# MERVAL ARS (^MERV) desde Yahoo
+# ============================================================
+@shared_dataset("mercado", ttl=6 * 60 * 60)
+def _load_merval_ars(start: str = "1990-01-01") -> pd.DataFrame:
+    return _yahoo_close_df("^MERV", start=start, prefer_adj=False, value_col="merval_ars")
 
 
 # ============================================================
@@ -233,26 +196,13 @@ def _load_merval_usd() -> pd.DataFrame:
     if ccl is None or ccl.empty:
         return pd.DataFrame(columns=["Date", "value", "merval_ars", "ccl"])
 
-    ccl = ccl.copy()
-    ccl["Date"] = pd.to_datetime(ccl["Date"], errors="coerce").dt.normalize()
-    ccl["value"] = pd.to_numeric(ccl["value"], errors="coerce")
-    ccl = ccl.dropna(subset=["Date", "value"]).sort_values("Date").reset_index(drop=True)
-    ccl = ccl.rename(columns={"value": "ccl"})
-
-    left = merv.sort_values("Date").reset_index(drop=True)
-    right = ccl.sort_values("Date").reset_index(drop=True)
-
-    merged = pd.merge_asof(
-        left,
-        right,
-        on="Date",
+    # CCL as-of sobre fechas del Merval (tolerancia 15 días), una sola pasada
+    merged = align_asof(
+        {"merval_ars": series_from_df(merv, "merval_ars"), "ccl": series_from_df(ccl, "value")},
+        calendar="merval_ars",
         direction="backward",
-        tolerance=pd.Timedelta(days=15),
-    )
-
-    merged["merval_ars"] = pd.to_numeric(merged["merval_ars"], errors="coerce")
-    merged["ccl"] = pd.to_numeric(merged["ccl"], errors="coerce")
-    merged = merged.dropna(subset=["Date", "merval_ars", "ccl"]).sort_values("Date").reset_index(drop=True)
+        tolerance={"ccl": 15},
+    ).dropna(subset=["merval_ars", "ccl"])
 
     merged["value"] = (merged["merval_ars"] / merged["ccl"]).replace([np.inf, -np.inf], np.nan)
 
@@ -396,6 +346,7 @@ def render_finanzas(go_to=None):
     
     # ============================================================
     # VISOR DE PRECIOS (Yahoo) — estilo Bloomberg (1 fila, sin emojis)
+    # - Lee el snapshot de services/quote_snapshot (refresco en background)
     # - Loop perfecto (vuelve a ARS/USD)
     # - Sin flechas: variación diaria colorea (verde fuerte / rojo)
     # - ^TNX: solo nivel (ej 4,278%), sin variación
@@ -414,68 +365,14 @@ def render_finanzas(go_to=None):
             return "—"
         return _fmt_es_num(x, dec) + "%"
 
-    def _get_last_prev_close(df: pd.DataFrame) -> tuple[float | None, float | None]:
-        if df is None or df.empty:
-            return (None, None)
-
-        col = "Adj Close" if "Adj Close" in df.columns else ("Close" if "Close" in df.columns else None)
-        if col is None:
-            return (None, None)
-
-        s = pd.to_numeric(df[col], errors="coerce").dropna()
-        if s.empty:
-            return (None, None)
-        last = float(s.iloc[-1])
-        prev = float(s.iloc[-2]) if len(s) >= 2 else None
-        return (last, prev)
-
-    def _download_many(tickers: list[str]) -> dict[str, pd.DataFrame]:
-        if yf is None:
-            return {}
-        try:
-            dl = yf.download(
-                tickers=" ".join(tickers),
-                period="10d",
-                interval="1d",
-                auto_adjust=False,
-                progress=False,
-                group_by="ticker",
-                threads=True,
-            )
-        except Exception:
-            return {}
-
-        out: dict[str, pd.DataFrame] = {}
-        if dl is None or getattr(dl, "empty", True):
-            return out
-
-        # 1 ticker
-        if isinstance(dl, pd.DataFrame) and not isinstance(dl.columns, pd.MultiIndex):
-            out[tickers[0]] = dl.copy()
-            return out
-
-        # multi tickers
-        if isinstance(dl.columns, pd.MultiIndex):
-            levels0 = list(map(str, dl.columns.get_level_values(0).unique()))
-            if any(t in levels0 for t in tickers):
-                # (ticker, field)
-                for t in tickers:
-                    if t in dl.columns.get_level_values(0):
-                        out[t] = dl[t].copy()
-            else:
-                # (field, ticker)
-                for t in tickers:
-                    if t in dl.columns.get_level_values(1):
-                        out[t] = dl.xs(t, axis=1, level=1).copy()
-        return out
-
-    def _build_items_html_from_yahoo() -> str:
+    def _build_items_html_from_snapshot() -> str:
         """
-        Devuelve HTML con spans por item:
+        Devuelve HTML con spans por item (desde el snapshot en memoria, sin red):
         - label: bold
         - value: normal
         - chg: coloreado (verde/rojo) sin flechas
         - ^TNX: solo value en %
+        - al final: antigüedad del snapshot
         """
         cfg = [
             ("ARS/USD", "ARS=X", "fx_ars"),
@@ -492,13 +389,12 @@ def render_finanzas(go_to=None):
             ("Trigo", "ZW=F", "cmd"),
         ]
 
-        tickers = [t for _, t, _ in cfg]
-        data = _download_many(tickers)
+        tickers = tuple(t for _, t, _ in cfg)
+        quotes, age_sec = get_quote_snapshot_service(tickers).snapshot()
 
         parts: list[str] = []
         for label, tkr, kind in cfg:
-            df = data.get(tkr)
-            last, prev = _get_last_prev_close(df)
+            last, prev = quotes.get(tkr, (None, None))
 
             safe_label = _html.escape(label)
 
@@ -544,6 +440,10 @@ def render_finanzas(go_to=None):
                 f'</span>'
             )
 
+        parts.append(
+            f'<span class="bb-item"><span class="bb-age">Act. {_html.escape(fmt_snapshot_age(age_sec))}</span></span>'
+        )
+
         # Separador tipo terminal
         return '<span class="bb-sep">•</span>'.join(parts)
 
@@ -643,13 +543,18 @@ def render_finanzas(go_to=None):
   color: rgba(255,255,255,0.18);
   padding: 0 10px;
           }}
+
+          .bb-age {{
+  color: rgba(235,245,255,0.55);
+  font-size: 12px;
+  font-weight: 700;
+          }}
         </style>
         """
         components.html(html, height=height)
 
-    # ---- Construye desde Yahoo + render (loop perfecto) ----
-    with st.spinner("Cargando visor de precios..."):
-        items_html = _build_items_html_from_yahoo()
+    # ---- Construye desde el snapshot (background) + render (loop perfecto) ----
+    items_html = _build_items_html_from_snapshot()
     _render_ticker_tape_bloomberg(items_html, speed_sec=34, height=46)
 
     # Espaciado fino
@@ -852,29 +757,22 @@ def render_finanzas(go_to=None):
         hover_acum = "%{fullData.name}<br>%{y:.2f}%<extra></extra>"
         hover = hover_acum if embi_medida == "Variación acumulada" else hover_nivel
 
-        for s in embi_vars:
-            if s not in df_plot.columns:
-                continue
-            y = pd.to_numeric(df_plot[s], errors="coerce")
+        # pirámide por serie: el nivel (diario / semanal / mensual) depende del rango visible
+        pyrs = {s: pm.get_pyramid(series_from_df(df, s)) for s in embi_vars if s in df.columns}
+        level = pm.pick_level(pyrs.values(), start_d, end_d)
+
+        for i, (s, pyr) in enumerate(pyrs.items()):
+            v = pm.view(pyr, start_d, end_d, level)
 
             if embi_medida == "Variación acumulada":
-                base_series = y.dropna()
-                base = float(base_series.iloc[0]) if not base_series.empty else np.nan
-                y_plot = (y / base - 1) * 100
+                base = pm.first_value(pyr, start_d, end_d)
+                v[["value", "lo", "hi"]] = (v[["value", "lo", "hi"]] / base - 1) * 100
                 name = f"{s} (var. acum.)"
             else:
-                y_plot = y
                 name = s
 
-            fig.add_trace(
-                go.Scatter(
-                    x=df_plot["Date"],
-                    y=y_plot,
-                    name=name,
-                    mode="lines",
-                    connectgaps=True,
-                    hovertemplate=hover,
-                )
+            add_pyramid_trace(
+                fig, v, name, level, SERIES_COLORS[i % len(SERIES_COLORS)], hover, connectgaps=True
             )
 
         fig.update_layout(
@@ -894,6 +792,7 @@ def render_finanzas(go_to=None):
             use_container_width=True,
             config={"displayModeBar": False, "scrollZoom": False, "doubleClick": False},
         )
+        pyramid_note(level)
 
         export_cols = ["Date"] + [s for s in embi_vars if s in df_plot.columns]
         export = df_plot[export_cols].copy().rename(columns={"Date": "date"})
@@ -969,95 +868,9 @@ def render_finanzas(go_to=None):
         return _fmt_es_num(x, 0) if tkr == "__MERVUSD__" else _fmt_es_num(x, 2)
 
     # loader Yahoo 1-col (Close/Adj Close)
-    @st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
+    @shared_dataset("mercado", ttl=6 * 60 * 60)
     def _load_yahoo_series_1col(ticker: str, start: str = "2000-01-01") -> pd.DataFrame:
-        if yf is None:
-            return pd.DataFrame(columns=["Date", "value"])
-
-        try:
-            dl = yf.download(
-                ticker,
-                start=start,
-                progress=False,
-                auto_adjust=False,
-                interval="1d",
-                group_by="column",
-                threads=True,
-            )
-        except Exception:
-            dl = None
-
-        if dl is None or getattr(dl, "empty", True):
-            try:
-                dl = yf.download(
-                    ticker,
-                    period="max",
-                    progress=False,
-                    auto_adjust=False,
-                    interval="1d",
-                    group_by="column",
-                    threads=True,
-                )
-            except Exception:
-                dl = None
-
-        if dl is None or getattr(dl, "empty", True):
-            return pd.DataFrame(columns=["Date", "value"])
-
-        s = None
-
-        if isinstance(dl, pd.DataFrame) and not isinstance(dl.columns, pd.MultiIndex):
-            col = "Adj Close" if "Adj Close" in dl.columns else ("Close" if "Close" in dl.columns else None)
-            if col is None:
-                return pd.DataFrame(columns=["Date", "value"])
-            s = dl[col]
-        else:
-            # (field, ticker)
-            for field in ["Adj Close", "Close"]:
-                if field in dl.columns.get_level_values(0):
-                    tmp = dl.xs(field, axis=1, level=0)
-                    if isinstance(tmp, pd.DataFrame):
-                        if tmp.shape[1] == 1:
-                            s = tmp.iloc[:, 0]
-                        elif ticker in tmp.columns:
-                            s = tmp[ticker]
-                    else:
-                        s = tmp
-                    if s is not None:
-                        break
-            # (ticker, field)
-            if s is None:
-                for field in ["Adj Close", "Close"]:
-                    if ticker in dl.columns.get_level_values(0) and field in dl.columns.get_level_values(1):
-                        s = dl[(ticker, field)]
-                        break
-
-        if s is None:
-            return pd.DataFrame(columns=["Date", "value"])
-
-        if isinstance(s, pd.DataFrame):
-            if s.shape[1] == 1:
-                s = s.iloc[:, 0]
-            else:
-                return pd.DataFrame(columns=["Date", "value"])
-
-        s = pd.to_numeric(s, errors="coerce")
-        idx = pd.to_datetime(s.index, errors="coerce")
-        try:
-            idx = idx.tz_localize(None)
-        except Exception:
-            pass
-
-        out = pd.DataFrame({"Date": idx, "value": s.values})
-        out["Date"] = pd.to_datetime(out["Date"], errors="coerce").dt.normalize()
-        out["value"] = pd.to_numeric(out["value"], errors="coerce")
-        out = (
-            out.dropna(subset=["Date", "value"])
-            .drop_duplicates(subset=["Date"])
-            .sort_values("Date")
-            .reset_index(drop=True)
-        )
-        return out
+        return _yahoo_close_df(ticker, start=start, prefer_adj=True)
 
     def _asof_val_1col(df_: pd.DataFrame, target: pd.Timestamp):
         t = df_.dropna(subset=["Date", "value"]).sort_values("Date")
@@ -1213,19 +1026,20 @@ def render_finanzas(go_to=None):
 
         df_plot = s_sel[(s_sel["Date"] >= pd.Timestamp(start_d)) & (s_sel["Date"] <= pd.Timestamp(end_d))].copy()
 
-        # --- plot ---
+        # --- plot (pirámide: diario / semanal / mensual según el rango) ---
         fig = go.Figure()
-        y0 = pd.to_numeric(df_plot["value"], errors="coerce")
+        pyr = pm.get_pyramid(series_from_df(s_sel, "value"))
+        level = pm.pick_level(pyr, start_d, end_d)
+        v = pm.view(pyr, start_d, end_d, level)
 
         if m_medida == "Variación acumulada":
-            base_series = y0.dropna()
-            base = float(base_series.iloc[0]) if not base_series.empty else np.nan
-            y = (y0 / base - 1) * 100
-            fig.add_trace(go.Scatter(x=df_plot["Date"], y=y, mode="lines", name=f"{m_activo} (var. acum.)"))
+            base = pm.first_value(pyr, start_d, end_d)
+            v[["value", "lo", "hi"]] = (v[["value", "lo", "hi"]] / base - 1) * 100
+            add_pyramid_trace(fig, v, f"{m_activo} (var. acum.)", level, SERIES_COLORS[0], None)
             fig.add_hline(y=0, line_width=1, line_color="rgba(80,80,80,0.7)")
             fig.update_yaxes(ticksuffix="%")
         else:
-            fig.add_trace(go.Scatter(x=df_plot["Date"], y=y0, mode="lines", name=m_activo))
+            add_pyramid_trace(fig, v, m_activo, level, SERIES_COLORS[0], None)
 
         fig.update_layout(
             height=520,
@@ -1240,6 +1054,7 @@ def render_finanzas(go_to=None):
         fig.update_xaxes(range=[x_min, x_max + pd.Timedelta(days=10)])
 
         st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+        pyramid_note(level)
 
         # --- export ---
         export = df_plot.copy().rename(columns={"value": "usd"})
@@ -1310,105 +1125,9 @@ def render_finanzas(go_to=None):
                 return _fmt_es_num(x, 0)
             return _fmt_es_num(x, 2)
 
-        @st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
+        @shared_dataset("mercado", ttl=6 * 60 * 60)
         def _load_yahoo_series(ticker: str, start: str = "2000-01-01") -> pd.DataFrame:
-            if yf is None:
-                return pd.DataFrame(columns=["Date", "value"])
-
-            try:
-                dl = yf.download(
-                    ticker,
-                    start=start,
-                    progress=False,
-                    auto_adjust=False,
-                    interval="1d",
-                    group_by="column",
-                    threads=True,
-                )
-            except Exception:
-                dl = None
-
-            if dl is None or getattr(dl, "empty", True):
-                try:
-                    dl = yf.download(
-                        ticker,
-                        period="max",
-                        progress=False,
-                        auto_adjust=False,
-                        interval="1d",
-                        group_by="column",
-                        threads=True,
-                    )
-                except Exception:
-                    dl = None
-
-            if dl is None or getattr(dl, "empty", True):
-                return pd.DataFrame(columns=["Date", "value"])
-
-            # --- EXTRAER SERIE (Close / Adj Close) ROBUSTO ---
-            s = None
-
-            # Caso columnas simples
-            if isinstance(dl, pd.DataFrame) and not isinstance(dl.columns, pd.MultiIndex):
-                col = "Adj Close" if "Adj Close" in dl.columns else ("Close" if "Close" in dl.columns else None)
-                if col is None:
-                    return pd.DataFrame(columns=["Date", "value"])
-                s = dl[col]
-
-            # Caso columnas MultiIndex
-            else:
-                # (field, ticker)
-                for field in ["Adj Close", "Close"]:
-                    if field in dl.columns.get_level_values(0):
-                        tmp = dl.xs(field, axis=1, level=0)
-                        if isinstance(tmp, pd.DataFrame):
-                            if tmp.shape[1] == 1:
-                                s = tmp.iloc[:, 0]
-                            elif ticker in tmp.columns:
-                                s = tmp[ticker]
-                        else:
-                            s = tmp
-                        if s is not None:
-                            break
-
-                # (ticker, field)
-                if s is None:
-                    for field in ["Adj Close", "Close"]:
-                        if (
-                            ticker in dl.columns.get_level_values(0)
-                            and field in dl.columns.get_level_values(1)
-                        ):
-                            s = dl[(ticker, field)]
-                            break
-
-            if s is None:
-                return pd.DataFrame(columns=["Date", "value"])
-
-            # Asegurar 1D
-            if isinstance(s, pd.DataFrame):
-                if s.shape[1] == 1:
-                    s = s.iloc[:, 0]
-                else:
-                    return pd.DataFrame(columns=["Date", "value"])
-
-            s = pd.to_numeric(s, errors="coerce")
-
-            idx = pd.to_datetime(s.index, errors="coerce")
-            try:
-                idx = idx.tz_localize(None)
-            except Exception:
-                pass
-
-            out = pd.DataFrame({"Date": idx, "value": s.values})
-            out["Date"] = pd.to_datetime(out["Date"], errors="coerce").dt.normalize()
-            out["value"] = pd.to_numeric(out["value"], errors="coerce")
-            out = (
-                out.dropna(subset=["Date", "value"])
-                .drop_duplicates(subset=["Date"])
-                .sort_values("Date")
-                .reset_index(drop=True)
-            )
-            return out
+            return _yahoo_close_df(ticker, start=start, prefer_adj=True)
 
         def _asof_val_1col(df_: pd.DataFrame, target: pd.Timestamp):
             t = df_.dropna(subset=["Date", "value"]).sort_values("Date")
@@ -1556,35 +1275,22 @@ def render_finanzas(go_to=None):
 
             df_plot = s_intl[(s_intl["Date"] >= pd.Timestamp(start_d)) & (s_intl["Date"] <= pd.Timestamp(end_d))].copy()
 
-            # ---- Plot ----
+            # ---- Plot (pirámide: diario / semanal / mensual según el rango) ----
             fig = go.Figure()
-            y0 = pd.to_numeric(df_plot["value"], errors="coerce")
+            pyr = pm.get_pyramid(series_from_df(s_intl, "value"))
+            level = pm.pick_level(pyr, start_d, end_d)
+            v = pm.view(pyr, start_d, end_d, level)
 
             if intl_medida == "Variación acumulada":
-                base_series = y0.dropna()
-                base = float(base_series.iloc[0]) if not base_series.empty else np.nan
-                y = (y0 / base - 1) * 100
-                fig.add_trace(
-                    go.Scatter(
-                        x=df_plot["Date"],
-                        y=y,
-                        mode="lines",
-                        name=f"{intl_var} (var. acum.)",
-                        hovertemplate="%{y:.2f}%<extra></extra>",
-                    )
+                base = pm.first_value(pyr, start_d, end_d)
+                v[["value", "lo", "hi"]] = (v[["value", "lo", "hi"]] / base - 1) * 100
+                add_pyramid_trace(
+                    fig, v, f"{intl_var} (var. acum.)", level, SERIES_COLORS[0], "%{y:.2f}%<extra></extra>"
                 )
                 fig.add_hline(y=0, line_width=1, line_color="rgba(80,80,80,0.7)")
                 fig.update_yaxes(ticksuffix="%")
             else:
-                fig.add_trace(
-                    go.Scatter(
-                        x=df_plot["Date"],
-                        y=y0,
-                        mode="lines",
-                        name=intl_var,
-                        hovertemplate="%{y:.2f}<extra></extra>",
-                    )
-                )
+                add_pyramid_trace(fig, v, intl_var, level, SERIES_COLORS[0], "%{y:.2f}<extra></extra>")
 
             fig.update_layout(
                 height=520,
@@ -1599,6 +1305,7 @@ def render_finanzas(go_to=None):
             fig.update_xaxes(range=[x_min, x_max + pd.Timedelta(days=10)])
 
             st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+            pyramid_note(level)
 
             # ---- Export ----
             export = df_plot.copy()
@@ -464,6 +464,10 @@ def render_main_home(go_to):
         with col:
             st.link_button(label, url, use_container_width=True)
 
+    with r3[1]:
+        if st.button("🔗 Co-movimiento", use_container_width=True):
+            go_to("comovimiento")
+
 
    # LOGOS INSTITUCIONALES
     st.markdown(
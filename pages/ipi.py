@@ -9,7 +9,8 @@ import plotly.graph_objects as go
 import streamlit as st
 import streamlit.components.v1 as components
 
-from services.ipi_data import cargar_ipi_excel, procesar_serie_excel
+from services.ipi_data import cargar_ipi_excel, divisiones_cuadro5, procesar_serie_excel
+from services import transforms as tr
 
 
 # ============================================================
@@ -57,13 +58,13 @@ def _month_label_es(dt: pd.Timestamp) -> str:
 
 def _compute_yoy_df(df: pd.DataFrame) -> pd.DataFrame:
     t = df.dropna(subset=["Date", "Value"]).sort_values("Date").copy()
-    t["YoY"] = (t["Value"] / t["Value"].shift(12) - 1.0) * 100.0
+    t["YoY"] = tr.on_long(t, tr.yoy)  # rezago por calendario (huecos => NaN)
     return t
 
 
 def _compute_mom_df(df: pd.DataFrame) -> pd.DataFrame:
     t = df.dropna(subset=["Date", "Value"]).sort_values("Date").copy()
-    t["MoM"] = (t["Value"] / t["Value"].shift(1) - 1.0) * 100.0
+    t["MoM"] = tr.on_long(t, tr.mom)
     return t
 
 
@@ -83,13 +84,7 @@ def _rebase_100(df: pd.DataFrame, base_dt: pd.Timestamp) -> pd.DataFrame:
     t["Date"] = pd.to_datetime(t["Date"], errors="coerce")
     t["Value"] = pd.to_numeric(t["Value"], errors="coerce")
     t = t.dropna(subset=["Date", "Value"]).sort_values("Date").reset_index(drop=True)
-    base_val = t.loc[t["Date"] == base_dt, "Value"]
-    if base_val.empty:
-        return t
-    b = float(base_val.iloc[0])
-    if b == 0 or np.isnan(b):
-        return t
-    t["Value"] = (t["Value"] / b) * 100.0
+    t["Value"] = tr.on_long(t, tr.rebase, base=base_dt)  # sin dato en la base => sin cambios
     return t
 
 
@@ -584,6 +579,129 @@ def _apply_panel_wrap(marker_id: str):
     )
 
 
+# ============================================================
+# IPI por ramas — matrices de comparación A / B
+# - Se arman UNA vez por release del Excel (clave = hash de los cuadros).
+# - Por rama ("Total" = nivel general + divisiones; cada división = la
+#   división + sus subramas del Cuadro 2): matriz fecha x sector y sus
+#   promedios por año (ene..último mes y año completo).
+# - El panel solo indexa filas: A = M.loc[a], B = M.loc[b].
+# ============================================================
+def _serie_excel(df: pd.DataFrame, col_idx: int) -> pd.DataFrame:
+    """Columna del Excel -> Date/Value limpio, rebasado a BASE_DT."""
+    raw = procesar_serie_excel(df, col_idx)
+    return _rebase_100(_clean_series(raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
+
+
+def _excel_layout(df_c2: pd.DataFrame, df_c5: pd.DataFrame) -> dict:
+    names_c5 = [str(x).strip() for x in df_c5.iloc[3].fillna("").tolist()]
+    codes_c2 = [str(x).strip() for x in df_c2.iloc[2].fillna("").tolist()]
+    header_idxs_c2, code_to_header_idx_c2 = _build_div_blocks(codes_c2)
+    return {
+        "names_c2": [str(x).strip() for x in df_c2.iloc[3].fillna("").tolist()],
+        "codes_c2": codes_c2,
+        "names_c5": names_c5,
+        "codes_c5": [str(x).strip() for x in df_c5.iloc[2].fillna("").tolist()],
+        "header_idxs_c2": header_idxs_c2,
+        "code_to_header_idx_c2": code_to_header_idx_c2,
+        "divs_idxs": [i for i, _ in divisiones_cuadro5(df_c5)],
+    }
+
+
+def _division_series(df_c2: pd.DataFrame, df_c5: pd.DataFrame, lay: dict) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """{nombre: (original, s.e.)} para el nivel general y cada división."""
+    series = {"IPI - Nivel general": (_serie_excel(df_c2, 3), _serie_excel(df_c5, 3))}
+    for idx in lay["divs_idxs"]:
+        header_idx = lay["code_to_header_idx_c2"].get(lay["codes_c5"][idx], None)
+        s_o = _serie_excel(df_c2, int(header_idx)) if header_idx is not None else pd.DataFrame(columns=["Date", "Value"])
+        series[lay["names_c5"][idx]] = (s_o, _serie_excel(df_c5, idx))
+    return series
+
+
+def _ipi_version(df_c2: pd.DataFrame, df_c5: pd.DataFrame) -> str:
+    """Versión del release = hash del contenido de ambos cuadros."""
+    h = [int(pd.util.hash_pandas_object(d.astype(str), index=False).sum()) for d in (df_c2, df_c5)]
+    return f"ipi:{df_c2.shape}:{df_c5.shape}:{h[0]}:{h[1]}"
+
+
+def _wide_by_sector(parts: List[Tuple[str, pd.DataFrame]]) -> pd.DataFrame:
+    """[(sector, Date/Value)] -> fecha x sector (columnas ordenadas; nombres repetidos => promedio)."""
+    rows = [df.assign(Sector=name) for name, df in parts if df is not None and not df.empty]
+    if not rows:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+    long_df = pd.concat(rows, ignore_index=True)
+    w = long_df.pivot_table(index="Date", columns="Sector", values="Value", aggfunc="mean")
+    w.columns.name = None
+    return w.sort_index().sort_index(axis=1)
+
+
+def _rama_matrices(w_o: pd.DataFrame, w_s: pd.DataFrame, last_month: int, years_all: List[int]) -> dict:
+    yr = w_o.index.year
+    counts = w_o.notna().groupby(yr).sum().replace(0, np.nan)
+    # año cerrado = 12 meses para todas las series con datos ese año
+    cerrados = sorted([int(y) for y, m in counts.min(axis=1).items() if m == 12], reverse=True)
+    mes_dates = w_o.index[(w_o.index.month == last_month) & yr.isin(years_all)]
+    return {
+        "mes": w_o,
+        "acum": w_o[w_o.index.month <= last_month].groupby(yr[w_o.index.month <= last_month]).mean(),
+        "cerrado": w_o.groupby(yr).mean(),
+        "cerrados": cerrados,
+        "mes_dates": sorted(mes_dates, reverse=True),
+        "se": w_s,
+        "se_dates": sorted(w_s.index, reverse=True),
+    }
+
+
+@st.cache_data(ttl=3600, max_entries=4, show_spinner=False)
+def _build_ramas_cube(version: str, _df_c2: pd.DataFrame, _df_c5: pd.DataFrame) -> dict:
+    lay = _excel_layout(_df_c2, _df_c5)
+    series = _division_series(_df_c2, _df_c5, lay)
+
+    w_o = _wide_by_sector([(k, o) for k, (o, _) in series.items()])
+    w_s = _wide_by_sector([(k, s) for k, (_, s) in series.items()])
+    if w_o.empty and w_s.empty:
+        return {}
+
+    max_dt = max(w.index.max() for w in (w_o, w_s) if not w.empty)
+    last_month = int(max_dt.month)
+    years_all = sorted(set(w_o.index.year.tolist()), reverse=True)
+
+    ramas = {"Total": _rama_matrices(w_o, w_s, last_month, years_all)}
+    empty_s = pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))  # subramas no tienen s.e.
+    for idx in lay["divs_idxs"]:
+        name = lay["names_c5"][idx]
+        if name in ramas:
+            continue
+        header_idx = lay["code_to_header_idx_c2"].get(lay["codes_c5"][idx], None)
+        parts = []
+        if header_idx is not None:
+            parts.append((name, _serie_excel(_df_c2, int(header_idx))))
+            for k in _subcol_range_for_header(header_idx, lay["header_idxs_c2"], len(lay["codes_c2"])):
+                nm = lay["names_c2"][k]
+                if nm in ("", "Período", "IPI Manufacturero"):
+                    continue
+                parts.append((nm, _serie_excel(_df_c2, k)))
+        ramas[name] = _rama_matrices(_wide_by_sector(parts), empty_s, last_month, years_all)
+
+    return {
+        "last_month": last_month,
+        "years_all": years_all,
+        "ramas": ramas,
+    }
+
+
+def _ab_table(m: pd.DataFrame, a, b) -> pd.DataFrame:
+    """Sector, A, B, pct = (A/B - 1) * 100 (A y B > 0), ordenado desc."""
+    nan = pd.Series(np.nan, index=m.columns)
+    A = m.loc[a] if a in m.index else nan
+    B = m.loc[b] if b in m.index else nan
+    common = pd.DataFrame({"A": A, "B": B}).dropna()
+    common = common[(common["A"] > 0) & (common["B"] > 0)]
+    common["pct"] = (common["A"] / common["B"] - 1.0) * 100.0
+    common = common.rename_axis("Sector").reset_index()
+    return common.sort_values("pct", ascending=False).reset_index(drop=True)
+
+
 # ============================================================
 # Main
 # ============================================================
@@ -605,18 +723,17 @@ def render_ipi(go_to):
         st.error("No pude cargar el Excel del IPI Manufacturero (INDEC).")
         return
 
-    names_c2 = [str(x).strip() for x in df_c2.iloc[3].fillna("").tolist()]
-    codes_c2 = [str(x).strip() for x in df_c2.iloc[2].fillna("").tolist()]
-    names_c5 = [str(x).strip() for x in df_c5.iloc[3].fillna("").tolist()]
-    codes_c5 = [str(x).strip() for x in df_c5.iloc[2].fillna("").tolist()]
-
-    header_idxs_c2, code_to_header_idx_c2 = _build_div_blocks(codes_c2)
+    lay = _excel_layout(df_c2, df_c5)
+    names_c2 = lay["names_c2"]
+    codes_c2 = lay["codes_c2"]
+    names_c5 = lay["names_c5"]
+    codes_c5 = lay["codes_c5"]
+    header_idxs_c2 = lay["header_idxs_c2"]
+    code_to_header_idx_c2 = lay["code_to_header_idx_c2"]
+    divs_idxs = lay["divs_idxs"]
 
-    ng_se_raw = procesar_serie_excel(df_c5, 3)
-    ng_orig_raw = procesar_serie_excel(df_c2, 3)
-
-    df_ng_se = _rebase_100(_clean_series(ng_se_raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
-    df_ng_o  = _rebase_100(_clean_series(ng_orig_raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
+    SERIES: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = _division_series(df_c2, df_c5, lay)
+    df_ng_o, df_ng_se = SERIES["IPI - Nivel general"]
 
     if df_ng_se.empty or df_ng_o.empty:
         st.error("No pude extraer la serie de IPI (nivel general) desde el Excel.")
@@ -631,31 +748,6 @@ def render_ipi(go_to):
     mom_val = mom_full["MoM"].dropna().iloc[-1] if mom_full["MoM"].notna().any() else None
     mom_date = mom_full.dropna(subset=["MoM"]).iloc[-1]["Date"] if mom_full["MoM"].notna().any() else None
 
-    divs_idxs = [
-        i for i, n in enumerate(names_c5)
-        if i >= 3 and i % 2 != 0 and n not in ("", "Período", "IPI Manufacturero")
-    ]
-
-    SERIES: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {
-        "IPI - Nivel general": (df_ng_o, df_ng_se),
-    }
-
-    for idx in divs_idxs:
-        div_name = names_c5[idx]
-        div_code = str(codes_c5[idx]).strip()
-
-        s_se_raw = procesar_serie_excel(df_c5, idx)
-        s_se = _rebase_100(_clean_series(s_se_raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
-
-        header_idx = code_to_header_idx_c2.get(div_code, None)
-        if header_idx is not None:
-            s_o_raw = procesar_serie_excel(df_c2, int(header_idx))
-            s_o = _rebase_100(_clean_series(s_o_raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
-        else:
-            s_o = pd.DataFrame(columns=["Date", "Value"])
-
-        SERIES[div_name] = (s_o, s_se)
-
     # =========================================================
     # BLOQUE 1 — IPI
     # =========================================================
@@ -877,34 +969,16 @@ def render_ipi(go_to):
 
         st.markdown("<div class='fx-panel-gap'></div>", unsafe_allow_html=True)
 
-        rows_o = []
-        rows_s = []
-
-        for vname, (df_o, df_s) in SERIES.items():
-            if df_o is not None and not df_o.empty:
-                tmp = df_o.copy()
-                tmp["Sector"] = vname
-                rows_o.append(tmp)
-            if df_s is not None and not df_s.empty:
-                tmp = df_s.copy()
-                tmp["Sector"] = vname
-                rows_s.append(tmp)
-
-        df_o_long = pd.concat(rows_o, ignore_index=True) if rows_o else pd.DataFrame(columns=["Date", "Value", "Sector"])
-        df_s_long = pd.concat(rows_s, ignore_index=True) if rows_s else pd.DataFrame(columns=["Date", "Value", "Sector"])
+        cube = _build_ramas_cube(_ipi_version(df_c2, df_c5), df_c2, df_c5)
 
-        if df_o_long.empty and df_s_long.empty:
+        if not cube:
             st.error("No hay datos suficientes para construir la apertura por ramas.")
             return
 
-        max_dt_o = pd.to_datetime(df_o_long["Date"].max()) if not df_o_long.empty else None
-        max_dt_s = pd.to_datetime(df_s_long["Date"].max()) if not df_s_long.empty else None
-        max_dt = max([d for d in [max_dt_o, max_dt_s] if d is not None])
-
-        last_month_num = int(max_dt.month)
+        last_month_num = cube["last_month"]
         last_month_label = MESES_ES[last_month_num - 1]
 
-        years_all = sorted(pd.to_datetime(df_o_long["Date"]).dt.year.unique().tolist(), reverse=True) if not df_o_long.empty else []
+        years_all = cube["years_all"]
 
         def _month_opt_label(dt: pd.Timestamp) -> str:
             return _month_label_es(pd.to_datetime(dt))
@@ -955,45 +1029,8 @@ def render_ipi(go_to):
             )
             rama_sel = st.session_state.get("ipi_sec_rama_sel", "Total")
 
-        # ── Armar df_o_long y df_s_long filtrados según rama_sel ──
-        if rama_sel == "Total":
-            df_o_plot = df_o_long.copy()
-            df_s_plot = df_s_long.copy()
-        else:
-            # Buscar el header_idx de la rama seleccionada en Cuadro 2
-            rama_code = None
-            for i in divs_idxs:
-                if names_c5[i] == rama_sel:
-                    rama_code = str(codes_c5[i]).strip()
-                    break
-
-            rama_header_idx = code_to_header_idx_c2.get(rama_code, None) if rama_code else None
-
-            # Construir df_o_plot con: la rama total + sus subramas (Cuadro 2)
-            rows_rama = []
-            if rama_header_idx is not None:
-                # La rama total
-                s_rama_o_raw = procesar_serie_excel(df_c2, int(rama_header_idx))
-                s_rama_o = _rebase_100(_clean_series(s_rama_o_raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
-                if s_rama_o is not None and not s_rama_o.empty:
-                    s_rama_o["Sector"] = rama_sel
-                    rows_rama.append(s_rama_o)
-
-                # Sus subramas
-                subcols = list(_subcol_range_for_header(rama_header_idx, header_idxs_c2, len(codes_c2)))
-                for k in subcols:
-                    nm = str(names_c2[k]).strip()
-                    if nm in ("", "Período", "IPI Manufacturero"):
-                        continue
-                    s_sub_raw = procesar_serie_excel(df_c2, k)
-                    s_sub = _rebase_100(_clean_series(s_sub_raw.rename(columns={"fecha": "Date", "valor": "Value"})), BASE_DT)
-                    if s_sub is None or s_sub.empty:
-                        continue
-                    s_sub["Sector"] = nm
-                    rows_rama.append(s_sub)
-
-            df_o_plot = pd.concat(rows_rama, ignore_index=True) if rows_rama else pd.DataFrame(columns=["Date", "Value", "Sector"])
-            df_s_plot = pd.DataFrame(columns=["Date", "Value", "Sector"])  # subramas no tienen s.e.
+        # ── Matrices de la rama seleccionada (Total = todas las divisiones) ──
+        mats = cube["ramas"].get(rama_sel, cube["ramas"]["Total"])
 
         colA, colB = st.columns(2, gap="large")
 
@@ -1018,30 +1055,13 @@ def render_ipi(go_to):
             year_a = int(st.session_state.get("ipi_sec_year_a"))
             year_b = int(st.session_state.get("ipi_sec_year_b"))
 
-            def _accum_avg_by_sector_orig(year: int) -> pd.Series:
-                t = df_o_plot[df_o_plot["Date"].dt.year == year].copy()
-                t = t[t["Date"].dt.month <= last_month_num]
-                return t.groupby("Sector")["Value"].mean()
-
-            A = _accum_avg_by_sector_orig(year_a)
-            B = _accum_avg_by_sector_orig(year_b)
+            common = _ab_table(mats["acum"], year_a, year_b)
 
             rama_label = f" — {rama_sel}" if rama_sel != "Total" else ""
             subtitle = f"Comparación acumulada ene–{last_month_label} (promedio) · A={year_a} / B={year_b}{rama_label}"
 
         elif mode_key == "acum_cerrado":
-            years_closed = []
-            if not df_o_plot.empty:
-                month_counts = (
-                    df_o_plot.assign(Y=df_o_plot["Date"].dt.year, M=df_o_plot["Date"].dt.month)
-                    .groupby(["Sector", "Y"])["M"]
-                    .nunique()
-                    .reset_index()
-                )
-                if not month_counts.empty:
-                    # Año cerrado = 12 meses completos para todas las series visibles
-                    min_months_by_year = month_counts.groupby("Y")["M"].min()
-                    years_closed = sorted([int(y) for y, m in min_months_by_year.items() if int(m) == 12], reverse=True)
+            years_closed = mats["cerrados"]
 
             if not years_closed:
                 st.warning("No hay años cerrados disponibles para comparar (12 meses completos).")
@@ -1063,12 +1083,7 @@ def render_ipi(go_to):
             year_a = int(st.session_state.get("ipi_sec_year_closed_a"))
             year_b = int(st.session_state.get("ipi_sec_year_closed_b"))
 
-            def _full_year_avg_by_sector_orig(year: int) -> pd.Series:
-                t = df_o_plot[df_o_plot["Date"].dt.year == year].copy()
-                return t.groupby("Sector")["Value"].mean()
-
-            A = _full_year_avg_by_sector_orig(year_a)
-            B = _full_year_avg_by_sector_orig(year_b)
+            common = _ab_table(mats["cerrado"], year_a, year_b)
 
             rama_label = f" — {rama_sel}" if rama_sel != "Total" else ""
             subtitle = f"Comparación acumulada año cerrado (promedio anual) · A={year_a} / B={year_b}{rama_label}"
@@ -1076,13 +1091,7 @@ def render_ipi(go_to):
         elif mode_key == "anual":
             month_num = last_month_num
 
-            possible_dates = []
-            if not df_o_plot.empty:
-                for y in years_all:
-                    dt = pd.Timestamp(year=y, month=month_num, day=1)
-                    if (df_o_plot["Date"] == dt).any():
-                        possible_dates.append(dt)
-            possible_dates = sorted(possible_dates, reverse=True)
+            possible_dates = mats["mes_dates"]
 
             if not possible_dates:
                 st.warning("No hay meses comparables en la serie original para la variación anual.")
@@ -1116,23 +1125,17 @@ def render_ipi(go_to):
             dt_a = pd.to_datetime(st.session_state.get("ipi_sec_month_a"))
             dt_b = pd.to_datetime(st.session_state.get("ipi_sec_month_b"))
 
-            def _month_level_by_sector_orig(dt: pd.Timestamp) -> pd.Series:
-                t = df_o_plot[df_o_plot["Date"] == dt].copy()
-                return t.groupby("Sector")["Value"].mean()
-
-            A = _month_level_by_sector_orig(dt_a)
-            B = _month_level_by_sector_orig(dt_b)
+            common = _ab_table(mats["mes"], dt_a, dt_b)
 
             rama_label = f" — {rama_sel}" if rama_sel != "Total" else ""
             subtitle = f"Comparación anual ({MESES_ES[month_num-1]}) · A={_month_opt_label(dt_a)} / B={_month_opt_label(dt_b)}{rama_label}"
 
         else:
-            if df_s_plot.empty:
+            if mats["se"].empty:
                 st.warning("No hay datos sin estacionalidad disponibles para esta comparación.")
                 return
 
-            possible_dates = sorted(df_s_plot["Date"].dropna().unique().tolist(), reverse=True)
-            possible_dates = [pd.to_datetime(d) for d in possible_dates]
+            possible_dates = mats["se_dates"]
 
             if "ipi_sec_se_month_a" not in st.session_state:
                 st.session_state["ipi_sec_se_month_a"] = possible_dates[0] if possible_dates else None
@@ -1169,26 +1172,14 @@ def render_ipi(go_to):
 
             dt_b = pd.to_datetime(st.session_state.get("ipi_sec_se_month_b"))
 
-            def _month_level_by_sector_se(dt: pd.Timestamp) -> pd.Series:
-                t = df_s_plot[df_s_plot["Date"] == dt].copy()
-                return t.groupby("Sector")["Value"].mean()
-
-            A = _month_level_by_sector_se(dt_a)
-            B = _month_level_by_sector_se(dt_b)
+            common = _ab_table(mats["se"], dt_a, dt_b)
 
             subtitle = f"Comparación serie s.e. · A={_month_opt_label(dt_a)} / B={_month_opt_label(dt_b)}"
 
-        common = pd.DataFrame({"A": A, "B": B}).dropna()
-        common = common[(common["A"] > 0) & (common["B"] > 0)]
-
         if common.empty:
             st.warning("No hay datos suficientes para comparar esos períodos.")
             return
 
-        common["pct"] = (common["A"] / common["B"] - 1.0) * 100.0
-        common = common.reset_index().rename(columns={"index": "Sector"})
-        common = common.sort_values("pct", ascending=False).reset_index(drop=True)
-
         x = common["pct"].values
         x_min = float(np.nanmin(x)) if len(x) else 0.0
         x_max = float(np.nanmax(x)) if len(x) else 0.0
@@ -9,18 +9,19 @@ import textwrap
 import streamlit.components.v1 as components
 
 from services.macro_data import (
-    build_bands_2025,
-    build_bands_2026,
-    get_a3500,
-    get_ipc_bcra,
-    get_rem_last,
+    get_a3500_ts,
+    get_fx_bands,
     get_itcrm_excel_long,
 )
 
 # ✅ CCL desde services (NO yfinance acá)
 from services.market_data import get_ccl_ypf_df_fast
+from services.alignment import align_asof, series_from_df
+from services.deflator import base_label, get_deflator, real_factors
+from services.series import TimeSeries
+from services import pyramid as pm
 
-from ui.common import safe_pct
+from ui.common import SERIES_COLORS, add_pyramid_trace, pyramid_note, safe_pct
 
 
 INDU_LOADING_PHRASES = [
@@ -239,51 +240,22 @@ def render_macro_fx(go_to):
     # =========================
     # Load data
     # =========================
-    fx = get_a3500().copy()
-    fx["Date"] = _fix_date(fx["Date"])
-    fx["FX"] = pd.to_numeric(fx["FX"], errors="coerce")
-    fx = (
-        fx.dropna(subset=["Date", "FX"])
-        .drop_duplicates(subset=["Date"])
-        .sort_values("Date")
-        .reset_index(drop=True)
-    )
-
-    rem = get_rem_last()
-    ipc = get_ipc_bcra()
+    # Series ya limpias (ordenadas, sin duplicados ni NaN): sin re-limpieza acá
+    fx = get_a3500_ts()
 
-    bands_2025 = build_bands_2025("2025-04-14", "2025-12-31", 1000.0, 1400.0)
-    bands_2026 = build_bands_2026(bands_2025, rem, ipc)
-
-    bands = (
-        pd.concat([bands_2025, bands_2026], ignore_index=True)
-        .dropna(subset=["Date", "lower", "upper"])
-        .sort_values("Date")
-        .reset_index(drop=True)
-    )
-    bands["Date"] = _fix_date(bands["Date"])
-    bands = bands.dropna(subset=["Date", "lower", "upper"])
+    # Bandas: cacheadas por versión de REM / IPC (no se recalculan por render)
+    bands = get_fx_bands()
 
     # -------------------------
     # CCL proxy (FAST) desde services — igual que Home
     # -------------------------
     ccl_df = get_ccl_ypf_df_fast(period="5y", prefer_adj=True)
 
-    ccl = ccl_df.rename(columns={"value": "CCL"}).copy()
-    ccl["Date"] = _fix_date(ccl["Date"])
-    ccl["CCL"] = pd.to_numeric(ccl["CCL"], errors="coerce")
-    ccl = ccl.dropna(subset=["Date", "CCL"]).drop_duplicates("Date").sort_values("Date").reset_index(drop=True)
+    ccl = TimeSeries.from_frame(ccl_df, "value", freq="D", name="CCL", keep="first")
 
     # =========================
     # Helpers
     # =========================
-    def _asof(df_: pd.DataFrame, target: pd.Timestamp, col: str):
-        t = df_.dropna(subset=["Date", col]).sort_values("Date")
-        t = t[t["Date"] <= target]
-        if t.empty:
-            return None
-        return float(t[col].iloc[-1])
-
     def _arrow_cls(v):
         if v is None or (isinstance(v, float) and np.isnan(v)):
             return ("", "")
@@ -295,40 +267,14 @@ def render_macro_fx(go_to):
     # CCL asignado asof al calendario del oficial
     # =========================================================
     brecha_daily = pd.DataFrame(columns=["Date", "Oficial", "CCL", "Brecha"])
-    if (fx is not None and not fx.empty) and (ccl is not None and not ccl.empty):
-        ofi = fx[["Date", "FX"]].rename(columns={"FX": "Oficial"}).copy()
-        ofi["Date"] = pd.to_datetime(ofi["Date"], errors="coerce")
-        ofi["Oficial"] = pd.to_numeric(ofi["Oficial"], errors="coerce")
-        ofi = (
-            ofi.dropna(subset=["Date", "Oficial"])
-               .drop_duplicates(subset=["Date"])
-               .sort_values("Date")
-               .reset_index(drop=True)
-        )
-    
-        ccl_s = ccl[["Date", "CCL"]].copy()
-        ccl_s["Date"] = pd.to_datetime(ccl_s["Date"], errors="coerce")
-        ccl_s["CCL"] = pd.to_numeric(ccl_s["CCL"], errors="coerce")
-        ccl_s = (
-            ccl_s.dropna(subset=["Date", "CCL"])
-                 .drop_duplicates(subset=["Date"])
-                 .sort_values("Date")
-                 .reset_index(drop=True)
-        )
-    
-        # key numérica robusta para merge_asof
-        ofi["Date_key"] = ofi["Date"].astype("int64")
-        ccl_s["Date_key"] = ccl_s["Date"].astype("int64")
-    
-        tmpb = pd.merge_asof(
-            ofi.sort_values("Date_key"),
-            ccl_s[["Date_key", "CCL"]].sort_values("Date_key"),
-            on="Date_key",
+    if not fx.empty and not ccl.empty:
+        tmpb = align_asof(
+            {"Oficial": fx, "CCL": ccl},
+            calendar="Oficial",
             direction="backward",
         )
-    
         tmpb["Brecha"] = (tmpb["CCL"] / tmpb["Oficial"] - 1) * 100
-        brecha_daily = tmpb[["Date", "Oficial", "CCL", "Brecha"]].dropna(subset=["Brecha"]).reset_index(drop=True)
+        brecha_daily = tmpb.dropna(subset=["Brecha"]).reset_index(drop=True)
 
     # =========================
     # Header dinámico según selección actual
@@ -340,29 +286,24 @@ def render_macro_fx(go_to):
 
     header_var = "CCL" if (len(vars_state) == 1 and vars_state[0] == "CCL") else "TC Mayorista"
 
-    if header_var == "CCL" and (ccl is not None and not ccl.empty):
-        hdr_df = ccl.rename(columns={"CCL": "VAL"})[["Date", "VAL"]].copy()
+    if header_var == "CCL" and not ccl.empty:
+        hdr = ccl
         label_unidad = "ARS/USD"
     else:
-        hdr_df = fx.rename(columns={"FX": "VAL"})[["Date", "VAL"]].copy()
+        hdr = fx
         header_var = "TC Mayorista"
         label_unidad = "ARS/USD"
 
     # --- Guardas anti-baches (BCRA/Yahoo) para el header ---
-    if hdr_df is None or hdr_df.empty or ("Date" not in hdr_df.columns) or ("VAL" not in hdr_df.columns):
+    if hdr.empty:
         st.warning("Tipo de cambio: sin datos para el header (API sin respuesta o DF vacío). Reintentá más tarde.")
         return
 
-    hdr_df = hdr_df.dropna(subset=["Date", "VAL"]).sort_values("Date").reset_index(drop=True)
-    if hdr_df.empty:
-        st.warning("Tipo de cambio: sin datos válidos (Date/VAL).")
-        return
-
-    last_date = pd.to_datetime(hdr_df["Date"].iloc[-1])
-    last_val = float(hdr_df["VAL"].iloc[-1])
+    last_date = hdr.last_date
+    last_val = hdr.last_value
 
-    val_m = _asof(hdr_df, last_date - pd.Timedelta(days=30), "VAL")
-    val_y = _asof(hdr_df, last_date - pd.Timedelta(days=365), "VAL")
+    val_m = hdr.asof(last_date - pd.Timedelta(days=30))
+    val_y = hdr.asof(last_date - pd.Timedelta(days=365))
 
     vm = None if val_m is None else (last_val / val_m - 1) * 100
     va = None if val_y is None else (last_val / val_y - 1) * 100
@@ -447,7 +388,7 @@ def render_macro_fx(go_to):
         st.markdown("<div class='fx-panel-title'>Seleccioná la medida</div>", unsafe_allow_html=True)
         medida = st.selectbox(
             "",
-            ["Nivel", "Variación acumulada"],
+            ["Nivel", "Nivel real (pesos constantes)", "Variación acumulada"],
             label_visibility="collapsed",
             key="fx_medida",
         )
@@ -468,31 +409,28 @@ def render_macro_fx(go_to):
     # =========================
     # MASTER DF
     # =========================
-    fx_min = pd.to_datetime(fx["Date"].min())
-    last_fx_date = pd.to_datetime(fx["Date"].max())
-    last_ccl_date = pd.to_datetime(ccl["Date"].max()) if (ccl is not None and not ccl.empty) else pd.NaT
+    fx_min = fx.first_date
+    last_fx_date = fx.last_date
+    last_ccl_date = ccl.last_date if not ccl.empty else pd.NaT
     bands_max = pd.to_datetime(bands["Date"].max()) if not bands.empty else pd.NaT
 
     full_end = max(d for d in [last_fx_date, last_ccl_date, bands_max] if pd.notna(d))
-    cal = pd.DataFrame({"Date": pd.date_range(fx_min, full_end, freq="D")})
 
-    ccl_panel = ccl[["Date", "CCL"]].copy() if (ccl is not None and not ccl.empty and "CCL" in ccl.columns) else pd.DataFrame(columns=["Date", "CCL"])
-
-    df = (
-        cal.merge(fx, on="Date", how="left")
-        .merge(bands, on="Date", how="left")
-        .merge(ccl_panel, on="Date", how="left")
-        .sort_values("Date")
-        .reset_index(drop=True)
+    # calendario diario: FX / CCL ffill hasta su último dato; bandas match exacto
+    df = align_asof(
+        {
+            "FX": fx,
+            "lower": series_from_df(bands, "lower"),
+            "upper": series_from_df(bands, "upper"),
+            "CCL": ccl,
+        },
+        calendar="daily",
+        start=fx_min,
+        end=full_end,
+        tolerance={"lower": 0, "upper": 0},
+        clip={"FX": True, "CCL": True},
     )
 
-    df["FX"] = df["FX"].ffill()
-    df.loc[df["Date"] > last_fx_date, "FX"] = np.nan
-
-    df["CCL"] = df["CCL"].ffill()
-    if pd.notna(last_ccl_date):
-        df.loc[df["Date"] > last_ccl_date, "CCL"] = np.nan
-
     # =========================
     # Slider
     # =========================
@@ -532,19 +470,22 @@ def render_macro_fx(go_to):
     band_line = "rgba(35, 120, 200, 0.55)"
     band_fill = "rgba(35, 120, 200, 0.08)"
 
-    if medida == "Nivel" and not bands.empty:
+    # bandas: solo la ventana visible con datos (no el calendario completo)
+    band_plot = df_plot.loc[df_plot["upper"].notna() & df_plot["lower"].notna(), ["Date", "lower", "upper"]]
+
+    if medida == "Nivel" and not band_plot.empty:
         fig.add_trace(
             go.Scatter(
-                x=df_plot["Date"],
-                y=df_plot["upper"],
+                x=band_plot["Date"],
+                y=band_plot["upper"],
                 name="Banda superior",
                 line=dict(dash="dash", color=band_line),
             )
         )
         fig.add_trace(
             go.Scatter(
-                x=df_plot["Date"],
-                y=df_plot["lower"],
+                x=band_plot["Date"],
+                y=band_plot["lower"],
                 name="Banda inferior",
                 line=dict(dash="dash", color=band_line),
                 fill="tonexty",
@@ -552,24 +493,40 @@ def render_macro_fx(go_to):
             )
         )
 
+    # pesos constantes: índice diario interpolado del deflactor (precalculado por versión del IPC)
+    real = medida == "Nivel real (pesos constantes)"
+    if real:
+        defl = get_deflator()
+        if defl.get("empty", True):
+            st.warning("No se pudo cargar el IPC: se muestran valores nominales.")
+            real = False
+        else:
+            f_real = real_factors(df["Date"], "D", defl)
+
+    # pirámide por serie (diario / semanal / mensual según el rango visible)
+    plot_end = df_plot["Date"].max()
+    pyrs = {}
     for v in variables:
-        col = cols_map[v]
-        y = df_plot[col]
-
-        if medida == "Variación acumulada":
-            base = y.dropna().iloc[0]
-            y2 = (y / base - 1) * 100
-            fig.add_trace(
-                go.Scatter(
-                    x=df_plot["Date"],
-                    y=y2,
-                    name=v,
-                    mode="lines",
-                    hovertemplate="%{x|%d/%m/%Y}<br>Variación acumulada: %{y:.2f}%<extra></extra>",
-                )
-            )
+        y = df[cols_map[v]].to_numpy()
+        if real:
+            y = y * f_real
+        pyrs[v] = pm.get_pyramid(pd.Series(y, index=df["Date"]))
+    level = pm.pick_level(pyrs.values(), start_d, plot_end)
+
+    for i, (v, pyr) in enumerate(pyrs.items()):
+        vw = pm.view(pyr, start_d, plot_end, level)
+        color = SERIES_COLORS[i % len(SERIES_COLORS)]
+
+        if real:
+            hover = f"%{{x|%d/%m/%Y}}<br>%{{y:.2f}} ({base_label(defl)})<extra></extra>"
+        elif medida == "Variación acumulada":
+            base = pm.first_value(pyr, start_d, plot_end)
+            vw[["value", "lo", "hi"]] = (vw[["value", "lo", "hi"]] / base - 1) * 100
+            hover = "%{x|%d/%m/%Y}<br>Variación acumulada: %{y:.2f}%<extra></extra>"
         else:
-            fig.add_trace(go.Scatter(x=df_plot["Date"], y=y, name=v, mode="lines"))
+            hover = None
+
+        add_pyramid_trace(fig, vw, v, level, color, hover)
 
     fig.update_layout(
         height=520,
@@ -579,6 +536,7 @@ def render_macro_fx(go_to):
         dragmode=False,
     )
     st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False, "scrollZoom": False, "doubleClick": False})
+    pyramid_note(level)
 
     st.download_button(
         "⬇️ Descargar CSV",
@@ -796,47 +754,24 @@ def render_macro_fx(go_to):
             tcr_min = pd.to_datetime(tcr_long["Date"].min())
             tcr_max = pd.to_datetime(tcr_long["Date"].max())
 
-            cal2 = pd.DataFrame({"Date": pd.date_range(tcr_min, tcr_max, freq="D")})
-
-            wide = (
-                tcr_long.pivot_table(index="Date", columns="Serie", values="Value", aggfunc="last")
-                .sort_index()
-                .reset_index()
+            # calendario diario: cada serie ffill hasta su último dato (clip)
+            # + brecha as-of sobre fechas TCRM (último inmediato), en una pasada
+            tcr_series = {
+                serie: pd.Series(g["Value"].to_numpy(), index=g["Date"])
+                for serie, g in tcr_long.groupby("Serie", sort=False)
+            }
+            has_brecha = brecha_daily is not None and not brecha_daily.empty
+            if has_brecha:
+                tcr_series["Brecha"] = series_from_df(brecha_daily, "Brecha")
+
+            df2 = align_asof(
+                tcr_series,
+                calendar="daily",
+                start=tcr_min,
+                end=tcr_max,
+                clip={serie: True for serie in series_all},
             )
-
-            df2 = cal2.merge(wide, on="Date", how="left").sort_values("Date").reset_index(drop=True)
-            df2["Date"] = _fix_date(df2["Date"])
-
-            # ffill respetando último dato por serie
-            for s in series_all:
-                if s in df2.columns:
-                    last_s_date = tcr_long.loc[tcr_long["Serie"] == s, "Date"].max()
-                    df2[s] = pd.to_numeric(df2[s], errors="coerce").ffill()
-                    df2.loc[df2["Date"] > pd.to_datetime(last_s_date), s] = np.nan
-
-            # ---- brecha asof sobre fechas TCRM (último inmediato)
-            if brecha_daily is not None and not brecha_daily.empty:
-                b = brecha_daily[["Date", "Brecha"]].copy()
-                b["Date"] = _fix_date(b["Date"])
-                b = b.dropna(subset=["Date", "Brecha"]).sort_values("Date").reset_index(drop=True)
-
-                df2 = df2.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
-                df2["Date"] = pd.to_datetime(df2["Date"], errors="coerce")
-                b["Date"] = pd.to_datetime(b["Date"], errors="coerce")
-                
-                df2 = df2.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
-                b = b.dropna(subset=["Date", "Brecha"]).sort_values("Date").reset_index(drop=True)
-                
-                df2["Date_key"] = df2["Date"].astype("int64")
-                b["Date_key"] = b["Date"].astype("int64")
-                
-                df2 = pd.merge_asof(
-                    df2.sort_values("Date_key"),
-                    b[["Date_key", "Brecha"]].sort_values("Date_key"),
-                    on="Date_key",
-                    direction="backward",
-                )
-            else:
+            if not has_brecha:
                 df2["Brecha"] = np.nan
 
             df2["TCRM_factor_ccl"] = 1.0 + (pd.to_numeric(df2["Brecha"], errors="coerce") / 100.0)
@@ -1104,28 +1039,10 @@ def render_macro_fx(go_to):
     export["Date"] = _fix_date(export["Date"])
     export = export.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
 
-    # Si el DF de CCL trae también YPF_ARS/YPF_USD, los agregamos; si no, seguimos sin eso.
-    if ccl is not None and not ccl.empty:
-        extra_cols = [c for c in ["YPF_ARS", "YPF_USD"] if c in ccl.columns]
-        if extra_cols:
-            ccl_cols = ccl[["Date"] + extra_cols].copy()
-            ccl_cols["Date"] = _fix_date(ccl_cols["Date"])
-            ccl_cols = ccl_cols.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
-            export["Date"] = pd.to_datetime(export["Date"], errors="coerce")
-            ccl_cols["Date"] = pd.to_datetime(ccl_cols["Date"], errors="coerce")
-            
-            export = export.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
-            ccl_cols = ccl_cols.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
-            
-            export["Date_key"] = export["Date"].astype("int64")
-            ccl_cols["Date_key"] = ccl_cols["Date"].astype("int64")
-            
-            export = pd.merge_asof(
-                export.sort_values("Date_key"),
-                ccl_cols.drop(columns=["Date"]).sort_values("Date_key"),
-                on="Date_key",
-                direction="backward",
-            ).drop(columns=["Date_key"])
+    # Si el DF de CCL trae también YPF_ARS/YPF_USD, los agregamos (as-of); si no, seguimos sin eso.
+    if not ccl.empty:
+        for c in [c for c in ["YPF_ARS", "YPF_USD"] if c in ccl_df.columns]:
+            export[c] = TimeSeries.from_frame(ccl_df, c, keep="first").asof_values(export["Date"])
 
     export = export.rename(
         columns={
@@ -9,17 +9,19 @@ from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# yfinance opcional
-try:
-    import yfinance as yf
-except Exception:
-    yf = None
-
 from services.macro_data import (
     get_a3500,
     get_monetaria_serie,
     get_ipc_bcra,
 )
+from services.market_data import (
+    get_ccl_ypf_df_fast,
+    get_ypf_ars_history,
+    get_ypf_usd_history,
+)
+from services.yahoo_scheduler import get_yahoo_scheduler, pick_close
+from services.alignment import align_asof, series_from_df
+from services.shared import shared_dataset
 
 # ============================================================
 # Frases (loading)
@@ -74,8 +76,10 @@ def _fmt_mes_anio_es(dt: pd.Timestamp) -> str:
 
 # ============================================================
 # Cache wrappers (para no repetir descargas/procesos)
+# - Frames compartidos de solo lectura (services/shared.py): un objeto por
+#   proceso, sin des-serializar una copia en cada rerun.
 # ============================================================
-@st.cache_data(ttl=12 * 60 * 60, show_spinner=False)
+@shared_dataset("bcra", ttl=12 * 60 * 60)
 def _a3500_cached() -> pd.DataFrame:
     df = get_a3500()
     if df is None or df.empty:
@@ -89,7 +93,7 @@ def _a3500_cached() -> pd.DataFrame:
     return df
 
 
-@st.cache_data(ttl=12 * 60 * 60, show_spinner=False)
+@shared_dataset("bcra", ttl=12 * 60 * 60)
 def _monetaria_cached(serie_id: int) -> pd.DataFrame:
     df = get_monetaria_serie(serie_id)
     if df is None or df.empty:
@@ -200,15 +204,10 @@ def _last_riesgo_pais():
 def _last_brecha_from_macro_fx():
     """
     Brecha = CCL / Oficial - 1.
-    Estable: usa última fecha común exacta; si no hay, merge_asof con tolerancia.
+    Estable: usa última fecha común exacta; si no hay, as-of con tolerancia (motor de alineación).
     Rápido: usa tail() para no mergear todo.
     """
-    # ✅ CCL desde services (evita import circular con pages.macro_fx)
-    try:
-        from services.market_data import get_ccl_ypf_df_fast
-    except Exception:
-        return None, None
-
+    # ✅ CCL desde services (serie canónica, evita import circular con pages.macro_fx)
     ofi = _a3500_cached()
     if ofi is None or ofi.empty or "Date" not in ofi.columns or "FX" not in ofi.columns:
         return None, None
@@ -218,71 +217,29 @@ def _last_brecha_from_macro_fx():
     except Exception:
         return None, None
 
-    if ccl is None or ccl.empty or "Date" not in ccl.columns:
-        return None, None
-
-    # --- normalizaciones mínimas
-    ofi = ofi.copy()
-    ofi["Date"] = pd.to_datetime(ofi["Date"], errors="coerce").dt.normalize()
-    ofi["FX"] = pd.to_numeric(ofi["FX"], errors="coerce")
-    ofi = ofi.dropna(subset=["Date", "FX"]).sort_values("Date")
-
-    ccl = ccl.copy()
-    ccl["Date"] = pd.to_datetime(ccl["Date"], errors="coerce").dt.normalize()
-
-    # normalizar nombre por si viene como value
-    if "CCL" not in ccl.columns:
-        if "value" in ccl.columns:
-            ccl = ccl.rename(columns={"value": "CCL"})
-        else:
-            for col in ["ccl", "Value", "precio", "Precio"]:
-                if col in ccl.columns:
-                    ccl = ccl.rename(columns={col: "CCL"})
-                    break
-
-    if "CCL" not in ccl.columns:
+    if ccl is None or ccl.empty or "Date" not in ccl.columns or "value" not in ccl.columns:
         return None, None
 
-    ccl["CCL"] = pd.to_numeric(ccl["CCL"], errors="coerce")
-    ccl = ccl.dropna(subset=["Date", "CCL"]).sort_values("Date")
-
-    if ccl.empty or ofi.empty:
-        return None, None
-
-    # 1) última fecha común exacta (rápido: acotar universo)
-    common = (
-        ofi[["Date", "FX"]].tail(1500)
-        .merge(ccl[["Date", "CCL"]].tail(1500), on="Date", how="inner")
-        .dropna()
-        .sort_values("Date")
-    )
-    if not common.empty:
-        last = common.iloc[-1]
-        brecha = (float(last["CCL"]) / float(last["FX"]) - 1) * 100
-        return float(brecha), pd.to_datetime(last["Date"])
-
-    # 2) fallback: asof (oficial <= fecha CCL), tolerancia 7 días
-    left = ccl[["Date", "CCL"]].tail(600).sort_values("Date")
-    right = ofi[["Date", "FX"]].tail(1200).sort_values("Date")
-
-    left = ofi[["Date", "FX"]].tail(1200).sort_values("Date")     # FECHAS OFICIAL
-    right = ccl[["Date", "CCL"]].tail(1200).sort_values("Date")   # CCL ANTERIOR
-
-    m = pd.merge_asof(
-        left,
-        right,
-        on="Date",
+    # Alineación sobre el calendario oficial, en una sola pasada:
+    # - CCL_exact: misma fecha (tolerancia 0)
+    # - CCL_asof: CCL anterior, tolerancia 14 días (fallback)
+    ccl_s = series_from_df(ccl, "value")
+    m = align_asof(
+        {"FX": series_from_df(ofi, "FX"), "CCL_exact": ccl_s, "CCL_asof": ccl_s},
+        calendar="FX",
         direction="backward",
-        tolerance=pd.Timedelta(days=14),
-    ).dropna()
-
+        tolerance={"CCL_exact": 0, "CCL_asof": 14},
+    )
 
-    if m.empty:
-        return None, None
+    # 1) última fecha común exacta; 2) fallback asof
+    for col in ["CCL_exact", "CCL_asof"]:
+        ok = m.dropna(subset=["FX", col])
+        if not ok.empty:
+            last = ok.iloc[-1]
+            brecha = (float(last[col]) / float(last["FX"]) - 1) * 100
+            return float(brecha), pd.to_datetime(last["Date"])
 
-    last = m.iloc[-1]
-    brecha = (float(last["CCL"]) / float(last["FX"]) - 1) * 100
-    return float(brecha), pd.to_datetime(last["Date"])
+    return None, None
 
 
 # ============================================================
@@ -298,58 +255,6 @@ def _last_merval_usd():
     - usa el último dato disponible <= ayer;
     - si ayer no hubo mercado, toma la rueda anterior.
     """
-    if yf is None:
-        return None, None
-
-    def _download_close(ticker: str, period: str = "2y"):
-        try:
-            dl = yf.download(
-                ticker,
-                period=period,
-                progress=False,
-                auto_adjust=False,
-                group_by="column",
-                threads=False,
-            )
-        except Exception:
-            return None
-
-        if dl is None or dl.empty:
-            return None
-
-        # Columnas simples
-        if "Close" in dl.columns:
-            s = dl["Close"]
-            if isinstance(s, pd.DataFrame):
-                s = s.iloc[:, 0]
-
-        # Columnas MultiIndex
-        elif isinstance(dl.columns, pd.MultiIndex):
-            close_cols = [c for c in dl.columns if "Close" in c]
-            if not close_cols:
-                return None
-            s = dl[close_cols[0]]
-            if isinstance(s, pd.DataFrame):
-                s = s.iloc[:, 0]
-        else:
-            return None
-
-        s = s.copy()
-        s.index = pd.to_datetime(s.index, errors="coerce")
-
-        try:
-            s.index = s.index.tz_localize(None)
-        except Exception:
-            pass
-
-        s.index = s.index.normalize()
-        s = pd.to_numeric(s, errors="coerce").dropna().sort_index()
-
-        if s.empty:
-            return None
-
-        return s
-
     # Fecha máxima permitida: ayer en horario Argentina
     try:
         fecha_corte = (
@@ -361,65 +266,53 @@ def _last_merval_usd():
     except Exception:
         fecha_corte = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
 
-    # 1) Índice Merval con fallback
-    merv = None
-
-    for tk in ["IMV.BA", "^MERV"]:
-        s = _download_close(tk, period="2y")
-        if s is not None and not s.empty:
-            merv = s.rename("MERV")
-            break
+    # 1) Pedidos a Yahoo: el Merval (con fallback) se encola en el scheduler
+    #    ANTES de pedir el CCL canónico, así ambos salen en un único batch
+    #    period="max" (una sola llamada a Yahoo).
+    merv_fut = get_yahoo_scheduler().submit(["IMV.BA", "^MERV"], period="max")
 
-    if merv is None or merv.empty:
+    # 2) YPF local y ADR (serie canónica del CCL, sin descarga extra)
+    try:
+        ypf_ars = get_ypf_ars_history(start=None)
+        ypf_usd = get_ypf_usd_history(start=None)
+    except Exception:
         return None, None
 
-    # 2) YPF local y ADR
-    ypf_ars = _download_close("YPFD.BA", period="2y")
-    ypf_usd = _download_close("YPF", period="2y")
-
-    if ypf_ars is None or ypf_usd is None:
-        return None, None
     if ypf_ars.empty or ypf_usd.empty:
         return None, None
 
-    # 3) Convertir a DataFrame
-    merv_df = merv.reset_index().rename(columns={"index": "Date"})
-    ypf_ars_df = ypf_ars.rename("YPFD_BA").reset_index().rename(columns={"index": "Date"})
-    ypf_usd_df = ypf_usd.rename("YPF_ADR").reset_index().rename(columns={"index": "Date"})
-
-    # 4) No usar datos de hoy
-    merv_df = merv_df[merv_df["Date"] <= fecha_corte].copy()
-    ypf_ars_df = ypf_ars_df[ypf_ars_df["Date"] <= fecha_corte].copy()
-    ypf_usd_df = ypf_usd_df[ypf_usd_df["Date"] <= fecha_corte].copy()
-
-    if merv_df.empty or ypf_ars_df.empty or ypf_usd_df.empty:
+    # Índice Merval con fallback
+    try:
+        data = merv_fut.result(timeout=120)
+    except Exception:
         return None, None
 
-    # 5) Alinear por fecha del Merval, usando último dato disponible hacia atrás
-    df = merv_df.sort_values("Date")
+    merv = None
+    for tk in ["IMV.BA", "^MERV"]:
+        s = pick_close(data.get(tk))
+        if not s.empty:
+            merv = s.rename("MERV")
+            break
 
-    df = pd.merge_asof(
-        df,
-        ypf_ars_df.sort_values("Date"),
-        on="Date",
-        direction="backward",
-        tolerance=pd.Timedelta(days=7),
-    )
+    if merv is None or merv.empty:
+        return None, None
 
-    df = pd.merge_asof(
-        df,
-        ypf_usd_df.sort_values("Date"),
-        on="Date",
+    # 3) No usar datos de hoy + alinear por fecha del Merval,
+    #    usando último dato disponible hacia atrás (tolerancia 7 días)
+    df = align_asof(
+        {"MERV": merv, "YPFD_BA": ypf_ars, "YPF_ADR": ypf_usd},
+        calendar="MERV",
         direction="backward",
-        tolerance=pd.Timedelta(days=7),
+        tolerance={"YPFD_BA": 7, "YPF_ADR": 7},
+        end=fecha_corte,
     )
 
-    df = df.dropna(subset=["MERV", "YPFD_BA", "YPF_ADR"]).sort_values("Date")
+    df = df.dropna(subset=["MERV", "YPFD_BA", "YPF_ADR"])
 
     if df.empty:
         return None, None
 
-    # 6) Última rueda cerrada disponible
+    # 4) Última rueda cerrada disponible
     last = df.iloc[-1]
 
     ccl_ypf = float(last["YPFD_BA"]) / float(last["YPF_ADR"])
@@ -683,7 +576,7 @@ def _parse_rss(xml_bytes: bytes, feed_url: str) -> list[dict]:
     return out
 
 
-@st.cache_data(ttl=15 * 60, show_spinner=False)
+@st.cache_data(ttl=15 * 60, max_entries=8, show_spinner=False)
 def _load_news_scored(feeds: list[str] | None = None, max_items_total: int = 50) -> pd.DataFrame:
     feeds = feeds or NEWS_FEEDS
     items: list[dict] = []
@@ -959,27 +852,12 @@ def render_macro_home(go_to):
         "reservas": _last_reservas,
         "ipim": _last_ipim_ng_vm,
         "merval": _last_merval_usd,
+        "brecha": _last_brecha_from_macro_fx,
         "news": _load_news_scored,
     }
 
-    # Carga en paralelo
-    with ThreadPoolExecutor(max_workers=4) as ex:
-        futs = {ex.submit(fn): k for k, fn in tasks.items()}
-        for fut in as_completed(futs):
-            k = futs[fut]
-            try:
-                results[k] = fut.result()
-            except Exception:
-                results[k] = None
-
-    # ✅ brecha afuera del pool (pero results ya existe)
-    try:
-        results["brecha"] = _last_brecha_from_macro_fx()
-    except Exception:
-        results["brecha"] = (None, None)
-
-
-    # Carga en paralelo
+    # Carga en paralelo (una sola pasada).
+    # Los pedidos a Yahoo (Merval + CCL) los agrupa el scheduler en un batch.
     with ThreadPoolExecutor(max_workers=7) as ex:
         futs = {ex.submit(fn): k for k, fn in tasks.items()}
         for fut in as_completed(futs):
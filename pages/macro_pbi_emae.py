@@ -8,8 +8,9 @@ import streamlit.components.v1 as components
 from plotly.subplots import make_subplots
 from services.macro_data import (
     get_emae_excel_full,
-    get_emae_sectores_long,
+    get_emae_sector_panel,
 )
+from services import transforms as tr
 
 # ============================================================
 # Frases (loading)
@@ -40,13 +41,13 @@ def _arrow_cls(v):
 
 def _compute_yoy(df: pd.DataFrame) -> pd.DataFrame:
     t = df.dropna(subset=["Date", "Value"]).sort_values("Date").copy()
-    t["YoY"] = (t["Value"] / t["Value"].shift(12) - 1.0) * 100.0
+    t["YoY"] = tr.on_long(t, tr.yoy)  # rezago por calendario (huecos => NaN)
     return t
 
 
 def _compute_mom(df: pd.DataFrame) -> pd.DataFrame:
     t = df.dropna(subset=["Date", "Value"]).sort_values("Date").copy()
-    t["MoM"] = (t["Value"] / t["Value"].shift(1) - 1.0) * 100.0
+    t["MoM"] = tr.on_long(t, tr.mom)
     return t
 
 
@@ -642,8 +643,6 @@ def render_macro_pbi_emae(go_to):
     # EMAE — Apertura por sectores (comparación A / B)
     # =========================================================
 
-    from services.macro_data import get_emae_sectores_long
-
     st.divider()
 
     with st.container():
@@ -693,50 +692,16 @@ def render_macro_pbi_emae(go_to):
 
         # --- load data ---
         with st.spinner("Cargando EMAE por sectores..."):
-            df_sec = get_emae_sectores_long()
+            panel = get_emae_sector_panel()
 
-        if df_sec is None or df_sec.empty:
+        if panel is None:
             st.error("No pude cargar EMAE por sectores.")
         else:
-            # Limpieza
-            df_sec = df_sec.copy()
-            df_sec["Date"] = pd.to_datetime(df_sec["Date"], errors="coerce")
-            df_sec["Value"] = pd.to_numeric(df_sec["Value"], errors="coerce")
-            df_sec = (
-                df_sec.dropna(subset=["Date", "Sector", "Value"])
-                    .sort_values(["Sector", "Date"])
-                    .reset_index(drop=True)
-            )
-
             # Último mes disponible (para mensual y para el acumulado ene–último mes)
-            max_dt = pd.to_datetime(df_sec["Date"].max())
-            last_month_num = int(max_dt.month)
+            max_dt = panel.max_date
             last_month_label = max_dt.strftime("%b").lower()
 
-            years_all = sorted(df_sec["Date"].dt.year.unique().tolist(), reverse=True)
-
-            def _pretty_sector(s: str) -> str:
-                s = (s or "").strip()
-                if not s:
-                    return s
-                fixes = {
-                    "admin_publica_planes_seguridad_social_afiliacion_obligatoria": "Administración pública / planes / seguridad social",
-                    "ensenianza": "Enseñanza",
-                    "impuestos_netos_subsidios": "Impuestos netos de subsidios",
-                    "comercio_mayorista_minorista_reparaciones": "Comercio mayorista/minorista y reparaciones",
-                    "electricidad_gas_agua": "Electricidad, gas y agua",
-                    "explotacion_minas_canteras": "Explotación de minas y canteras",
-                    "otras_actividades_servicios_comunitarias_sociales_personales": "Otros servicios comunitarios, sociales y personales",
-                    "servicios_sociales_salud": "Servicios sociales y salud",
-                    "transporte_comunicaciones": "Transporte y comunicaciones",
-                    "actividades_inmobiliarias_empresariales_alquiler": "Act. inmobiliarias, empresariales y alquiler",
-                    "hoteles_restaurantes": "Hoteles y restaurantes",
-                    "industria_manufacturera": "Industria manufacturera",
-                    "agricultura_ganaderia_caza_silvicultura": "Agricultura, ganadería, caza y silvicultura",
-                }
-                if s in fixes:
-                    return fixes[s]
-                return s.replace("_", " ").capitalize()
+            years_all = panel.years()
 
             def _month_opt_label(dt: pd.Timestamp) -> str:
                 return pd.to_datetime(dt).strftime("%b-%Y").lower()
@@ -805,25 +770,12 @@ def render_macro_pbi_emae(go_to):
                 year_a = int(st.session_state.get("emae_sec_year_a"))
                 year_b = int(st.session_state.get("emae_sec_year_b"))
 
-                def _accum_avg_by_sector(year: int) -> pd.Series:
-                    t = df_sec[df_sec["Date"].dt.year == year].copy()
-                    t = t[t["Date"].dt.month <= last_month_num]
-                    return t.groupby("Sector")["Value"].mean()
-
-                A = _accum_avg_by_sector(year_a)
-                B = _accum_avg_by_sector(year_b)
+                common = panel.compare("acum", year_a, year_b)
 
                 subtitle = f"Comparación acumulada ene–{last_month_label} (promedio) · A={year_a} / B={year_b}"
 
             else:
-                month_num = last_month_num
-
-                possible_dates = []
-                for y in years_all:
-                    dt = pd.Timestamp(year=y, month=month_num, day=1)
-                    if (df_sec["Date"] == dt).any():
-                        possible_dates.append(dt)
-                possible_dates = sorted(possible_dates, reverse=True)
+                possible_dates = panel.month_dates()
 
                 if "emae_sec_month_a" not in st.session_state:
                     st.session_state["emae_sec_month_a"] = possible_dates[0] if possible_dates else None
@@ -853,31 +805,14 @@ def render_macro_pbi_emae(go_to):
                 dt_a = pd.to_datetime(st.session_state.get("emae_sec_month_a"))
                 dt_b = pd.to_datetime(st.session_state.get("emae_sec_month_b"))
 
-                def _month_level_by_sector(dt: pd.Timestamp) -> pd.Series:
-                    t = df_sec[df_sec["Date"] == dt].copy()
-                    return t.groupby("Sector")["Value"].mean()
-
-                A = _month_level_by_sector(dt_a)
-                B = _month_level_by_sector(dt_b)
+                common = panel.compare("mensual", dt_a, dt_b)
 
                 subtitle = f"Comparación mensual ({max_dt.strftime('%b').lower()}) · A={_month_opt_label(dt_a)} / B={_month_opt_label(dt_b)}"
 
-            # =========================
-            # Armar %Δ = (A/B - 1) * 100
-            # =========================
-            common = pd.DataFrame({"A": A, "B": B}).dropna()
-            common = common[(common["A"] > 0) & (common["B"] > 0)]
-
+            # %Δ = (A/B - 1) * 100, ordenado desc (top = mejor)
             if common.empty:
                 st.warning("No hay datos suficientes para comparar esos períodos.")
             else:
-                common["pct"] = (common["A"] / common["B"] - 1.0) * 100.0
-                common = common.reset_index().rename(columns={"index": "Sector"})
-                common["Sector_label"] = common["Sector"].apply(_pretty_sector)
-
-                # Orden desc por variación (top = mejor)
-                common = common.sort_values("pct", ascending=False).reset_index(drop=True)
-
                 # =========================
                 # Plot: barras horizontales divergentes
                 # =========================
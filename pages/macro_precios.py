@@ -8,7 +8,7 @@ import re
 import requests
 import streamlit.components.v1 as components
 
-from services.macro_data import get_ipc_indec_full
+from services.macro_data import get_ipc_label_catalog, get_ipc_nacional_precios, get_ipca_base_2025
 
 
 # ============================================================
@@ -33,17 +33,6 @@ def _mmmyy_es(dt) -> str:
     return f"{_mes_es(dt.month)}-{str(dt.year)[-2:]}"
 
 
-def _is_nivel_general(label: str) -> bool:
-    return str(label).strip().lower() == "nivel general"
-
-
-def _clean_code(x) -> str:
-    s = str(x).strip()
-    if s.endswith(".0") and s.replace(".0", "").isdigit():
-        return s[:-2]
-    return s
-
-
 def _arrow_cls(v):
     if v is None or (isinstance(v, float) and np.isnan(v)):
         return ("", "")
@@ -90,10 +79,22 @@ def _apply_panel_wrap(marker_id: str):
     )
 
 
+def _range_base_rows(d: pd.DataFrame, date_col: str, group_col: str, start_date: pd.Timestamp) -> tuple[pd.Series, pd.Series]:
+    """
+    d ordenado por (grupo, fecha). Devuelve:
+    - ge: máscara de filas con fecha >= start_date
+    - is_base: primera fila >= start_date de cada grupo (la base del rango)
+    """
+    ge = d[date_col] >= start_date
+    is_base = ge & ~d.loc[ge, group_col].duplicated(keep="first").reindex(d.index, fill_value=True)
+    return ge, is_base
+
+
 def _range_accum_from_index(df: pd.DataFrame, date_col: str, group_col: str, idx_col: str, start_date: pd.Timestamp) -> pd.Series:
     """
     Acumulado (rango): (Idx_t / Idx_base - 1)*100,
     base = valor de índice en start_date; si no existe, usa el primer punto >= start_date.
+    Vectorizado por grupo (sin loop en Python).
     """
     out = pd.Series(index=df.index, dtype=float)
     if df.empty:
@@ -102,25 +103,20 @@ def _range_accum_from_index(df: pd.DataFrame, date_col: str, group_col: str, idx
     d = df[[date_col, group_col, idx_col]].copy()
     d[date_col] = pd.to_datetime(d[date_col], errors="coerce")
     d = d.dropna(subset=[date_col, group_col, idx_col]).sort_values([group_col, date_col])
+    if d.empty:
+        return out
 
-    for g, gg in d.groupby(group_col, sort=False):
-        gg = gg.sort_values(date_col)
-        base_row = gg[gg[date_col] == start_date]
-        if base_row.empty:
-            base_row = gg[gg[date_col] >= start_date].head(1)
-        if base_row.empty:
-            continue
+    _, is_base = _range_base_rows(d, date_col, group_col, start_date)
+    idx = d[idx_col].astype(float)
 
-        base = float(base_row[idx_col].iloc[0])
-        if not np.isfinite(base) or base == 0:
-            continue
+    base = d[group_col].map(pd.Series(idx[is_base].to_numpy(), index=d.loc[is_base, group_col].to_numpy()))
+    base = base.where(np.isfinite(base) & (base != 0))
 
-        vals = (gg[idx_col].astype(float) / base - 1.0) * 100.0
-        out.loc[vals.index] = vals.values
-
-        base_idx = base_row.index[0]
-        out.loc[base_idx] = 0.0
+    vals = (idx / base - 1.0) * 100.0
+    vals[is_base & base.notna()] = 0.0
 
+    ok = base.notna()
+    out.loc[vals.index[ok]] = vals[ok].to_numpy()
     return out
 
 
@@ -129,6 +125,7 @@ def _range_accum_from_monthly_pct(df: pd.DataFrame, date_col: str, group_col: st
     Acumulado (rango) desde variación mensual:
     - En start_date (o primer punto >= start_date) => 0%
     - Luego acumula con producto de (1 + vm/100), arrancando con factor 1 en el base.
+    Vectorizado: cumprod por grupo sobre las filas >= base.
     """
     out = pd.Series(index=df.index, dtype=float)
     if df.empty:
@@ -137,98 +134,22 @@ def _range_accum_from_monthly_pct(df: pd.DataFrame, date_col: str, group_col: st
     d = df[[date_col, group_col, vm_col]].copy()
     d[date_col] = pd.to_datetime(d[date_col], errors="coerce")
     d = d.dropna(subset=[date_col, group_col, vm_col]).sort_values([group_col, date_col])
-
-    for g, gg in d.groupby(group_col, sort=False):
-        gg = gg.sort_values(date_col)
-
-        base_row = gg[gg[date_col] == start_date]
-        if base_row.empty:
-            base_row = gg[gg[date_col] >= start_date].head(1)
-        if base_row.empty:
-            continue
-
-        base_pos = gg.index.get_loc(base_row.index[0])
-        tail = gg.iloc[base_pos:].copy()
-        if tail.empty:
-            continue
-
-        factors = (1.0 + tail[vm_col].astype(float) / 100.0).replace([np.inf, -np.inf], np.nan).fillna(1.0)
-        factors.iloc[0] = 1.0
-        cum = factors.cumprod()
-        acc = (cum / cum.iloc[0] - 1.0) * 100.0
-
-        out.loc[acc.index] = acc.values
-        out.loc[tail.index[0]] = 0.0
-
-    return out
-
-
-# ============================================================
-# IPCA (ENGHo 2017/18) — base 100=2025
-# ============================================================
-DIV_CODES = list(range(1, 13))
-W_2017 = {
-    1: 22.7 / 100, 2: 2.0 / 100, 3: 6.8 / 100, 4: 14.5 / 100,
-    5: 5.5 / 100, 6: 6.4 / 100, 7: 14.3 / 100, 8: 5.1 / 100,
-    9: 8.6 / 100, 10: 3.1 / 100, 11: 6.6 / 100, 12: 4.4 / 100,
-}
-
-
-def _compute_ipca_base_2025(ipc_raw: pd.DataFrame) -> pd.DataFrame:
-    """
-    IPCA (ENGHo 2017/18) desde IPC INDEC por divisiones (1..12).
-    Base: promedio 2025 = 100.
-    Output: Periodo, Serie, Indice, v_m, v_i_a
-    """
-    if ipc_raw is None or ipc_raw.empty:
-        return pd.DataFrame()
-
-    need = {"Periodo", "Codigo", "Codigo_num", "Indice_IPC", "Region", "Clasificador"}
-    if not need.issubset(set(ipc_raw.columns)):
-        return pd.DataFrame()
-
-    d = ipc_raw.copy()
-
-    # 1) Solo Nacional + Divisiones COICOP
-    d = d[(d["Region"] == "Nacional") & (d["Clasificador"].str.contains("divisiones", case=False, na=False))].copy()
-
-    # 2) Solo códigos 1..12
-    d["Codigo_num"] = pd.to_numeric(d["Codigo_num"], errors="coerce")
-    d = d[d["Codigo_num"].isin(DIV_CODES)].copy()
     if d.empty:
-        return pd.DataFrame()
-
-    d["Codigo_num"] = d["Codigo_num"].astype(int)
-    d["Periodo"] = pd.to_datetime(d["Periodo"], errors="coerce").dt.to_period("M").dt.to_timestamp(how="start")
-    d["Indice_IPC"] = pd.to_numeric(d["Indice_IPC"], errors="coerce")
-
-    d = d.dropna(subset=["Periodo", "Codigo_num", "Indice_IPC"])
-
-    div_wide = (
-        d.pivot_table(index="Periodo", columns="Codigo_num", values="Indice_IPC", aggfunc="last")
-        .sort_index()
-    )
-
-    # asegurar columnas 1..12
-    for c in DIV_CODES:
-        if c not in div_wide.columns:
-            div_wide[c] = np.nan
-    div_wide = div_wide[DIV_CODES]
+        return out
 
-    # base: promedio 2025 (fallback: promedio total)
-    base_mask = div_wide.index.year == 2025
-    base_avg = div_wide.loc[base_mask, DIV_CODES].mean(axis=0)
-    if base_avg.isna().any():
-        base_avg = div_wide[DIV_CODES].mean(axis=0)
+    ge, is_base = _range_base_rows(d, date_col, group_col, start_date)
+    tail = d.loc[ge]
+    if tail.empty:
+        return out
 
-    ratios = div_wide.divide(base_avg, axis=1)
-    wvec = np.array([W_2017[c] for c in DIV_CODES], dtype=float)
-    level = 100.0 * (ratios.values @ wvec)
+    factors = (1.0 + tail[vm_col].astype(float) / 100.0).replace([np.inf, -np.inf], np.nan).fillna(1.0)
+    factors[is_base[ge]] = 1.0
+    cum = factors.groupby(tail[group_col], sort=False).cumprod()
+    acc = (cum - 1.0) * 100.0
+    acc[is_base[ge]] = 0.0
 
-    out = pd.DataFrame({"Periodo": div_wide.index, "Serie": "ipca", "Indice": level}).sort_values("Periodo")
-    out["v_m"] = out["Indice"].pct_change(1) * 100
-    out["v_i_a"] = out["Indice"].pct_change(12) * 100
-    return out.reset_index(drop=True)
+    out.loc[acc.index] = acc.to_numpy()
+    return out
 
 
 # ============================================================
@@ -477,57 +398,27 @@ def render_macro_precios(go_to):
     # =========================
     # Datos: IPC (Nacional)
     # =========================
-    ipc_raw = get_ipc_indec_full()
-
-    # IPC “para el dashboard” (como ya lo venías usando)
-    ipc = ipc_raw[ipc_raw["Region"] == "Nacional"].copy()
+    # IPC “para el dashboard”: columnas derivadas (código limpio, label)
+    # se calculan al cargar la fuente, no en cada render
+    ipc = get_ipc_nacional_precios()
     if ipc.empty:
         st.warning("Sin datos IPC.")
         return
 
-    ipc["Codigo_str"] = ipc["Codigo"].apply(_clean_code).astype(str).str.strip()
-    ipc["Descripcion"] = ipc["Descripcion"].astype(str).str.strip()
-    ipc["Periodo"] = pd.to_datetime(ipc["Periodo"], errors="coerce").dt.normalize()
-    ipc = ipc.dropna(subset=["Periodo"]).sort_values("Periodo")
-
 
     # =========================
     # IPCA (ENGHo 2017/18) base 100=2025
     # (requiere Indice_IPC en el DF de IPC)
     # =========================
-    ipca = _compute_ipca_base_2025(ipc_raw)
-
-    # Labels IPC
-    label_fix = {"B": "Bienes", "S": "Servicios"}
-    sel = ipc[["Codigo_str", "Descripcion"]].drop_duplicates().copy()
-
-    def _is_empty_desc(d: str) -> bool:
-        ds = str(d).strip().lower()
-        return ds in ("", "nan", "none")
-
-    def build_label(code: str, desc: str) -> str:
-        code = str(code).strip()
-        if code.isdigit() and int(code) == 0:
-            return "Nivel general"
-        if not _is_empty_desc(desc):
-            return str(desc).strip()
-        if code in label_fix:
-            return label_fix[code]
-        return code
-
-    sel["Label"] = sel.apply(lambda r: build_label(r["Codigo_str"], r["Descripcion"]), axis=1)
-    sel["ord0"] = sel["Label"].apply(lambda x: 0 if _is_nivel_general(x) else 1)
-    sel = sel.sort_values(["ord0", "Label"]).drop(columns=["ord0"])
+    ipca = get_ipca_base_2025()  # cacheado por versión de la fuente IPC
 
-    options_ipc = sel["Codigo_str"].tolist()
-    code_to_label = dict(zip(sel["Codigo_str"], sel["Label"]))
+    # Labels IPC (catálogo precomputado)
+    ipc_catalog = get_ipc_label_catalog()
+    options_ipc = ipc_catalog["options"]
+    code_to_label = ipc_catalog["code_to_label"]
 
     def _find_code_by_label(name: str) -> str | None:
-        name = str(name).strip().lower()
-        for c, lab in code_to_label.items():
-            if str(lab).strip().lower() == name:
-                return c
-        return None
+        return ipc_catalog["label_to_code"].get(str(name).strip().lower())
 
     ipc_code_general = _find_code_by_label("nivel general") or (options_ipc[0] if options_ipc else None)
     ipc_code_servicios = _find_code_by_label("servicios")
@@ -5,8 +5,10 @@ import numpy as np
 import random
 import textwrap
 import streamlit.components.v1 as components
-from services.macro_data import get_monetaria_serie
-from ui.common import safe_pct   # 👈 ESTA LÍNEA
+from services.macro_data import get_monetaria_ts
+from services import resample as rs
+from services import pyramid as pm
+from ui.common import SERIES_COLORS, add_pyramid_trace, pyramid_note, safe_pct
 from services.macro_data import get_calidad_cartera_long
 
 
@@ -53,50 +55,6 @@ def _asof(df_: pd.DataFrame, target: pd.Timestamp, col: str):
     return float(t[col].iloc[-1])
 
 
-def _rem29_to_daily(df_m: pd.DataFrame) -> pd.DataFrame:
-    """REM mensual -> diario (valor mensual repetido y ffill)."""
-    if df_m is None or df_m.empty:
-        return pd.DataFrame(columns=["Date", "value"])
-
-    df_m = df_m.copy()
-    df_m["Date"] = pd.to_datetime(df_m["Date"], errors="coerce").dt.normalize()
-    df_m["value"] = pd.to_numeric(df_m["value"], errors="coerce")
-    df_m = df_m.dropna(subset=["Date", "value"]).sort_values("Date")
-
-    df_m["Period"] = df_m["Date"].dt.to_period("M")
-    df_m = df_m.drop_duplicates("Period", keep="last")
-
-    start = df_m["Period"].min().to_timestamp(how="start")
-    end = df_m["Period"].max().to_timestamp(how="end")
-
-    cal = pd.DataFrame({"Date": pd.date_range(start, end, freq="D")})
-    cal["Period"] = cal["Date"].dt.to_period("M")
-
-    out = cal.merge(df_m[["Period", "value"]], on="Period", how="left").drop(columns=["Period"])
-    out["value"] = out["value"].ffill()
-    return out
-
-
-def _extend_daily_ffill(df_daily: pd.DataFrame, end_date: pd.Timestamp) -> pd.DataFrame:
-    """Extiende REM diario hasta end_date con ffill del último dato."""
-    if df_daily is None or df_daily.empty:
-        return pd.DataFrame({"Date": [end_date], "value": [np.nan]})
-
-    df_daily = df_daily.copy()
-    df_daily["Date"] = pd.to_datetime(df_daily["Date"], errors="coerce").dt.normalize()
-    df_daily["value"] = pd.to_numeric(df_daily["value"], errors="coerce")
-    df_daily = df_daily.dropna(subset=["Date"]).sort_values("Date")
-
-    last_date = df_daily["Date"].max()
-    if end_date <= last_date:
-        return df_daily
-
-    cal = pd.DataFrame({"Date": pd.date_range(df_daily["Date"].min(), end_date, freq="D")})
-    out = cal.merge(df_daily, on="Date", how="left")
-    out["value"] = out["value"].ffill()
-    return out
-
-
 # ============================================================
 # Main
 # ============================================================
@@ -315,25 +273,20 @@ def render_macro_tasa(go_to):
     # =========================
     # Load data
     # =========================
-    rem29 = _rem29_to_daily(get_monetaria_serie(ID_REM))
+    rem29 = get_monetaria_ts(ID_REM)
 
+    # series ya limpias (ordenadas, sin duplicados ni NaN)
     series_data = {}
     for sid in SERIES_TASAS:
-        df = get_monetaria_serie(sid)
-        if df is None or df.empty:
-            continue
-        df = df.copy()
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.normalize()
-        df["value"] = pd.to_numeric(df["value"], errors="coerce")
-        df = df.dropna(subset=["Date", "value"]).sort_values("Date")
-        series_data[sid] = df
+        ts = get_monetaria_ts(sid)
+        if not ts.empty:
+            series_data[sid] = ts
 
     if not series_data:
         st.warning("Sin datos para las tasas.")
         return
 
-    max_rate_date = max(df["Date"].max() for df in series_data.values())
-    rem29 = _extend_daily_ffill(rem29, max_rate_date)
+    max_rate_date = max(ts.last_date for ts in series_data.values())
 
 
     # =========================
@@ -347,34 +300,20 @@ def render_macro_tasa(go_to):
     # =========================
     # Master DF
     # =========================
-    min_date = min(df["Date"].min() for df in series_data.values())
+    min_date = min(ts.first_date for ts in series_data.values())
     cal = pd.DataFrame({"Date": pd.date_range(min_date, max_rate_date, freq="D")})
     df_master = cal.copy()
 
     for sid, meta in SERIES_TASAS.items():
-        name = meta["nombre"]
-
-        df_sid = series_data.get(sid)
-        if df_sid is None or df_sid.empty:
-            # opcional: warning suave (o solo continue para no ensuciar)
-            # st.warning(f"Serie BCRA faltante o vacía: {name} (id={sid})")
+        ts = series_data.get(sid)
+        if ts is None:
             continue
+        # ffill hasta el último dato de la serie (NaN antes del primero y después del último)
+        df_master[meta["nombre"]] = ts.asof_values(df_master["Date"], clip=True)
 
-        # asegurar columnas y limpieza (por si vino raro)
-        if "Date" not in df_sid.columns or "value" not in df_sid.columns:
-            # st.warning(f"Serie BCRA con columnas inesperadas: {name} (id={sid}) cols={list(df_sid.columns)}")
-            continue
-
-        tmp = df_sid[["Date", "value"]].rename(columns={"value": name})
-        df_master = df_master.merge(tmp, on="Date", how="left")
-
-        last = df_sid["Date"].max()
-        df_master[name] = pd.to_numeric(df_master[name], errors="coerce").ffill()
-        df_master.loc[df_master["Date"] > last, name] = np.nan
 
-
-    df_master = df_master.merge(rem29.rename(columns={"value": OPT_INFL}), on="Date", how="left")
-    df_master[OPT_INFL] = df_master[OPT_INFL].ffill()
+    # REM mensual -> valor del mes de cada fecha (ffill más allá del último mes publicado)
+    df_master[OPT_INFL] = rs.monthly_at(rem29, df_master["Date"], how="ffill")
 
     # =========================================================
     # Panel grande: TODO adentro de un container
@@ -565,27 +504,27 @@ def render_macro_tasa(go_to):
         # =========================
         fig = go.Figure()
 
+        # pirámide por serie (diario / semanal / mensual según el rango visible)
+        nominal = st.session_state["tasa_medida"] == "Tasa nominal anual"
+        pyrs = {}
         for v in vars_sel:
             if v == OPT_INFL:
                 # inflación solo en nominal
-                if st.session_state["tasa_medida"] == "Tasa nominal anual":
-                    fig.add_trace(
-                        go.Scatter(
-                            x=df_plot["Date"],
-                            y=df_plot[OPT_INFL],
-                            name=OPT_INFL,
-                            mode="lines",
-                            line=dict(dash="dot"),
-                        )
-                    )
-                continue
-
-            if st.session_state["tasa_medida"] == "Tasa nominal anual":
-                y = df_plot[v]
+                if not nominal:
+                    continue
+                y = df_master[OPT_INFL]
+            elif nominal:
+                y = df_master[v]
             else:
-                y = ((1 + df_plot[v] / 100) / (1 + df_plot[OPT_INFL] / 100) - 1) * 100
-
-            fig.add_trace(go.Scatter(x=df_plot["Date"], y=y, name=v, mode="lines"))
+                y = ((1 + df_master[v] / 100) / (1 + df_master[OPT_INFL] / 100) - 1) * 100
+            pyrs[v] = pm.get_pyramid(pd.Series(y.to_numpy(), index=df_master["Date"]))
+        level = pm.pick_level(pyrs.values(), start_d, end_d)
+
+        for i, (v, pyr) in enumerate(pyrs.items()):
+            add_pyramid_trace(
+                fig, pm.view(pyr, start_d, end_d, level), v, level, SERIES_COLORS[i % len(SERIES_COLORS)], None,
+                dash="dot" if v == OPT_INFL else None,
+            )
 
         # línea 0% (gris oscura)
         fig.add_hline(y=0, line_width=1, line_dash="solid", line_color="rgba(80,80,80,0.7)")
@@ -612,6 +551,7 @@ def render_macro_tasa(go_to):
             config={"displayModeBar": False, "scrollZoom": False, "doubleClick": False},
             key="chart_tasas",
         )
+        pyramid_note(level)
 
 
         st.markdown(
@@ -628,16 +568,13 @@ def render_macro_tasa(go_to):
     st.divider()
 
     with st.spinner("Cargando reservas internacionales..."):
-        reservas = get_monetaria_serie(1)
+        reservas_ts = get_monetaria_ts(1)
 
-    if reservas is None or reservas.empty:
+    if reservas_ts.empty:
         st.warning("Sin datos de Reservas Internacionales Brutas.")
         return
 
-    reservas = reservas.copy()
-    reservas["Date"] = pd.to_datetime(reservas["Date"], errors="coerce").dt.normalize()
-    reservas["value"] = pd.to_numeric(reservas["value"], errors="coerce")
-    reservas = reservas.dropna(subset=["Date", "value"]).sort_values("Date").reset_index(drop=True)
+    reservas = reservas_ts.to_frame()
 
     # 👇 CLAVE: todo adentro de un container, como FX
     with st.container():
@@ -793,20 +730,18 @@ def render_macro_tasa(go_to):
 
         y0 = df_plot["value"].copy()
 
+        # pirámide (diario / semanal / mensual según el rango visible)
+        res_pyr = pm.get_pyramid(reservas_ts)
+        res_level = pm.pick_level(res_pyr, start_d, end_d)
+        v = pm.view(res_pyr, start_d, end_d, res_level)
+
         if res_medida == "Variación acumulada":
-            base_series = y0.dropna()
-            base = float(base_series.iloc[0]) if not base_series.empty else np.nan
-
-            y = (y0 / base - 1) * 100
-
-            fig.add_trace(
-                go.Scatter(
-                    x=df_plot["Date"],
-                    y=y,
-                    name="Reservas (var. acum.)",
-                    mode="lines",
-                    hovertemplate="%{x|%d/%m/%Y}<br>Variación acumulada: %{y:.2f}%<extra></extra>",
-                )
+            base = pm.first_value(res_pyr, start_d, end_d)
+            v[["value", "lo", "hi"]] = (v[["value", "lo", "hi"]] / base - 1) * 100
+
+            add_pyramid_trace(
+                fig, v, "Reservas (var. acum.)", res_level, SERIES_COLORS[0],
+                "%{x|%d/%m/%Y}<br>Variación acumulada: %{y:.2f}%<extra></extra>",
             )
 
             # línea 0 gris oscura
@@ -816,15 +751,10 @@ def render_macro_tasa(go_to):
             fig.update_yaxes(ticksuffix="%")
 
         else:
-            fig.add_trace(
-                go.Scatter(
-                    x=df_plot["Date"],
-                    y=y0,
-                    name="Reservas",
-                    mode="lines",
-                    hovertemplate="%{x|%d/%m/%Y}<br>Millones USD: %{y:,.0f}<extra></extra>"
-                    .replace(",", "X").replace(".", ",").replace("X", "."),
-                )
+            add_pyramid_trace(
+                fig, v, "Reservas", res_level, SERIES_COLORS[0],
+                "%{x|%d/%m/%Y}<br>Millones USD: %{y:,.0f}<extra></extra>"
+                .replace(",", "X").replace(".", ",").replace("X", "."),
             )
 
             # --- Formato argentino del eje Y SOLO en NIVEL (20.000, 30.000, etc.) ---
@@ -865,6 +795,7 @@ def render_macro_tasa(go_to):
             config={"displayModeBar": False, "scrollZoom": False, "doubleClick": False},
             key="chart_reservas",
         )
+        pyramid_note(res_level)
 
 
 
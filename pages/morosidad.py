@@ -1,9 +1,15 @@
+import os
+
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
 import streamlit.components.v1 as components
 
+from services.deflator import base_label, get_deflator, real_factors
+from services.dtypes import lean_frame
+from services.shared import shared_dataset
+
 # ============================================================
 # Config
 # ============================================================
@@ -20,15 +26,50 @@ ID_IND_MAX      = 332
 LABEL_IND       = "Industria manufacturera"
 LABEL_IND_TOTAL = f"▶ Total {LABEL_IND}"
 
+# cubo de agregados: industria (id en rango) vs. resto de sectores
+COL_GRUPO       = "grupo"
+GRUPO_EXT       = "ext"
+GRUPO_IND       = "ind"
+GRUPO_SIN_ID    = "sin_id"
+
 # columna interna usada en Tab 3 para el eje Y (siempre float limpio)
 COL_Y_SERIE = "valor_serie"
 
+# Tab 3: saldo irregular deflactado por IPC (services/deflator.py)
+MEDIDA_REAL = "Saldo irregular (en millones de pesos constantes)"
+
 
 # ============================================================
 # Loader
 # ============================================================
-@st.cache_data(show_spinner=False)
-def load_mora():
+def _parse_tasa(col: pd.Series) -> pd.Series:
+    """
+    Tasa de mora -> % (vectorizado). Acepta '3,5%', '0.035', 3.5, ...
+    Valores <= 1 se interpretan como fracción (x100). No parseable => NaN.
+    """
+    if pd.api.types.is_numeric_dtype(col):
+        v = col.astype(float)
+    else:
+        txt = (
+            col.astype(str)
+            .str.replace("%", "", regex=False)
+            .str.replace(",", ".", regex=False)
+            .str.strip()
+        )
+        v = pd.to_numeric(txt, errors="coerce")
+    return pd.Series(np.where(v > 1, v, v * 100), index=col.index, dtype=float)
+
+
+def _mora_version() -> float:
+    """Versión de los datos = mtime del Excel (cambia con cada archivo mensual)."""
+    try:
+        return os.path.getmtime(MORA_PATH)
+    except OSError:
+        return 0.0
+
+
+def _load_mora_rows(version: float) -> pd.DataFrame:
+    # sin cache propio: el único consumidor es el cubo (uno por versión)
     df = pd.read_excel(MORA_PATH, sheet_name="Monitor", engine="openpyxl")
     df.columns = [str(c).strip() for c in df.columns]
     df[COL_ID] = pd.to_numeric(df[COL_ID], errors="coerce")
@@ -37,14 +78,7 @@ def load_mora():
         df = df[df[COL_NOMBRE].notna()].copy()
         df = df[df[COL_NOMBRE].astype(str).str.strip().str.lower() != "nan"].copy()
 
-    def _parse(x):
-        try:
-            v = float(str(x).replace("%", "").replace(",", ".").strip())
-            return v if v > 1 else v * 100
-        except Exception:
-            return float("nan")
-
-    df[COL_MORA] = df[COL_MORA].apply(_parse)
+    df[COL_MORA] = _parse_tasa(df[COL_MORA])
     for c in [COL_SALDO, COL_IRREG]:
         df[c] = pd.to_numeric(df[c], errors="coerce")
     df[COL_SECTOR] = df[COL_SECTOR].astype(str).str.strip()
@@ -53,30 +87,82 @@ def load_mora():
     df[COL_FECHA] = pd.to_numeric(df[COL_FECHA], errors="coerce")
     df = df.dropna(subset=[COL_FECHA]).copy()
     df[COL_FECHA] = df[COL_FECHA].astype(int)
+    # saldos sin downcast: se suman en el cubo
+    return lean_frame(df, "morosidad_rows", category=[COL_SECTOR, COL_NOMBRE], keep=[COL_SALDO, COL_IRREG])
+
+
+@shared_dataset("morosidad", pin=True)
+def _build_mora_cube(version: float) -> dict:
+    """
+    Cubo de agregados (una vez por versión de datos), indexado y ordenado:
+      cube:     (fecha_reg, grupo, sector, Nombre) -> saldo_total, saldo_irregular
+      sectores: (fecha_reg, grupo, sector)
+      grupos:   (fecha_reg, grupo)   grupo "ind" = total industria manufacturera
+      sistema:  (fecha_reg)          total del sistema
+      *_hist:   mismos agregados con fecha_reg como último nivel (Tab 3)
+    Compartido entre sesiones y de solo lectura (services/shared.py).
+    grupo: "ind" si id en [ID_IND_MIN, ID_IND_MAX], "ext" si está fuera,
+           "sin_id" si no tiene id (solo cuentan en el total del sistema).
+    """
+    df = _load_mora_rows(version)
+    es_ind = (df[COL_ID] >= ID_IND_MIN) & (df[COL_ID] <= ID_IND_MAX)
+    es_ext = (df[COL_ID] < ID_IND_MIN) | (df[COL_ID] > ID_IND_MAX)
+    df[COL_GRUPO] = np.select([es_ind, es_ext], [GRUPO_IND, GRUPO_EXT], default=GRUPO_SIN_ID)
+
+    vals = [COL_SALDO, COL_IRREG]
+    # observed=True: sector / Nombre son category (solo combinaciones presentes)
+    cube = df.groupby([COL_FECHA, COL_GRUPO, COL_SECTOR, COL_NOMBRE], observed=True)[vals].sum().sort_index()
+    sectores = cube.groupby(level=[0, 1, 2], observed=True).sum()
+    grupos = cube.groupby(level=[0, 1], observed=True).sum()
+    sistema = cube.groupby(level=0, observed=True).sum()
+
+    # vistas históricas: fecha al final => selección por sector = lookup indexado
+    def _hist(agg):
+        return agg.reorder_levels(list(range(1, agg.index.nlevels)) + [0]).sort_index()
+
+    fechas = sistema.index.astype(int).tolist()
+    return {
+        "cube": cube,
+        "sectores": sectores,
+        "grupos": grupos,
+        "sistema": sistema,
+        "cube_hist": _hist(cube),
+        "sectores_hist": _hist(sectores),
+        "grupos_hist": _hist(grupos),
+        "fechas": fechas,
+        "ultimo_mes": fechas[-1] if fechas else None,
+    }
+
 
-    # Último mes → Tab 1 y Tab 2
-    ultimo_mes = df[COL_FECHA].max()
-    df_last = df[df[COL_FECHA] == ultimo_mes].copy()
-    df_ext  = df_last[(df_last[COL_ID] < ID_IND_MIN) | (df_last[COL_ID] > ID_IND_MAX)].copy()
-    df_ind  = df_last[(df_last[COL_ID] >= ID_IND_MIN) & (df_last[COL_ID] <= ID_IND_MAX)].copy()
+def load_mora() -> dict:
+    return _build_mora_cube(_mora_version())
 
-    # Histórico completo → Tab 3
-    df_hist = df.copy()
 
-    return df_ext, df_ind, df_hist
+def _sel(agg: pd.DataFrame, key) -> pd.DataFrame:
+    """Lookup indexado en el cubo (MultiIndex ordenado). Sin datos => vacío."""
+    try:
+        out = agg.loc[key]
+    except KeyError:
+        empty = agg.iloc[:0]
+        n = len(key) if isinstance(key, tuple) else 1
+        if isinstance(empty.index, pd.MultiIndex) and empty.index.nlevels > n:
+            return empty.droplevel(list(range(n)))
+        return empty.reset_index(drop=True)
+    if isinstance(out, pd.Series):  # clave completa => una fila
+        out = out.to_frame().T
+    return out
 
 
 # ============================================================
 # Helpers generales
 # ============================================================
 def _agrupar(df_in, col_grupo):
-    g = df_in.groupby(col_grupo, as_index=False).agg(
+    g = df_in.groupby(col_grupo, as_index=False, observed=True).agg(
         **{COL_SALDO: (COL_SALDO, "sum"), COL_IRREG: (COL_IRREG, "sum")}
     )
-    g[COL_MORA] = g.apply(
-        lambda r: (r[COL_IRREG] / r[COL_SALDO] * 100) if r[COL_SALDO] > 0 else float("nan"),
-        axis=1,
-    )
+    s, i = g[COL_SALDO].to_numpy(dtype=float), g[COL_IRREG].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g[COL_MORA] = np.where(s > 0, i / s * 100, np.nan)
     return g
 
 
@@ -274,35 +360,72 @@ def _fig_barras(nombres, valores, sufijo, titulo, bold_label=None):
     return fig
 
 
+_MESES_ABR = np.array(["ene", "feb", "mar", "abr", "may", "jun",
+                       "jul", "ago", "sep", "oct", "nov", "dic"], dtype=object)
+
+
+def _fecha_labels(fechas):
+    """Vectorizado: [202401, ...] → ['ene-24', ...] (mismo formato que _fecha_label)."""
+    raw = pd.Series(np.asarray(fechas, dtype=object))
+    f   = pd.to_numeric(raw, errors="coerce")
+    mes = f % 100
+    ok  = ((mes >= 1) & (mes <= 12)).to_numpy()
+
+    res = np.empty(len(raw), dtype=object)
+    if ok.any():
+        fi = f[ok].astype("int64").to_numpy()
+        anio = pd.Series(fi // 100).astype(str).str[2:].to_numpy(dtype=object)
+        res[ok] = _MESES_ABR[fi % 100 - 1] + "-" + anio
+    if (~ok).any():
+        res[~ok] = [_fecha_label(x) for x in raw[~ok]]
+    return res
+
+
+def _fechas_dt(fechas):
+    """[202401, ...] → fechas del día 1 de cada mes (NaT si no es AAAAMM)."""
+    f  = pd.to_numeric(pd.Series(np.asarray(fechas, dtype=object)), errors="coerce")
+    ok = (f % 100 >= 1) & (f % 100 <= 12) & (f >= 100001)
+    return pd.to_datetime((f.where(ok) * 100 + 1).astype("Int64").astype("string"), format="%Y%m%d", errors="coerce")
+
+
 # ============================================================
 # Helpers Tab 3
 # ============================================================
-def _build_series(df_hist, fechas_ord, usar_mm, grupos):
+def _build_series(fechas_ord, usar_mm, grupos, factor=None):
     """
-    grupos: lista de (nombre_serie, df_subset)
+    grupos: lista de (nombre_serie, agregado por fecha) — sale del cubo,
+            índice fecha_reg y columnas saldo_total / saldo_irregular
+    factor: deflactor por fecha (pesos constantes) o None (nominal)
     Devuelve DataFrame con columnas:
       fecha_ord | fecha_label | nombre_serie | COL_Y_SERIE
     COL_Y_SERIE es siempre float listo para graficar:
       - tasa de mora en % si not usar_mm
-      - saldo irregular en millones si usar_mm
+      - saldo irregular en millones si usar_mm (x factor si se pasa)
     """
-    rows = []
-    for nombre, df_sub in grupos:
-        for f in fechas_ord:
-            df_f = df_sub[df_sub[COL_FECHA] == f]
-            s    = df_f[COL_SALDO].sum()
-            irr  = df_f[COL_IRREG].sum()
-            if usar_mm:
-                val = irr / 1_000
-            else:
-                val = (irr / s * 100) if s > 0 else np.nan
-            rows.append({
-                "fecha_ord":    f,
-                "fecha_label":  _fecha_label(f),
-                "nombre_serie": nombre,
-                COL_Y_SERIE:    val,
-            })
-    return pd.DataFrame(rows)
+    fechas = pd.Index(fechas_ord, name=COL_FECHA)
+    labels = _fecha_labels(fechas)
+
+    partes = []
+    for nombre, agg in grupos:
+        # meses sin datos => 0
+        agg = agg[[COL_SALDO, COL_IRREG]].reindex(fechas, fill_value=0)
+        s   = agg[COL_SALDO].to_numpy(dtype=float)
+        irr = agg[COL_IRREG].to_numpy(dtype=float)
+        if usar_mm:
+            val = irr / 1_000 if factor is None else irr / 1_000 * factor
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                val = np.where(s > 0, irr / s * 100, np.nan)
+        partes.append(pd.DataFrame({
+            "fecha_ord":    fechas.to_numpy(),
+            "fecha_label":  labels,
+            "nombre_serie": nombre,
+            COL_Y_SERIE:    val,
+        }))
+
+    if not partes:
+        return pd.DataFrame(columns=["fecha_ord", "fecha_label", "nombre_serie", COL_Y_SERIE])
+    return pd.concat(partes, ignore_index=True)
 
 
 def _fig_lineas(df_series, sufijo, titulo):
@@ -380,20 +503,24 @@ def render_morosidad(go_to):
     st.markdown(CSS, unsafe_allow_html=True)
 
     try:
-        df_ext, df_ind, df_hist = load_mora()
+        mora = load_mora()
     except Exception as e:
         st.error(f"⚠️ No se pudo cargar `{MORA_PATH}`\n\n`{e}`")
         return
 
     # ── Agregados globales (último mes) ──────────────────────
-    df_todo     = pd.concat([df_ext, df_ind], ignore_index=True)
-    total_saldo = df_todo[COL_SALDO].sum()
-    total_irreg = df_todo[COL_IRREG].sum()
+    cube, sectores, grupos = mora["cube"], mora["sectores"], mora["grupos"]
+    ultimo_mes = mora["ultimo_mes"]
+
+    g_last      = _sel(grupos, ultimo_mes)
+    g_last      = g_last[g_last.index.isin([GRUPO_EXT, GRUPO_IND])]
+    total_saldo = g_last[COL_SALDO].sum()
+    total_irreg = g_last[COL_IRREG].sum()
     mora_global = (total_irreg / total_saldo * 100) if total_saldo > 0 else float("nan")
 
-    df_g_ext     = _agrupar(df_ext, COL_SECTOR)
-    ind_total    = _total_row(df_ind, LABEL_IND)
-    df_g_ind_sub = _agrupar(df_ind, COL_SECTOR)
+    df_g_ext     = _agrupar(_sel(sectores, (ultimo_mes, GRUPO_EXT)).reset_index(), COL_SECTOR)
+    ind_total    = _total_row(_sel(grupos, (ultimo_mes, GRUPO_IND)), LABEL_IND)
+    df_g_ind_sub = _agrupar(_sel(sectores, (ultimo_mes, GRUPO_IND)).reset_index(), COL_SECTOR)
     mora_ind     = ind_total[COL_MORA]
     df_g1        = pd.concat([df_g_ext, pd.DataFrame([ind_total])], ignore_index=True)
 
@@ -458,7 +585,7 @@ def render_morosidad(go_to):
                 bold    = f"Total {LABEL_IND}"
                 titulo  = f"{'Saldo irregular (M$)' if usar_mm else 'Tasa de irregularidad (%)'} — {sector_t1}"
             else:
-                df_sub   = df_ext[df_ext[COL_SECTOR] == sector_t1].copy()
+                df_sub   = _sel(cube, (ultimo_mes, GRUPO_EXT, sector_t1)).reset_index()
                 df_sub_g = _agrupar(df_sub, COL_NOMBRE)
                 tot      = _total_row(df_sub, f"Total {sector_t1}")
                 tot_val  = (tot[COL_IRREG] / 1_000) if usar_mm else tot[COL_MORA]
@@ -502,7 +629,7 @@ def render_morosidad(go_to):
                 bold2    = f"Total {LABEL_IND}"
                 titulo2  = f"{'Saldo irregular (M$)' if usar_mm2 else 'Tasa de irregularidad (%)'} — {LABEL_IND}"
             else:
-                df_sub2  = df_ind[df_ind[COL_SECTOR] == subsector_t2].copy()
+                df_sub2  = _sel(cube, (ultimo_mes, GRUPO_IND, subsector_t2)).reset_index()
                 df_sub2g = _agrupar(df_sub2, COL_NOMBRE)
                 tot2     = _total_row(df_sub2, f"Total {subsector_t2}")
                 tot2_val = (tot2[COL_IRREG] / 1_000) if usar_mm2 else tot2[COL_MORA]
@@ -523,11 +650,14 @@ def render_morosidad(go_to):
         # ══════════════════════════════════════════════════════
         with tab_hist:
 
-            fechas_ord = sorted(df_hist[COL_FECHA].dropna().astype(int).unique().tolist())
-            df_hist_ext = df_hist[(df_hist[COL_ID] < ID_IND_MIN) | (df_hist[COL_ID] > ID_IND_MAX)].copy()
-            df_hist_ind = df_hist[(df_hist[COL_ID] >= ID_IND_MIN) & (df_hist[COL_ID] <= ID_IND_MAX)].copy()
+            fechas_ord = mora["fechas"]
 
-            sectores_hist = sorted(df_hist_ext[COL_SECTOR].dropna().unique().tolist())
+            # vistas del cubo por (grupo, sector[, Nombre]) con la fecha al final
+            sec_by  = mora["sectores_hist"]
+            cube_by = mora["cube_hist"]
+            grp_by  = mora["grupos_hist"]
+
+            sectores_hist = sorted(_sel(sec_by, GRUPO_EXT).index.get_level_values(0).unique().tolist())
             opciones_t3   = ["Total sistema"] + sectores_hist + [LABEL_IND]
 
             # Fila 1 de selectores
@@ -538,10 +668,12 @@ def render_morosidad(go_to):
                                          key="t3_sector", label_visibility="collapsed")
             with c2:
                 st.markdown("<div class='sel-label'>Seleccioná la medida</div>", unsafe_allow_html=True)
-                medida_t3 = st.selectbox("", ["Tasa de irregularidad", "Saldo irregular (en millones de pesos)"],
+                medida_t3 = st.selectbox("", ["Tasa de irregularidad", "Saldo irregular (en millones de pesos)",
+                                              MEDIDA_REAL],
                                          key="t3_medida", label_visibility="collapsed")
 
-            usar_mm3 = medida_t3 == "Saldo irregular (en millones de pesos)"
+            real3    = medida_t3 == MEDIDA_REAL
+            usar_mm3 = medida_t3 == "Saldo irregular (en millones de pesos)" or real3
             suf3     = "M" if usar_mm3 else "%"
 
             # Selector condicional de subsector
@@ -553,7 +685,7 @@ def render_morosidad(go_to):
                 c3, _ = st.columns([1, 1], gap="large")
 
                 if sector_t3 == LABEL_IND:
-                    subsectores_ind_hist = sorted(df_hist_ind[COL_SECTOR].dropna().unique().tolist())
+                    subsectores_ind_hist = sorted(_sel(sec_by, GRUPO_IND).index.get_level_values(0).unique().tolist())
                     with c3:
                         st.markdown("<div class='sel-label'>Seleccioná el subsector industrial</div>",
                                     unsafe_allow_html=True)
@@ -562,8 +694,9 @@ def render_morosidad(go_to):
                             index=0, key="t3_subind", label_visibility="collapsed",
                         )
                 else:
-                    df_sector_hist      = df_hist_ext[df_hist_ext[COL_SECTOR] == sector_t3]
-                    subsectores_nombres = sorted(df_sector_hist[COL_NOMBRE].dropna().unique().tolist())
+                    subsectores_nombres = sorted(
+                        _sel(cube_by, (GRUPO_EXT, sector_t3)).index.get_level_values(0).unique().tolist()
+                    )
                     with c3:
                         st.markdown("<div class='sel-label'>Seleccioná el subsector</div>",
                                     unsafe_allow_html=True)
@@ -578,32 +711,38 @@ def render_morosidad(go_to):
             grupos3 = []
 
             if sector_t3 == "Total sistema":
-                grupos3 = [("Total sistema", df_hist)]
+                grupos3 = [("Total sistema", mora["sistema"])]
 
             elif sector_t3 == LABEL_IND:
                 if subind_t3 is None or subind_t3 == f"▶ Total {LABEL_IND}":
-                    grupos3 = [(f"Total {LABEL_IND}", df_hist_ind)]
+                    grupos3 = [(f"Total {LABEL_IND}", _sel(grp_by, GRUPO_IND))]
                 else:
                     grupos3 = [
-                        (f"Total {LABEL_IND}", df_hist_ind),
-                        (subind_t3, df_hist_ind[df_hist_ind[COL_SECTOR] == subind_t3]),
+                        (f"Total {LABEL_IND}", _sel(grp_by, GRUPO_IND)),
+                        (subind_t3, _sel(sec_by, (GRUPO_IND, subind_t3))),
                     ]
 
             else:
-                df_sector_hist = df_hist_ext[df_hist_ext[COL_SECTOR] == sector_t3]
+                sector_hist = _sel(sec_by, (GRUPO_EXT, sector_t3))
                 if subsector_t3 is None or subsector_t3 == f"▶ Total {sector_t3}":
-                    grupos3 = [(f"Total {sector_t3}", df_sector_hist)]
+                    grupos3 = [(f"Total {sector_t3}", sector_hist)]
                 else:
                     grupos3 = [
-                        (f"Total {sector_t3}", df_sector_hist),
-                        (subsector_t3, df_sector_hist[df_sector_hist[COL_NOMBRE] == subsector_t3]),
+                        (f"Total {sector_t3}", sector_hist),
+                        (subsector_t3, _sel(cube_by, (GRUPO_EXT, sector_t3, subsector_t3))),
                     ]
 
-            df_series3 = _build_series(df_hist, fechas_ord, usar_mm3, grupos3)
-            titulo3    = (
-                f"{'Saldo irregular (M$)' if usar_mm3 else 'Tasa de irregularidad (%)'}"
-                f" — {sector_t3}"
-            )
+            factor3 = None
+            titulo3 = f"{'Saldo irregular (M$)' if usar_mm3 else 'Tasa de irregularidad (%)'} — {sector_t3}"
+            if real3:
+                defl = get_deflator()
+                if defl.get("empty", True):
+                    st.warning("No se pudo cargar el IPC: se muestra el saldo irregular nominal.")
+                else:
+                    factor3 = real_factors(_fechas_dt(fechas_ord), "M", defl)
+                    titulo3 = f"Saldo irregular (M$, {base_label(defl)}) — {sector_t3}"
+
+            df_series3 = _build_series(fechas_ord, usar_mm3, grupos3, factor=factor3)
 
             with st.container(border=True):
                 st.plotly_chart(
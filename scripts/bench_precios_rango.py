@@ -0,0 +1,163 @@
+"""
+Benchmark: acumulado de rango en macro_precios (loop por grupo vs. vectorizado).
+
+Corre sobre la tabla IPC completa de INDEC (todas las aperturas y regiones);
+si no hay red, usa una tabla sintética del mismo tamaño. Verifica además que
+los resultados sean idénticos a la implementación anterior.
+
+Uso:
+    python scripts/bench_precios_rango.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from pages.macro_precios import _range_accum_from_index, _range_accum_from_monthly_pct  # noqa: E402
+
+
+# ------------------------------------------------------------
+# Implementación anterior (referencia: loop por grupo)
+# ------------------------------------------------------------
+def _ref_from_index(df: pd.DataFrame, date_col: str, group_col: str, idx_col: str, start_date: pd.Timestamp) -> pd.Series:
+    """
+    Acumulado (rango): (Idx_t / Idx_base - 1)*100,
+    base = valor de índice en start_date; si no existe, usa el primer punto >= start_date.
+    """
+    out = pd.Series(index=df.index, dtype=float)
+    if df.empty:
+        return out
+
+    d = df[[date_col, group_col, idx_col]].copy()
+    d[date_col] = pd.to_datetime(d[date_col], errors="coerce")
+    d = d.dropna(subset=[date_col, group_col, idx_col]).sort_values([group_col, date_col])
+
+    for g, gg in d.groupby(group_col, sort=False):
+        gg = gg.sort_values(date_col)
+        base_row = gg[gg[date_col] == start_date]
+        if base_row.empty:
+            base_row = gg[gg[date_col] >= start_date].head(1)
+        if base_row.empty:
+            continue
+
+        base = float(base_row[idx_col].iloc[0])
+        if not np.isfinite(base) or base == 0:
+            continue
+
+        vals = (gg[idx_col].astype(float) / base - 1.0) * 100.0
+        out.loc[vals.index] = vals.values
+
+        base_idx = base_row.index[0]
+        out.loc[base_idx] = 0.0
+
+    return out
+
+
+def _ref_from_monthly_pct(df: pd.DataFrame, date_col: str, group_col: str, vm_col: str, start_date: pd.Timestamp) -> pd.Series:
+    """
+    Acumulado (rango) desde variación mensual:
+    - En start_date (o primer punto >= start_date) => 0%
+    - Luego acumula con producto de (1 + vm/100), arrancando con factor 1 en el base.
+    """
+    out = pd.Series(index=df.index, dtype=float)
+    if df.empty:
+        return out
+
+    d = df[[date_col, group_col, vm_col]].copy()
+    d[date_col] = pd.to_datetime(d[date_col], errors="coerce")
+    d = d.dropna(subset=[date_col, group_col, vm_col]).sort_values([group_col, date_col])
+
+    for g, gg in d.groupby(group_col, sort=False):
+        gg = gg.sort_values(date_col)
+
+        base_row = gg[gg[date_col] == start_date]
+        if base_row.empty:
+            base_row = gg[gg[date_col] >= start_date].head(1)
+        if base_row.empty:
+            continue
+
+        base_pos = gg.index.get_loc(base_row.index[0])
+        tail = gg.iloc[base_pos:].copy()
+        if tail.empty:
+            continue
+
+        factors = (1.0 + tail[vm_col].astype(float) / 100.0).replace([np.inf, -np.inf], np.nan).fillna(1.0)
+        factors.iloc[0] = 1.0
+        cum = factors.cumprod()
+        acc = (cum / cum.iloc[0] - 1.0) * 100.0
+
+        out.loc[acc.index] = acc.values
+        out.loc[tail.index[0]] = 0.0
+
+    return out
+
+
+# ============================================================
+# IPCA (ENGHo 2017/18) — base 100=2025
+# ============================================================
+DIV_CODES = list(range(1, 13))
+
+# ------------------------------------------------------------
+# Datos
+# ------------------------------------------------------------
+def _load_ipc() -> pd.DataFrame:
+    try:
+        from services.macro_data import get_ipc_indec_full
+
+        df = get_ipc_indec_full()
+        df["Grupo"] = df["Codigo"].astype(str) + "|" + df["Region"].astype(str)
+        print(f"IPC INDEC: {len(df):,} filas, {df['Grupo'].nunique()} aperturas x región")
+        return df
+    except Exception as e:
+        print(f"Sin IPC INDEC ({e}); tabla sintética")
+
+    rng = np.random.default_rng(0)
+    periods = pd.date_range("2017-01-01", "2025-12-01", freq="MS")
+    groups = [f"g{i:03d}" for i in range(7 * 45)]  # ~45 aperturas x 7 regiones
+    n = len(periods) * len(groups)
+    vm = rng.uniform(-1, 6, n)
+    return pd.DataFrame({
+        "Periodo": np.tile(periods, len(groups)),
+        "Grupo": np.repeat(groups, len(periods)),
+        "v_m_IPC": vm,
+        "Indice_IPC": 100 * np.exp(np.log1p(vm / 100).reshape(len(groups), -1).cumsum(axis=1)).ravel(),
+    })
+
+
+def _best(fn, *args, reps: int = 5) -> float:
+    best = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    df = _load_ipc()
+    start = pd.Timestamp("2020-01-01")
+
+    cases = [
+        ("desde índice", _ref_from_index, _range_accum_from_index, "Indice_IPC"),
+        ("desde v/m %", _ref_from_monthly_pct, _range_accum_from_monthly_pct, "v_m_IPC"),
+    ]
+    for label, ref, new, col in cases:
+        a = ref(df, "Periodo", "Grupo", col, start)
+        b = new(df, "Periodo", "Grupo", col, start)
+        same = a.equals(b)
+
+        t_ref = _best(ref, df, "Periodo", "Grupo", col, start)
+        t_new = _best(new, df, "Periodo", "Grupo", col, start)
+        print(
+            f"{label:14s} loop: {t_ref * 1000:8.1f} ms | vectorizado: {t_new * 1000:7.1f} ms "
+            f"(x{t_ref / t_new:.1f}) | idéntico: {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
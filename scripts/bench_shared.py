@@ -0,0 +1,118 @@
+"""
+Benchmark: costo por rerun de entregar un dataset grande a una página con
+st.cache_data (des-serializa una copia en cada llamada) vs. el dataset
+compartido de solo lectura de services/shared.py (un objeto por proceso;
+cada llamada recibe una copia superficial, sin copiar datos). Mide tiempo por llamada y memoria asignada por
+llamada (tracemalloc), con el cache ya lleno.
+
+Datasets: IPC INDEC sintético con la forma del CSV real (dtypes de
+services/dtypes.py) y el cubo de morosidad (assets/mora_por_actividad2.xlsx;
+si no está, se omite).
+
+Uso:
+    python scripts/bench_shared.py
+"""
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from services.dtypes import frame_bytes, lean_frame  # noqa: E402
+from services.shared import shared_dataset  # noqa: E402
+
+_DATA: dict = {}
+
+
+@st.cache_data(show_spinner=False)
+def _antes(name: str):
+    return _DATA[name]
+
+
+@shared_dataset("indec")
+def _ahora(name: str):
+    return _DATA[name]
+
+
+# ------------------------------------------------------------
+# Datasets
+# ------------------------------------------------------------
+def _ipc_sintetico() -> pd.DataFrame:
+    """~ serie_ipc_divisiones.csv: 6 regiones x 50 aperturas x meses desde 2016-12."""
+    per = pd.period_range("2016-12", "2026-08", freq="M")
+    regiones = ["Nacional", "GBA", "Pampeana", "Noreste", "Noroeste", "Patagonia"]
+    codigos = [str(i) for i in range(50)]
+    n = len(regiones) * len(codigos) * len(per)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Codigo": np.tile(np.repeat(codigos, len(per)), len(regiones)),
+        "Descripcion": np.tile(np.repeat([f"Apertura {c}" for c in codigos], len(per)), len(regiones)),
+        "Clasificador": "Nivel general y divisiones COICOP",
+        "Periodo": np.tile(per.to_timestamp(), len(regiones) * len(codigos)),
+        "Indice_IPC": 100 * np.exp(rng.normal(0.03, 0.01, n).cumsum() / 100),
+        "v_m_IPC": rng.normal(3, 1, n),
+        "v_i_a_IPC": rng.normal(40, 10, n),
+        "Region": np.repeat(regiones, len(codigos) * len(per)),
+    })
+    df["Codigo_num"] = pd.to_numeric(df["Codigo"], errors="coerce")
+    return lean_frame(df, "ipc_sintetico", category=["Codigo", "Descripcion", "Clasificador", "Region"])
+
+
+def _mora_cubo():
+    from pages.morosidad import MORA_PATH, _build_mora_cube, _mora_version
+
+    if not (ROOT / MORA_PATH).exists():
+        print(f"Sin {MORA_PATH}: se omite el cubo de morosidad")
+        return None
+    return {k: v for k, v in _build_mora_cube(_mora_version()).items()}
+
+
+def _bytes(obj) -> int:
+    if isinstance(obj, dict):
+        return sum(_bytes(v) for v in obj.values())
+    return frame_bytes(obj) if isinstance(obj, pd.DataFrame) else 0
+
+
+# ------------------------------------------------------------
+# Medición
+# ------------------------------------------------------------
+def _por_llamada(fn, name: str, reps: int = 20) -> tuple[float, float]:
+    """Mediana de (ms, MB asignados) por llamada, con el cache ya lleno."""
+    fn(name)
+    tiempos, asignado = [], []
+    tracemalloc.start()
+    for _ in range(reps):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        out = fn(name)
+        tiempos.append(time.perf_counter() - t0)
+        asignado.append(tracemalloc.get_traced_memory()[1] - base)
+        del out
+    tracemalloc.stop()
+    return statistics.median(tiempos) * 1000, statistics.median(asignado) / 2**20
+
+
+def main():
+    _DATA["ipc_indec"] = _ipc_sintetico()
+    cubo = _mora_cubo()
+    if cubo is not None:
+        _DATA["mora_cubo"] = cubo
+
+    print(f"{'dataset':<10} {'MB':>7} | {'cache_data':>18} | {'compartido':>18}")
+    for name, obj in _DATA.items():
+        mb = _bytes(obj) / 2**20
+        t0, m0 = _por_llamada(_antes, name)
+        t1, m1 = _por_llamada(_ahora, name)
+        print(f"{name:<10} {mb:>7.2f} | {t0:>7.2f}ms {m0:>7.2f}MB | {t1:>7.3f}ms {m1:>7.3f}MB")
+
+
+if __name__ == "__main__":
+    main()
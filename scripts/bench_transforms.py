@@ -0,0 +1,72 @@
+"""
+Benchmark: transformaciones por serie (patrón de las páginas) vs.
+services/transforms.py sobre un frame ancho.
+
+Uso:
+    python scripts/bench_transforms.py [n_series] [n_meses]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from services import transforms as tr  # noqa: E402
+
+
+def _per_series_yoy_mom(long_df: pd.DataFrame) -> dict:
+    """Patrón anterior: una serie a la vez, re-ordenando y re-coercionando."""
+    out = {}
+    for name, g in long_df.groupby("Serie"):
+        t = g[["Date", "Value"]].copy()
+        t["Date"] = pd.to_datetime(t["Date"], errors="coerce")
+        t["Value"] = pd.to_numeric(t["Value"], errors="coerce")
+        t = t.dropna(subset=["Date", "Value"]).sort_values("Date")
+        t["YoY"] = (t["Value"] / t["Value"].shift(12) - 1.0) * 100.0
+        t["MoM"] = (t["Value"] / t["Value"].shift(1) - 1.0) * 100.0
+        out[name] = t
+    return out
+
+
+def _wide_yoy_mom(long_df: pd.DataFrame) -> tuple:
+    w = tr.to_wide(long_df, series_col="Serie")
+    return tr.yoy(w), tr.mom(w)
+
+
+def _timeit(fn, *args, reps: int = 5) -> float:
+    best = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_months = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2000-01-01", periods=n_months, freq="MS")
+    long_df = pd.DataFrame({
+        "Date": np.tile(dates, n_series),
+        "Serie": np.repeat([f"s{i:03d}" for i in range(n_series)], n_months),
+        "Value": rng.uniform(80, 120, n_series * n_months),
+    })
+    # huecos aleatorios (1%)
+    long_df = long_df.sample(frac=0.99, random_state=0)
+
+    t_old = _timeit(_per_series_yoy_mom, long_df)
+    t_new = _timeit(_wide_yoy_mom, long_df)
+
+    print(f"{n_series} series x {n_months} meses (YoY + MoM)")
+    print(f"  por serie:   {t_old * 1000:8.1f} ms")
+    print(f"  frame ancho: {t_new * 1000:8.1f} ms   (x{t_old / t_new:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Graba historias OHLC de Yahoo como fixtures CSV para el proveedor "fixture".
+
+Uso:
+    python scripts/grabar_fixtures_mercado.py [carpeta_destino]
+
+Luego, en staging / load tests (sin red):
+    MARKET_DATA_PROVIDER=fixture MARKET_DATA_LATENCY_MS=250 streamlit run app.py
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from services.market_provider import DEFAULT_FIXTURES_DIR, record_fixtures  # noqa: E402
+
+
+# Tickers que usan las páginas de FX, Finanzas y Home
+TICKERS = [
+    # CCL proxy + Merval
+    "YPFD.BA", "YPF", "IMV.BA", "^MERV",
+    # visor de precios
+    "ARS=X", "BRL=X", "DX-Y.NYB", "^GSPC", "EWZ", "FXI", "BTC-USD",
+    "CL=F", "GC=F", "ZS=F", "ZW=F", "^TNX",
+    # ADRs argentinos
+    "BBAR", "BMA", "CAAP", "CEPU", "CRESY", "EDN", "GGAL", "GLOB", "IRS",
+    "LOMA", "MELI", "PAM", "SUPV", "TEO", "TGS", "TS", "TX",
+]
+
+
+def main():
+    dest = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FIXTURES_DIR
+    written = record_fixtures(TICKERS, root=dest, period="max")
+
+    missing = [t for t in TICKERS if t not in written]
+    print(f"OK: {len(written)} fixtures en {dest}")
+    if missing:
+        print(f"Sin datos (no grabados): {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Reporte de memoria por dataset: carga los datasets del tablero (fuera de
+Streamlit, caches en modo bare) y muestra la memoria de cada DataFrame
+antes y después de la política de dtypes de services/dtypes.py, y el
+estado del cache compartido (services/shared.py): MB por namespace contra
+su cuota y el presupuesto global.
+
+Uso:
+    python scripts/memory_report.py
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from pages.finanzas import _load_embi_long_from_bcra  # noqa: E402
+from pages.morosidad import _build_mora_cube, _mora_version  # noqa: E402
+from services.dtypes import memory_report  # noqa: E402
+from services.shared import cache_report  # noqa: E402
+from services.macro_data import (  # noqa: E402
+    get_calidad_cartera_long,
+    get_ipc_indec_full,
+    get_itcrm_excel_long,
+)
+
+LOADERS = {
+    "ipc_indec": get_ipc_indec_full,
+    "itcrm_long": get_itcrm_excel_long,
+    "calidad_cartera": get_calidad_cartera_long,
+    "embi_long": _load_embi_long_from_bcra,
+    "morosidad_cubo": lambda: _build_mora_cube(_mora_version()),
+}
+
+
+def main():
+    for name, fn in LOADERS.items():
+        try:
+            fn()
+        except Exception as e:  # fuente caída: se informa y se sigue
+            print(f"{name}: sin datos ({e})")
+
+    rep = memory_report()
+    if rep.empty:
+        print("Sin datasets cargados.")
+        return
+
+    total_antes = rep["antes_mb"].sum()
+    total_despues = rep["despues_mb"].sum()
+    with pd.option_context("display.width", 120):
+        print(rep.to_string(index=False))
+    print(
+        f"\nTotal: {total_antes:.2f} MB -> {total_despues:.2f} MB "
+        f"({(1 - total_despues / total_antes) * 100:.1f}% menos)"
+    )
+
+    cache = cache_report()
+    with pd.option_context("display.width", 120):
+        print("\nCache compartido:\n" + cache.to_string(index=False))
+    print(f"\nCache: {cache.attrs['total_mb']:.2f} MB de {cache.attrs['presupuesto_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
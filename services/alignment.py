@@ -0,0 +1,164 @@
+# services/alignment.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Motor de alineación as-of (series diarias)
+# - Claves de fecha int64 (días desde epoch): sin merges de pandas.
+# - Cada serie se ordena / deduplica UNA vez; el lookup es un
+#   searchsorted vectorizado sobre el calendario destino.
+# - Tolerancia (días), dirección y clip configurables por serie.
+# ============================================================
+_NAT_KEY = np.iinfo("int64").min
+
+
+def date_keys(dates) -> np.ndarray:
+    """Fechas (cualquier formato pandas) -> int64 días desde epoch. NaT -> _NAT_KEY."""
+    d = pd.DatetimeIndex(pd.to_datetime(dates, errors="coerce"))
+    if d.tz is not None:
+        d = d.tz_convert(None)
+    return d.values.astype("datetime64[D]").astype("int64")
+
+
+def keys_to_dates(keys: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(np.asarray(keys, dtype="int64").astype("datetime64[D]").astype("datetime64[ns]"))
+
+
+def series_from_df(df: pd.DataFrame, value_col: str, date_col: str = "Date") -> pd.Series:
+    """DataFrame Date/valor -> Series indexada por fecha (sin limpiar: lo hace el motor)."""
+    if df is None or df.empty or value_col not in df.columns or date_col not in df.columns:
+        return pd.Series(dtype="float64")
+    return pd.Series(df[value_col].to_numpy(), index=pd.to_datetime(df[date_col], errors="coerce"), name=value_col)
+
+
+def prepare(s: pd.Series, keep: str = "last") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Series -> (keys ordenadas y únicas, valores float64).
+    Duplicados: queda el último (keep="last") o el primero (keep="first").
+    Una TimeSeries (services/series.py) ya está limpia: se usan sus arrays.
+    """
+    if isinstance(getattr(s, "keys", None), np.ndarray):
+        return s.keys, s.values
+    if s is None or len(s) == 0:
+        return np.empty(0, dtype="int64"), np.empty(0, dtype="float64")
+
+    keys = date_keys(s.index)
+    vals = pd.to_numeric(pd.Series(s.to_numpy()), errors="coerce").to_numpy(dtype="float64")
+    ok = (keys != _NAT_KEY) & np.isfinite(vals)
+    keys, vals = keys[ok], vals[ok]
+
+    if keys.size > 1 and np.any(keys[1:] < keys[:-1]):
+        order = np.argsort(keys, kind="stable")
+        keys, vals = keys[order], vals[order]
+    if keys.size > 1:
+        new = keys[1:] != keys[:-1]
+        sel = np.r_[new, True] if keep == "last" else np.r_[True, new]
+        keys, vals = keys[sel], vals[sel]
+    return keys, vals
+
+
+def asof_lookup(
+    target: np.ndarray,
+    keys: np.ndarray,
+    vals: np.ndarray,
+    direction: str = "backward",
+    tolerance: int | None = None,
+    clip: bool = False,
+) -> np.ndarray:
+    """
+    Valor as-of para cada clave de `target` (int64, no requiere orden).
+    direction: "backward" | "forward" | "nearest"
+    tolerance: máx. distancia en días (None = sin límite; 0 = match exacto)
+    clip: sin valores fuera de [primera, última] fecha de la serie
+    """
+    target = np.asarray(target, dtype="int64")
+    out = np.full(target.shape, np.nan)
+    if keys.size == 0 or target.size == 0:
+        return out
+
+    n = keys.size
+    if direction == "backward":
+        idx = np.searchsorted(keys, target, side="right") - 1
+    elif direction == "forward":
+        idx = np.searchsorted(keys, target, side="left")
+    elif direction == "nearest":
+        right = np.clip(np.searchsorted(keys, target, side="left"), 0, n - 1)
+        left = np.clip(right - 1, 0, n - 1)
+        use_left = np.abs(target - keys[left]) <= np.abs(keys[right] - target)
+        idx = np.where(use_left, left, right)
+    else:
+        raise ValueError(f"direction inválida: {direction!r}")
+
+    valid = (idx >= 0) & (idx < n) & (target != _NAT_KEY)
+    idx = np.clip(idx, 0, n - 1)
+    if tolerance is not None:
+        valid &= np.abs(keys[idx] - target) <= int(tolerance)
+    if clip:
+        valid &= (target >= keys[0]) & (target <= keys[-1])
+
+    out[valid] = vals[idx[valid]]
+    return out
+
+
+def _per_series(param, name: str, default):
+    if isinstance(param, dict):
+        return param.get(name, default)
+    return default if param is None else param
+
+
+def align_asof(
+    series: dict[str, pd.Series],
+    calendar="union",
+    direction: str | dict[str, str] = "backward",
+    tolerance: int | dict[str, int | None] | None = None,
+    clip: bool | dict[str, bool] = False,
+    start=None,
+    end=None,
+) -> pd.DataFrame:
+    """
+    Alinea N series diarias sobre un calendario destino en una sola pasada.
+
+    series:   {nombre: Series indexada por fecha | TimeSeries}
+    calendar: "union" (fechas de todas) | "daily" (todos los días min..max)
+              | nombre de una de las series | fechas explícitas
+    direction / tolerance / clip: escalar o {nombre: valor}
+
+    Devuelve DataFrame: Date + una columna por serie (float64).
+    """
+    prepared = {name: prepare(s) for name, s in series.items()}
+
+    if isinstance(calendar, str) and calendar in prepared:
+        cal = prepared[calendar][0]
+    elif isinstance(calendar, str) and calendar in ("union", "daily"):
+        all_keys = [k for k, _ in prepared.values() if k.size]
+        if not all_keys:
+            cal = np.empty(0, dtype="int64")
+        elif calendar == "daily":
+            lo = min(int(k[0]) for k in all_keys)
+            hi = max(int(k[-1]) for k in all_keys)
+            cal = np.arange(lo, hi + 1, dtype="int64")
+        else:
+            cal = np.unique(np.concatenate(all_keys))
+    else:
+        cal = np.unique(date_keys(calendar))
+        cal = cal[cal != _NAT_KEY]
+
+    if start is not None:
+        cal = cal[cal >= date_keys([start])[0]]
+    if end is not None:
+        cal = cal[cal <= date_keys([end])[0]]
+
+    out = {"Date": keys_to_dates(cal)}
+    for name, (keys, vals) in prepared.items():
+        out[name] = asof_lookup(
+            cal,
+            keys,
+            vals,
+            direction=_per_series(direction, name, "backward"),
+            tolerance=_per_series(tolerance, name, None),
+            clip=_per_series(clip, name, False),
+        )
+    return pd.DataFrame(out)
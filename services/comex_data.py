@@ -1,8 +1,11 @@
 import io
+import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
 
+from services import transforms as tr
+
 # ✅ Este es el CSV FINAL (el que subiste)
 URL_ICA = "https://infra.datos.gob.ar/catalog/sspm/dataset/74/distribution/74.3/download/intercambio-comercial-argentino-mensual.csv"
 
@@ -63,3 +66,71 @@ def fetch_ica() -> pd.DataFrame:
     return df
 
 
+
+
+# ============================================================
+# Métricas por rubro (todas las columnas en una pasada)
+# - Frames anchos indexados por fecha, una columna por serie del ICA.
+# - yoy / ytd / rolling_12 por calendario (services/transforms.py).
+# - share: % de cada rubro de expo / impo sobre su total del mes.
+# - ultimo: una fila por columna con el valor del último mes de cada métrica.
+# - Mismo TTL que fetch_ica: se recalcula cuando se renueva el dataset.
+# ============================================================
+COMEX_METRICS = ["nivel", "yoy", "dif_12", "ytd", "rolling_12", "share"]
+
+
+def _shares(wide: pd.DataFrame) -> pd.DataFrame:
+    """% de cada rubro sobre expo_total / impo_total (NaN para el resto)."""
+    out = pd.DataFrame(np.nan, index=wide.index, columns=wide.columns)
+    for pref in ("expo", "impo"):
+        tot = f"{pref}_total"
+        if tot not in wide.columns:
+            continue
+        cols = [c for c in wide.columns if c.startswith(f"{pref}_") and c != tot]
+        den = wide[tot].where(wide[tot] != 0).to_numpy()[:, None]
+        out[cols] = wide[cols].to_numpy(dtype="float64") / den * 100.0
+    return out
+
+
+def comex_metrics(df: pd.DataFrame) -> dict:
+    """
+    ICA (fecha + columnas numéricas) -> {"data", <métrica>: frame ancho, "ultimo"}.
+    {} si no hay datos.
+    """
+    if df is None or df.empty or "fecha" not in df.columns:
+        return {}
+
+    data = df.copy()
+    data["fecha"] = pd.to_datetime(data["fecha"], errors="coerce")
+    data = data.dropna(subset=["fecha"]).sort_values("fecha")
+    if data.empty:
+        return {}
+
+    nivel = (data.drop_duplicates("fecha", keep="last")
+                 .set_index("fecha")
+                 .apply(pd.to_numeric, errors="coerce")
+                 .astype("float64"))
+
+    out = {
+        "data": data,
+        "nivel": nivel,
+        "yoy": tr.yoy(nivel, freq="M"),
+        "dif_12": nivel - tr.lag(nivel, 12, freq="M"),
+        "ytd": tr.ytd(nivel, freq="M", flow=True),
+        "rolling_12": tr.rolling_sum(nivel, 12, freq="M"),
+        "share": _shares(nivel),
+    }
+    out["ultimo"] = pd.DataFrame({k: out[k].iloc[-1] for k in COMEX_METRICS})
+    # ytd: al último mes con dato de cada columna (no al último mes del ICA)
+    has = nivel.notna().to_numpy()
+    pos = len(nivel) - 1 - has[::-1].argmax(axis=0)
+    ytd = out["ytd"].to_numpy()[pos, np.arange(nivel.shape[1])]
+    ytd[~has.any(axis=0)] = np.nan
+    out["ultimo"]["ytd"] = ytd
+    return out
+
+
+@st.cache_data(ttl=60 * 60 * 6, show_spinner=False)
+def get_comex_metrics() -> dict:
+    """Métricas de todas las series del ICA (ver comex_metrics)."""
+    return comex_metrics(fetch_ica())
@@ -0,0 +1,276 @@
+# services/comovement.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services import resample as rs
+from services import transforms as tr
+from services.alignment import series_from_df
+from services.ipi_data import cargar_ipi_excel, divisiones_cuadro5, procesar_serie_excel
+from services.macro_data import emae_sector_label, get_a3500_ts, get_emae_sectores_wide
+from services.market_data import get_ccl_ypf_df_fast
+from services.sipa_data import cargar_sipa_excel
+
+
+# ============================================================
+# Co-movimiento entre series mensuales del tablero
+# - Registro de grupos: cada loader devuelve un frame ancho mensual
+#   (fecha = día 1 del mes, una columna por serie, nombre "Grupo · serie").
+# - Alineación: calendario mensual completo entre la primera y la última
+#   fecha (huecos => NaN), así los rezagos por posición son meses.
+# - Correlación por pares con observaciones completas (pairwise), todas
+#   las series a la vez: sumas por producto de matrices / cumsum.
+#     rolling: matriz N x N para cada ventana de `window` meses completos
+#     lead/lag: corr(x_i[t], x_j[t + k]) para k en -L..L (k > 0: i adelanta a j)
+# - Cache por grupo (frame mensual) y por (series elegidas, medida, ventana,
+#   rezago máx., versión de datos).
+# ============================================================
+MEDIDAS = {
+    "yoy": "Variación interanual",
+    "mom": "Variación mensual",
+    "nivel": "Nivel",
+}
+MAX_SERIES = 30
+MIN_OBS_LAG = 24
+
+
+def _monthly(wide: pd.DataFrame) -> pd.DataFrame:
+    """Frame ancho -> índice día 1 del mes, sin duplicados, columnas numéricas."""
+    if wide is None or wide.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+    w = wide.apply(pd.to_numeric, errors="coerce")
+    w.index = pd.DatetimeIndex(pd.to_datetime(w.index, errors="coerce")).to_period("M").to_timestamp()
+    w = w[w.index.notna()]
+    w = w.groupby(level=0).last().sort_index()
+    w.index.name = "Date"
+    return w.dropna(axis=1, how="all")
+
+
+# ============================================================
+# Registro de grupos (loaders sobre los servicios cacheados)
+# ============================================================
+def _ipi_wide() -> pd.DataFrame:
+    """IPI manufacturero s.e. (Cuadro 5): nivel general + divisiones."""
+    _, df_c5 = cargar_ipi_excel()
+    if df_c5 is None or df_c5.empty:
+        return pd.DataFrame()
+    cols = {}
+    for idx, name in [(3, "Nivel general")] + divisiones_cuadro5(df_c5):
+        key = f"IPI · {name}"
+        if key in cols:
+            continue
+        s = procesar_serie_excel(df_c5, idx)
+        cols[key] = pd.Series(pd.to_numeric(s["valor"], errors="coerce").to_numpy(), index=s["fecha"])
+    return pd.DataFrame(cols)
+
+
+def _emae_wide() -> pd.DataFrame:
+    """EMAE por sectores (serie original)."""
+    w = get_emae_sectores_wide()
+    if w is None or w.empty:
+        return pd.DataFrame()
+    w = w.set_index("indice_tiempo")
+    w.columns = [f"EMAE · {emae_sector_label(c)}" for c in w.columns]
+    return w.loc[:, ~w.columns.duplicated()]
+
+
+def _sipa_wide() -> pd.DataFrame:
+    """Empleo registrado SIPA s.e.: total + sectores."""
+    df_total, _, df_sec_sa, _, _ = cargar_sipa_excel()
+    cols = {}
+    if not df_total.empty and "sa" in df_total.columns:
+        cols["SIPA · Total"] = pd.Series(df_total["sa"].to_numpy(), index=df_total["fecha"])
+    if not df_sec_sa.empty:
+        s = df_sec_sa.set_index("fecha")
+        for c in s.columns:
+            name = " ".join(str(c).split())
+            if "total" in name.lower() or f"SIPA · {name}" in cols:
+                continue
+            cols[f"SIPA · {name}"] = s[c]
+    return pd.DataFrame(cols)
+
+
+def _fx_wide() -> pd.DataFrame:
+    """Tipo de cambio: promedios mensuales de A3500 y CCL."""
+    cols = {}
+    fx = get_a3500_ts()
+    if not fx.empty:
+        cols["TC · Mayorista A3500"] = rs.to_monthly(fx, how="mean")
+    ccl = get_ccl_ypf_df_fast(period="max", prefer_adj=True)
+    if ccl is not None and not ccl.empty:
+        cols["TC · CCL"] = rs.to_monthly(series_from_df(ccl, "value"), how="mean")
+    return pd.DataFrame(cols)
+
+
+GRUPOS = {
+    "IPI manufacturero (s.e.)": _ipi_wide,
+    "EMAE por sectores": _emae_wide,
+    "Empleo registrado SIPA (s.e.)": _sipa_wide,
+    "Tipo de cambio": _fx_wide,
+}
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=len(GRUPOS), show_spinner=False)
+def _load_group(grupo: str) -> pd.DataFrame:
+    return _monthly(GRUPOS[grupo]())
+
+
+def load_group(grupo: str) -> pd.DataFrame:
+    """
+    Frame ancho mensual de un grupo del registro (vacío si la fuente falla).
+    Cacheado por grupo; un error no se cachea y se reintenta en el rerun.
+    """
+    try:
+        return _load_group(grupo)
+    except Exception:
+        return _monthly(None)
+
+
+# ============================================================
+# Motor (NumPy, sin loops por par)
+# ============================================================
+def _corr_from_sums(n, sx, sy, sxx, syy, sxy, min_obs: int) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        r = cov / np.sqrt(vx * vy)
+    r[(n < min_obs) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def _centered(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(valores centrados con 0 en los huecos, máscara de datos) — centrar evita cancelaciones."""
+    m = np.isfinite(x)
+    with np.errstate(invalid="ignore"):
+        mu = np.where(m.any(axis=0), np.nanmean(np.where(m, x, np.nan), axis=0), 0.0)
+    return np.where(m, x - mu, 0.0), m.astype("float64")
+
+
+def corr_matrix(a: np.ndarray, b: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """Correlación por pares (filas completas de cada par) entre columnas de a (T x N) y b (T x M)."""
+    a0, ma = _centered(a)
+    b0, mb = _centered(b)
+    return _corr_from_sums(
+        ma.T @ mb, a0.T @ mb, ma.T @ b0, (a0 * a0).T @ mb, ma.T @ (b0 * b0), a0.T @ b0, min_obs
+    )
+
+
+def rolling_corr(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    T x N -> T x N x N: correlación de cada par en la ventana que termina
+    en t. Solo ventanas con `window` meses completos para el par.
+    """
+    x0, m = _centered(x)
+    n, nx = x.shape[0], x.shape[1]
+    out = np.full((n, nx, nx), np.nan)
+    if n < window:
+        return out
+
+    def _roll(p: np.ndarray) -> np.ndarray:
+        c = np.cumsum(p, axis=0)
+        c[window:] = c[window:] - c[:-window]
+        return c[window - 1:]
+
+    mm = m[:, :, None] * m[:, None, :]
+    sx = _roll(x0[:, :, None] * m[:, None, :])
+    sxx = _roll((x0 * x0)[:, :, None] * m[:, None, :])
+    out[window - 1:] = _corr_from_sums(
+        _roll(mm), sx, sx.transpose(0, 2, 1), sxx, sxx.transpose(0, 2, 1),
+        _roll(x0[:, :, None] * x0[:, None, :]), window,
+    )
+    return out
+
+
+def lead_lag(x: np.ndarray, max_lag: int, min_obs: int = MIN_OBS_LAG) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (lags, cubo) con cubo[k, i, j] = corr(x_i[t], x_j[t + lags[k]]).
+    lag > 0: la serie i adelanta a la j.
+    """
+    lags = np.arange(-int(max_lag), int(max_lag) + 1)
+    n = x.shape[0]
+    cube = np.full((lags.size, x.shape[1], x.shape[1]), np.nan)
+    for k, lag in enumerate(lags):
+        if abs(lag) >= n:
+            continue
+        a, b = (x[: n - lag], x[lag:]) if lag >= 0 else (x[-lag:], x[: n + lag])
+        cube[k] = corr_matrix(a, b, min_obs=min_obs)
+    return lags, cube
+
+
+def best_lag(lags: np.ndarray, cube: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Rezago de máxima |corr| por par y su correlación (NaN si no hay datos)."""
+    absr = np.where(np.isfinite(cube), np.abs(cube), -1.0)
+    k = absr.argmax(axis=0)
+    r = np.take_along_axis(cube, k[None], axis=0)[0]
+    lag = np.where(np.isfinite(r), lags[k], np.nan)
+    return lag, r
+
+
+# ============================================================
+# Resultados cacheados
+# ============================================================
+def aligned_frame(frames, names) -> pd.DataFrame:
+    """Series elegidas (de los frames de load_group) sobre el calendario mensual completo."""
+    parts = [p for p in frames if p is not None and not p.empty]
+    if not parts:
+        return _monthly(None)
+    w = pd.concat(parts, axis=1)
+    w = w.loc[:, ~w.columns.duplicated()]
+    w = w[[c for c in names if c in w.columns]].dropna(how="all")
+    if w.empty:
+        return w
+    return w.reindex(pd.date_range(w.index.min(), w.index.max(), freq="MS", name="Date"))
+
+
+def _transform(wide: pd.DataFrame, medida: str) -> pd.DataFrame:
+    if medida == "yoy":
+        return tr.yoy(wide, freq="M")
+    if medida == "mom":
+        return tr.mom(wide, freq="M")
+    if medida == "nivel":
+        return wide.astype("float64")
+    raise ValueError(f"medida inválida: {medida!r} ({' | '.join(MEDIDAS)})")
+
+
+def frame_version(wide: pd.DataFrame) -> str:
+    """Versión de los datos alineados = forma + hash del contenido."""
+    if wide is None or wide.empty:
+        return "comov:vacío"
+    h = int(pd.util.hash_pandas_object(wide, index=True).sum())
+    return f"comov:{wide.shape}:{wide.index.max()}:{h}"
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=16, show_spinner=False)
+def _comovement(names: tuple, medida: str, window: int, max_lag: int, version: str, _wide: pd.DataFrame) -> dict:
+    """Clave de cache = (series, medida, ventana, rezago, versión). El frame no se hashea."""
+    data = _transform(_wide, medida).dropna(how="all")
+    x = data.to_numpy(dtype="float64")
+    lags, cube = lead_lag(x, max_lag)
+    lag_best, r_best = best_lag(lags, cube)
+    return {
+        "names": list(data.columns),
+        "dates": data.index,
+        "data": data,
+        "full": corr_matrix(x, x),
+        "roll": rolling_corr(x, int(window)),
+        "lags": lags,
+        "leadlag": cube,
+        "best_lag": lag_best,
+        "best_r": r_best,
+    }
+
+
+def get_comovement(frames, names, medida: str = "yoy", window: int = 24, max_lag: int = 12) -> dict:
+    """
+    Correlación móvil y matrices lead/lag de las series `names` (máx.
+    MAX_SERIES) tomadas de `frames` (los grupos ya cargados con
+    load_group). Revisitar la misma configuración sale del cache.
+    """
+    names = tuple(names)[:MAX_SERIES]
+    wide = aligned_frame(frames, names)
+    if wide.empty:
+        return {}
+    return _comovement(tuple(wide.columns), medida, int(window), int(max_lag), frame_version(wide), wide)
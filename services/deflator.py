@@ -0,0 +1,133 @@
+# services/deflator.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.alignment import date_keys, keys_to_dates
+from services.macro_data import get_ipc_bcra, get_ipc_nacional_nivel_general, ipc_version
+from services.resample import day_to_month, month_to_day
+
+
+# ============================================================
+# Deflactor IPC (pesos constantes)
+# - Índice mensual encadenado desde v_m del IPC: INDEC nacional nivel
+#   general; meses sin dato INDEC => IPC BCRA (id 27).
+# - Un hueco sin dato en ambas fuentes corta la cadena: los meses
+#   anteriores no son comparables con la base y quedan NaN.
+# - Índice diario: el nivel mensual (promedio del mes) se ancla al día 15
+#   e interpola geométricamente entre meses; después del último ancla se
+#   mantiene el último nivel.
+# - Base = último mes publicado: real = nominal * índice(base) / índice(t).
+# - Si falla la descarga de una fuente IPC: {"empty": True}; las páginas
+#   avisan y muestran la serie nominal.
+# - Todo se precalcula una vez por versión del IPC; por render solo queda
+#   un lookup por posición y una multiplicación.
+# ============================================================
+ANCHOR_DAY = 14  # días desde el 1° del mes (=> día 15)
+
+
+def _v_mensual(ipc: pd.DataFrame) -> pd.Series:
+    """IPC (Period, v_m_CPI decimal) -> Series indexada por mes desde 1970-01."""
+    if ipc is None or ipc.empty:
+        return pd.Series(dtype="float64")
+    t = ipc.dropna(subset=["Period", "v_m_CPI"])
+    months = day_to_month(date_keys(pd.PeriodIndex(t["Period"]).to_timestamp()))
+    s = pd.Series(t["v_m_CPI"].to_numpy(dtype="float64"), index=months)
+    return s[~s.index.duplicated(keep="last")].sort_index()
+
+
+def _chain(months: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Índice encadenado (último mes = 1). Antes de un hueco => NaN."""
+    g = 1.0 + v
+    ok = np.isfinite(g)
+    # el primer mes de la cadena es la base del índice: su propia v_m no se usa
+    start = 0 if ok.all() else int(np.flatnonzero(~ok)[-1]) + 1
+    level = np.full(months.size, np.nan)
+    if start < months.size:
+        c = np.cumprod(np.r_[1.0, g[start + 1:]])
+        level[start:] = c / c[-1]
+    return level
+
+
+def deflator_version(ipc_indec: pd.DataFrame, ipc_bcra: pd.DataFrame) -> str:
+    return f"defl:{ipc_version(ipc_indec)}|{ipc_version(ipc_bcra)}"
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=4, show_spinner=False)
+def _build_deflator(version: str, _ipc_indec: pd.DataFrame, _ipc_bcra: pd.DataFrame) -> dict:
+    """Clave de cache = versión de ambas fuentes IPC. Los DataFrames no se hashean."""
+    v = _v_mensual(_ipc_indec).combine_first(_v_mensual(_ipc_bcra))
+    if v.empty:
+        return {"empty": True}
+
+    months = np.arange(v.index.min(), v.index.max() + 1, dtype="int64")
+    level_m = _chain(months, v.reindex(months).to_numpy(dtype="float64"))
+    ok = np.isfinite(level_m)
+    months, level_m = months[ok], level_m[ok]
+
+    # grilla diaria: interpolación log-lineal entre anclas (día 15 de cada mes)
+    anchors = month_to_day(months) + ANCHOR_DAY
+    days = np.arange(anchors[0], anchors[-1] + 1, dtype="int64")
+    level_d = np.exp(np.interp(days, anchors, np.log(level_m)))
+
+    return {
+        "empty": False,
+        "base": keys_to_dates(month_to_day(months[-1:]))[0],
+        "month0": int(months[0]),
+        "factor_m": 1.0 / level_m,  # índice(base) / índice(mes)
+        "day0": int(days[0]),
+        "factor_d": 1.0 / level_d,
+        "mensual": pd.Series(level_m * 100.0, index=keys_to_dates(month_to_day(months)), name="IPC"),
+    }
+
+
+def get_deflator() -> dict:
+    """Deflactor precalculado (ver encabezado). Se recalcula solo si cambia alguna fuente IPC."""
+    try:
+        ipc_indec = get_ipc_nacional_nivel_general()
+        ipc_bcra = get_ipc_bcra()
+    except Exception:  # fuente caída (sin red, INDEC / BCRA fuera de servicio)
+        return {"empty": True}
+    return _build_deflator(deflator_version(ipc_indec, ipc_bcra), ipc_indec, ipc_bcra)
+
+
+def real_factors(dates, freq: str = "M", defl: dict | None = None) -> np.ndarray:
+    """índice(base) / índice(fecha) para cada fecha (NaN fuera del rango del IPC)."""
+    defl = get_deflator() if defl is None else defl
+    keys = date_keys(dates)
+    out = np.full(keys.shape, np.nan)
+    if defl.get("empty", True):
+        return out
+
+    if freq == "M":
+        f, pos = defl["factor_m"], day_to_month(keys) - defl["month0"]
+    elif freq == "D":
+        f, pos = defl["factor_d"], keys - defl["day0"]
+        # después del último ancla: último nivel
+        pos = np.where(pos >= f.size, f.size - 1, pos)
+    else:
+        raise ValueError(f"freq inválida: {freq!r} (M | D)")
+
+    ok = (pos >= 0) & (pos < f.size)
+    out[ok] = f[pos[ok]]
+    return out
+
+
+def to_real(values, dates, freq: str = "M", defl: dict | None = None) -> np.ndarray:
+    """
+    Valores nominales -> pesos constantes del mes base (alineado con `dates`).
+    freq="M": factor del mes de cada fecha; freq="D": índice diario interpolado.
+    Fechas fuera del rango del IPC => NaN.
+    """
+    return np.asarray(values, dtype="float64") * real_factors(dates, freq, defl)
+
+
+def base_label(defl: dict) -> str:
+    """'pesos de ago-2026' (mes base del deflactor)."""
+    if defl.get("empty", True):
+        return "pesos constantes"
+    meses = ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"]
+    b = defl["base"]
+    return f"pesos de {meses[b.month - 1]}-{b.year}"
@@ -0,0 +1,93 @@
+# services/dtypes.py
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Política de dtypes al ingestar (memoria residente de los caches)
+# - Texto repetido (columnas declaradas) -> category: un código int8/int16
+#   por fila en vez de un string por fila.
+# - Resto del texto en object -> dtype str (pandas >= 3: arrow, NaN como
+#   NaN; no el StringDtype con pd.NA, que cambiaría los filtros).
+# - Enteros -> el entero más chico que los contiene (sin pérdida).
+# - float32 solo en columnas declaradas: valores que solo se muestran y
+#   que los motores (alignment / pyramid / transforms) pasan a float64
+#   antes de operar. Todo lo que llega a un CSV de descarga, montos que se
+#   suman y bases de encadenamiento quedan float64 (float32 -> float64
+#   exporta 1234.5699462890625 en vez de 1234.57).
+# - Reporte por dataset (antes / después, memoria deep) en el proceso.
+# ============================================================
+_STR_DTYPE = "str"
+
+_REPORT: dict[str, dict] = {}
+_LOCK = threading.Lock()
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memoria del DataFrame (incluye índice y strings: deep=True)."""
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _is_text(s: pd.Series) -> bool:
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in ("string", "empty")
+
+
+def lean_frame(
+    df: pd.DataFrame,
+    name: str,
+    category: list | tuple = (),
+    float32: list | tuple = (),
+    keep: list | tuple = (),
+) -> pd.DataFrame:
+    """
+    Aplica la política de dtypes a `df` (devuelve un frame nuevo) y registra
+    la memoria antes / después bajo `name` (ver memory_report()).
+    keep: columnas que no se tocan (p. ej. montos enteros que se suman).
+    """
+    if df is None or df.empty:
+        return df
+
+    before = frame_bytes(df)
+    cols = {}
+    for c in df.columns:
+        s = df[c]
+        if c in keep:
+            cols[c] = s
+        elif c in category:
+            cols[c] = s.astype("category")
+        elif c in float32 and pd.api.types.is_float_dtype(s):
+            cols[c] = s.astype("float32")
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            cols[c] = pd.to_numeric(s, downcast="integer")
+        elif _is_text(s):
+            cols[c] = s.astype(_STR_DTYPE)
+        else:
+            cols[c] = s
+    out = pd.DataFrame(cols, index=df.index)
+
+    after = frame_bytes(out)
+    with _LOCK:
+        _REPORT[name] = {"filas": len(out), "antes": before, "despues": after}
+    return out
+
+
+def memory_report() -> pd.DataFrame:
+    """Memoria por dataset ingestado en este proceso (MB) y ahorro."""
+    with _LOCK:
+        rows = [{"dataset": k, **v} for k, v in _REPORT.items()]
+    if not rows:
+        return pd.DataFrame(columns=["dataset", "filas", "antes_mb", "despues_mb", "ahorro_pct"])
+
+    rep = pd.DataFrame(rows)
+    rep["antes_mb"] = rep["antes"] / 2**20
+    rep["despues_mb"] = rep["despues"] / 2**20
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rep["ahorro_pct"] = np.where(rep["antes"] > 0, (1 - rep["despues"] / rep["antes"]) * 100, np.nan)
+    rep = rep.sort_values("antes", ascending=False).reset_index(drop=True)
+    return rep[["dataset", "filas", "antes_mb", "despues_mb", "ahorro_pct"]].round(3)
@@ -81,3 +81,13 @@ def procesar_serie_excel(df: pd.DataFrame, col_idx: int) -> pd.DataFrame:
         )
     except Exception:
         return pd.DataFrame(columns=["fecha", "valor"])
+
+
+# columnas del Cuadro 5 que no son series
+IPI_NO_SERIE = ("", "Período", "IPI Manufacturero")
+
+
+def divisiones_cuadro5(df_c5: pd.DataFrame) -> list[tuple[int, str]]:
+    """(columna, nombre) de cada división en el Cuadro 5 (s.e.): columnas impares desde la 3."""
+    names = [str(x).strip() for x in df_c5.iloc[3].fillna("").tolist()]
+    return [(i, n) for i, n in enumerate(names) if i >= 3 and i % 2 != 0 and n not in IPI_NO_SERIE]
@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 import pandas as pd
 import requests
@@ -5,11 +7,18 @@ import streamlit as st
 from io import BytesIO
 from io import StringIO
 
+from services import resample as rs
+from services.dtypes import lean_frame
+from services.series import TimeSeries
+from services.shared import shared_dataset
+
 
 # ============================================================
 # Helper genérico (BCRA Monetarias) — PAGINADO ROBUSTO
+# - Dataset compartido de solo lectura (services/shared.py): lo consumen
+#   varias funciones / páginas por rerun; derivar antes de modificar.
 # ============================================================
-@st.cache_data(ttl=60 * 60)
+@shared_dataset("bcra", ttl=60 * 60)
 def get_monetaria_serie(id_variable: int) -> pd.DataFrame:
     """
     Descarga series del endpoint Monetarias/{id_variable}.
@@ -84,7 +93,7 @@ def get_monetaria_serie(id_variable: int) -> pd.DataFrame:
 # ============================================================
 # TC mayorista (A3500)
 # ============================================================
-@st.cache_data(ttl=60 * 60)
+@shared_dataset("bcra", ttl=60 * 60)
 def get_a3500() -> pd.DataFrame:
     """
     A3500: intentamos id=5 (como venías usando).
@@ -113,6 +122,19 @@ def get_a3500() -> pd.DataFrame:
     )
 
 
+# ============================================================
+# Series compactas (services/series.py): limpias una vez, compartidas
+# ============================================================
+@shared_dataset("bcra", ttl=60 * 60)
+def get_monetaria_ts(id_variable: int) -> TimeSeries:
+    return TimeSeries.from_frame(get_monetaria_serie(id_variable), "value", name=f"bcra:{id_variable}")
+
+
+@shared_dataset("bcra", ttl=60 * 60)
+def get_a3500_ts() -> TimeSeries:
+    return TimeSeries.from_frame(get_a3500(), "FX", freq="D", name="A3500", keep="first")
+
+
 # ============================================================
 # REM
 # ============================================================
@@ -144,7 +166,7 @@ def get_rem_last() -> pd.DataFrame:
 # ============================================================
 # IPC INDEC (para macro_precios.py)
 # ============================================================
-@st.cache_data(ttl=12 * 60 * 60)
+@shared_dataset("indec", ttl=12 * 60 * 60, pin=True)
 def get_ipc_indec_full() -> pd.DataFrame:
     url = "https://www.indec.gob.ar/ftp/cuadros/economia/serie_ipc_divisiones.csv"
     try:
@@ -166,7 +188,211 @@ def get_ipc_indec_full() -> pd.DataFrame:
     for c in ["Indice_IPC", "v_m_IPC", "v_i_a_IPC"]:
         df[c] = pd.to_numeric(df[c], errors="coerce")
 
-    return df.dropna(subset=["Periodo"]).sort_values("Periodo").reset_index(drop=True)
+    df = df.dropna(subset=["Periodo"]).sort_values("Periodo").reset_index(drop=True)
+    # índices / variaciones quedan float64: se encadenan (deflactor, IPCA)
+    return lean_frame(df, "ipc_indec", category=["Codigo", "Descripcion", "Clasificador", "Region"])
+
+
+IPC_LABEL_FIX = {"B": "Bienes", "S": "Servicios"}
+
+
+def _clean_ipc_code(codes: pd.Series) -> pd.Series:
+    """'1.0' -> '1' (códigos leídos como float); el resto igual. Vectorizado."""
+    s = codes.astype(str).str.strip()
+    drop = s.str.endswith(".0") & s.str.replace(".0", "", regex=False).str.isdigit()
+    return s.where(~drop, s.str[:-2]).str.strip()
+
+
+def _ipc_display_labels(codes: pd.Series, desc: pd.Series) -> pd.Series:
+    """Código 0 => 'Nivel general'; si no, descripción; si falta, B/S o el código."""
+    empty_desc = desc.astype(str).str.strip().str.lower().isin(["", "nan", "none"])
+    is_zero = codes.str.isdigit() & (pd.to_numeric(codes.where(codes.str.isdigit()), errors="coerce") == 0)
+
+    label = codes.map(IPC_LABEL_FIX).fillna(codes)
+    label = label.where(empty_desc, desc.astype(str).str.strip())
+    return label.where(~is_zero, "Nivel general")
+
+
+@st.cache_data(ttl=12 * 60 * 60)
+def get_ipc_nacional_precios() -> pd.DataFrame:
+    """
+    IPC Nacional listo para la página de precios (columnas derivadas una sola vez):
+    Codigo_str (limpio), Descripcion, Periodo normalizado, Label.
+    """
+    df = get_ipc_indec_full()
+    ipc = df[df["Region"] == "Nacional"].copy()
+    if ipc.empty:
+        return ipc
+
+    ipc["Codigo_str"] = _clean_ipc_code(ipc["Codigo"])
+    ipc["Descripcion"] = ipc["Descripcion"].astype(str).str.strip()
+    ipc["Periodo"] = pd.to_datetime(ipc["Periodo"], errors="coerce").dt.normalize()
+    ipc = ipc.dropna(subset=["Periodo"]).sort_values("Periodo")
+    ipc["Label"] = _ipc_display_labels(ipc["Codigo_str"], ipc["Descripcion"])
+    return ipc
+
+
+@st.cache_data(ttl=12 * 60 * 60)
+def get_ipc_label_catalog() -> dict:
+    """
+    Catálogo de aperturas IPC (Nacional), ordenado: Nivel general primero,
+    luego alfabético. Devuelve:
+      options: [Codigo_str], code_to_label: {codigo: label},
+      label_to_code: {label en minúsculas: codigo}
+    """
+    ipc = get_ipc_nacional_precios()
+    if ipc.empty:
+        return {"options": [], "code_to_label": {}, "label_to_code": {}}
+
+    sel = ipc[["Codigo_str", "Descripcion", "Label"]].drop_duplicates(["Codigo_str", "Descripcion"])
+    sel = sel.assign(ord0=(sel["Label"].str.strip().str.lower() != "nivel general").astype(int))
+    sel = sel.sort_values(["ord0", "Label"])
+
+    code_to_label = dict(zip(sel["Codigo_str"], sel["Label"]))
+    label_to_code: dict[str, str] = {}
+    for c, lab in code_to_label.items():
+        label_to_code.setdefault(str(lab).strip().lower(), c)
+
+    return {
+        "options": sel["Codigo_str"].tolist(),
+        "code_to_label": code_to_label,
+        "label_to_code": label_to_code,
+    }
+
+
+# ============================================================
+# IPCA (ENGHo 2017/18) — base 100=2025, incremental por release
+# - Versión de la fuente: filas + último período + índices del último mes.
+# - Meses nuevos: se agregan sin recalcular la historia.
+# - Historia completa solo si cambia la base (dato nuevo del año base,
+#   base incompleta) o si INDEC revisó meses ya procesados.
+# ============================================================
+IPCA_DIV_CODES = list(range(1, 13))
+IPCA_W_2017 = {
+    1: 22.7 / 100, 2: 2.0 / 100, 3: 6.8 / 100, 4: 14.5 / 100,
+    5: 5.5 / 100, 6: 6.4 / 100, 7: 14.3 / 100, 8: 5.1 / 100,
+    9: 8.6 / 100, 10: 3.1 / 100, 11: 6.6 / 100, 12: 4.4 / 100,
+}
+IPCA_BASE_YEAR = 2025
+_IPCA_COLS = ["Periodo", "Serie", "Indice", "v_m", "v_i_a"]
+
+
+def ipc_source_version(ipc_raw: pd.DataFrame) -> str:
+    if ipc_raw is None or ipc_raw.empty or "Periodo" not in ipc_raw.columns:
+        return "ipc:vacío"
+    last_p = ipc_raw["Periodo"].max()
+    last = pd.to_numeric(ipc_raw.loc[ipc_raw["Periodo"] == last_p, "Indice_IPC"], errors="coerce")
+    return f"ipc:{len(ipc_raw)}:{last_p}:{float(last.sum()):.6f}"
+
+
+def _ipca_divisions(ipc_raw: pd.DataFrame) -> pd.DataFrame:
+    """Nacional + divisiones COICOP 1..12 -> Periodo, Codigo_num, Indice_IPC."""
+    need = {"Periodo", "Codigo_num", "Indice_IPC", "Region", "Clasificador"}
+    if ipc_raw is None or ipc_raw.empty or not need.issubset(set(ipc_raw.columns)):
+        return pd.DataFrame(columns=["Periodo", "Codigo_num", "Indice_IPC"])
+
+    d = ipc_raw[
+        (ipc_raw["Region"] == "Nacional")
+        & (ipc_raw["Clasificador"].str.contains("divisiones", case=False, na=False))
+    ]
+    d = pd.DataFrame({
+        "Periodo": pd.to_datetime(d["Periodo"], errors="coerce").dt.to_period("M").dt.to_timestamp(how="start"),
+        "Codigo_num": pd.to_numeric(d["Codigo_num"], errors="coerce"),
+        "Indice_IPC": pd.to_numeric(d["Indice_IPC"], errors="coerce"),
+    })
+    d = d[d["Codigo_num"].isin(IPCA_DIV_CODES)].dropna()
+    d["Codigo_num"] = d["Codigo_num"].astype(int)
+    return d
+
+
+def _ipca_wide(d: pd.DataFrame) -> pd.DataFrame:
+    w = d.pivot_table(index="Periodo", columns="Codigo_num", values="Indice_IPC", aggfunc="last").sort_index()
+    return w.reindex(columns=IPCA_DIV_CODES)
+
+
+def _ipca_frame(periods, level: np.ndarray, prev_level: np.ndarray | None = None) -> pd.DataFrame:
+    """Arma Periodo/Serie/Indice/v_m/v_i_a; prev_level = últimos 12 niveles previos (append)."""
+    lv = np.asarray(level, dtype=float)
+    hist = lv if prev_level is None else np.r_[prev_level, lv]
+    s = pd.Series(hist)
+    v_m = (s.pct_change(1, fill_method=None) * 100).to_numpy()[-len(lv):]
+    v_i_a = (s.pct_change(12, fill_method=None) * 100).to_numpy()[-len(lv):]
+    return pd.DataFrame({"Periodo": periods, "Serie": "ipca", "Indice": lv, "v_m": v_m, "v_i_a": v_i_a})
+
+
+class _IpcaIncremental:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wide: pd.DataFrame | None = None     # divisiones ya procesadas
+        self.base_avg: pd.Series | None = None
+        self.base_full: bool = False              # base = promedio completo del año base
+        self.out = pd.DataFrame(columns=_IPCA_COLS)
+
+    def _full(self, wide: pd.DataFrame) -> pd.DataFrame:
+        base_avg = wide.loc[wide.index.year == IPCA_BASE_YEAR].mean(axis=0)
+        self.base_full = not base_avg.isna().any()
+        if not self.base_full:
+            base_avg = wide.mean(axis=0)   # fallback: promedio total
+        self.base_avg = base_avg
+        self.wide = wide
+
+        wvec = np.array([IPCA_W_2017[c] for c in IPCA_DIV_CODES], dtype=float)
+        level = 100.0 * (wide.divide(base_avg, axis=1).to_numpy() @ wvec)
+        self.out = _ipca_frame(wide.index, level)
+        return self.out
+
+    def update(self, ipc_raw: pd.DataFrame) -> pd.DataFrame:
+        d = _ipca_divisions(ipc_raw)
+        with self._lock:
+            if d.empty:
+                self.wide, self.out = None, pd.DataFrame(columns=_IPCA_COLS)
+                return self.out
+
+            if self.wide is None or self.wide.empty:
+                return self._full(_ipca_wide(d))
+
+            last = self.wide.index.max()
+            old = _ipca_wide(d[d["Periodo"] <= last])
+            new = _ipca_wide(d[d["Periodo"] > last])
+
+            # revisión de meses ya procesados => historia completa
+            if not old.equals(self.wide):
+                return self._full(_ipca_wide(d))
+            if new.empty:
+                return self.out
+
+            # base cambia (dato nuevo del año base o base incompleta) => historia completa
+            if not self.base_full or (new.index.year == IPCA_BASE_YEAR).any():
+                return self._full(pd.concat([self.wide, new]))
+
+            wvec = np.array([IPCA_W_2017[c] for c in IPCA_DIV_CODES], dtype=float)
+            level = 100.0 * (new.divide(self.base_avg, axis=1).to_numpy() @ wvec)
+            add = _ipca_frame(new.index, level, prev_level=self.out["Indice"].to_numpy()[-12:])
+
+            self.wide = pd.concat([self.wide, new])
+            self.out = pd.concat([self.out, add], ignore_index=True)
+            return self.out
+
+
+@st.cache_resource(show_spinner=False)
+def _ipca_store() -> _IpcaIncremental:
+    """Estado incremental del IPCA, uno por proceso."""
+    return _IpcaIncremental()
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=4, show_spinner=False)
+def _ipca_for_version(source_version: str, _ipc_raw: pd.DataFrame) -> pd.DataFrame:
+    return _ipca_store().update(_ipc_raw).copy()
+
+
+def get_ipca_base_2025() -> pd.DataFrame:
+    """
+    IPCA (ENGHo 2017/18) desde IPC INDEC por divisiones (1..12).
+    Base: promedio 2025 = 100. Output: Periodo, Serie, Indice, v_m, v_i_a
+    Se calcula una vez por versión de la fuente IPC.
+    """
+    ipc_raw = get_ipc_indec_full()
+    return _ipca_for_version(ipc_source_version(ipc_raw), ipc_raw)
 
 
 @st.cache_data(ttl=12 * 60 * 60)
@@ -242,22 +468,82 @@ def build_bands_2026(bands_2025: pd.DataFrame, rem: pd.DataFrame, ipc: pd.DataFr
     m["v_m_dec"] = np.where(m["v_m_CPI"].notna(), m["v_m_CPI"], m["v_m_REM"] / 100)
 
     end_month = m.loc[m["v_m_REM"].notna(), "Period"].max() + 2
-    b = pd.DataFrame({"Period": pd.period_range("2026-01", end_month, freq="M")})
-    b["ref"] = b["Period"] - 2
-    b = b.merge(m[["Period", "v_m_dec"]].rename(columns={"Period": "ref"}), on="ref", how="left")
+
+    # la inflación del mes t mueve las bandas del mes t+2: se corre el índice
+    # mensual y se mapea a días sin armar calendario + merge por Period
+    v_m = pd.Series(m["v_m_dec"].to_numpy(), index=pd.PeriodIndex(m["Period"] + 2).to_timestamp())
+    v_d = rs.monthly_to_daily(v_m, start="2026-01-01", end=end_month.to_timestamp("M"), how="step")
 
     lower0 = bands_2025.loc[bands_2025["Date"] == "2025-12-31", "lower"].iloc[0]
     upper0 = bands_2025.loc[bands_2025["Date"] == "2025-12-31", "upper"].iloc[0]
 
-    cal = pd.DataFrame({"Date": pd.date_range("2026-01-01", b["Period"].max().to_timestamp("M"), freq="D")})
-    cal["Period"] = cal["Date"].dt.to_period("M")
-    cal = cal.merge(b[["Period", "v_m_dec"]], on="Period", how="left")
+    r_d = (1 + v_d) ** (1 / 30) - 1
+    return pd.DataFrame({
+        "Date": v_d.index,
+        "lower": (lower0 * (1 - r_d).cumprod()).to_numpy(),
+        "upper": (upper0 * (1 + r_d).cumprod()).to_numpy(),
+    })
+
+
+# ============================================================
+# Bandas cacheadas por versión de insumos
+# REM e IPC cambian una vez por mes: la serie de bandas se calcula
+# una sola vez por par (versión REM, versión IPC) y se reutiliza.
+# ============================================================
+BANDS_START = "2025-04-14"
+BANDS_2025_END = "2025-12-31"
+BANDS_LOWER0 = 1000.0
+BANDS_UPPER0 = 1400.0
+
+
+def rem_version(rem: pd.DataFrame) -> str:
+    """Versión del REM = fecha de pronóstico + último período publicado."""
+    if rem is None or rem.empty:
+        return "rem:vacío"
+    fp = pd.to_datetime(rem.get("Fecha de pronóstico"), errors="coerce")
+    fp = fp.max() if fp is not None else pd.NaT
+    return f"rem:{fp}:{rem['Date'].max()}:{len(rem)}"
+
+
+def ipc_version(ipc: pd.DataFrame) -> str:
+    """Versión del IPC = último período + su valor (cambia con cada dato nuevo)."""
+    if ipc is None or ipc.empty:
+        return "ipc:vacío"
+    last = ipc.iloc[-1]
+    return f"ipc:{last['Period']}:{float(last['v_m_CPI']):.6f}:{len(ipc)}"
+
+
+@st.cache_data(ttl=7 * 24 * 60 * 60, max_entries=8, show_spinner=False)
+def _get_fx_bands_cached(rem_v: str, ipc_v: str, _rem: pd.DataFrame, _ipc: pd.DataFrame) -> pd.DataFrame:
+    """Clave de cache = (rem_v, ipc_v). Los DataFrames no se hashean."""
+    bands_2025 = build_bands_2025(BANDS_START, BANDS_2025_END, BANDS_LOWER0, BANDS_UPPER0)
+    bands_2026 = build_bands_2026(bands_2025, _rem, _ipc)
+
+    bands = pd.concat([bands_2025, bands_2026], ignore_index=True)
+    bands["Date"] = pd.to_datetime(bands["Date"], errors="coerce").dt.normalize()
+    return (
+        bands.dropna(subset=["Date", "lower", "upper"])
+        .drop_duplicates(subset=["Date"], keep="last")
+        .sort_values("Date")
+        .reset_index(drop=True)
+    )
+
 
-    r_d = (1 + cal["v_m_dec"]) ** (1 / 30) - 1
-    cal["lower"] = lower0 * (1 - r_d).cumprod()
-    cal["upper"] = upper0 * (1 + r_d).cumprod()
+def get_fx_bands(start=None, end=None) -> pd.DataFrame:
+    """
+    Bandas cambiarias (Date, lower, upper) 2025 + 2026 (REM/IPC).
+    Se recalculan solo si cambia la versión del REM o del IPC.
+    start / end: ventana visible (el resto no se envía al gráfico).
+    """
+    rem = get_rem_last()
+    ipc = get_ipc_bcra()
+    bands = _get_fx_bands_cached(rem_version(rem), ipc_version(ipc), rem, ipc)
 
-    return cal[["Date", "lower", "upper"]]
+    if start is not None:
+        bands = bands[bands["Date"] >= pd.Timestamp(start)]
+    if end is not None:
+        bands = bands[bands["Date"] <= pd.Timestamp(end)]
+    return bands.reset_index(drop=True)
 
 
 # ============================================================
@@ -296,7 +582,8 @@ def get_itcrm_excel_long() -> pd.DataFrame:
         .sort_values(["Serie", "Date"])
         .reset_index(drop=True)
     )
-    return long_df
+    # Value queda float64: llega al CSV de descarga del TCRM
+    return lean_frame(long_df, "itcrm_long", category=["Serie"])
 
 
 # ============================================================
@@ -357,7 +644,7 @@ def _parse_datos_gob_series_csv(csv_text: str, series_id: str) -> pd.DataFrame:
         return pd.DataFrame(columns=["Date", "Value"])
 
 
-@st.cache_data(ttl=12 * 60 * 60)
+@shared_dataset("datos_gob", ttl=12 * 60 * 60)
 def get_datos_gob_series(series_id: str) -> pd.DataFrame:
     """
     Descarga una serie puntual desde datos.gob.ar.
@@ -393,7 +680,7 @@ def get_datos_gob_series(series_id: str) -> pd.DataFrame:
 
 EMAE_XLS_URL = "https://www.indec.gob.ar/ftp/cuadros/economia/sh_emae_mensual_base2004.xls"
 
-@st.cache_data(ttl=12 * 60 * 60)
+@shared_dataset("indec", ttl=12 * 60 * 60, pin=True)
 def get_emae_excel_full() -> pd.DataFrame:
     """
     Devuelve:
@@ -822,24 +1109,145 @@ def get_emae_sectores_wide() -> pd.DataFrame:
         st.warning(f"EMAE sectores CSV error: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=12 * 60 * 60)
-def get_emae_sectores_long() -> pd.DataFrame:
-    """
-    Devuelve formato largo:
-      Date, Sector, Value
-    """
+
+# ============================================================
+# EMAE por sectores — motor de comparación A / B
+# - Matriz fecha x sector (float64), armada una vez por versión de datos.
+# - compare(mode, a, b): A, B y %Δ = (A/B - 1) * 100 de TODOS los sectores
+#   con operaciones de arrays. Resultados memorizados por (mode, a, b).
+#   mode:
+#     "mensual": a, b = fechas (nivel del mes)
+#     "acum":    a, b = años (promedio ene..último mes disponible)
+#     "anual":   a, b = años (promedio del año completo)
+# ============================================================
+EMAE_SECTOR_LABELS = {
+    "admin_publica_planes_seguridad_social_afiliacion_obligatoria": "Administración pública / planes / seguridad social",
+    "ensenianza": "Enseñanza",
+    "impuestos_netos_subsidios": "Impuestos netos de subsidios",
+    "comercio_mayorista_minorista_reparaciones": "Comercio mayorista/minorista y reparaciones",
+    "electricidad_gas_agua": "Electricidad, gas y agua",
+    "explotacion_minas_canteras": "Explotación de minas y canteras",
+    "otras_actividades_servicios_comunitarias_sociales_personales": "Otros servicios comunitarios, sociales y personales",
+    "servicios_sociales_salud": "Servicios sociales y salud",
+    "transporte_comunicaciones": "Transporte y comunicaciones",
+    "actividades_inmobiliarias_empresariales_alquiler": "Act. inmobiliarias, empresariales y alquiler",
+    "hoteles_restaurantes": "Hoteles y restaurantes",
+    "industria_manufacturera": "Industria manufacturera",
+    "agricultura_ganaderia_caza_silvicultura": "Agricultura, ganadería, caza y silvicultura",
+}
+
+
+def emae_sector_label(s: str) -> str:
+    s = (s or "").strip()
+    if not s:
+        return s
+    if s in EMAE_SECTOR_LABELS:
+        return EMAE_SECTOR_LABELS[s]
+    return s.replace("_", " ").capitalize()
+
+
+def emae_sectores_version(wide: pd.DataFrame) -> str:
+    """Versión del EMAE por sectores = filas + última fecha + suma de la última fila."""
+    if wide is None or wide.empty or "indice_tiempo" not in wide.columns:
+        return "emae_sec:vacío"
+    last = wide.iloc[-1].drop("indice_tiempo")
+    total = pd.to_numeric(last, errors="coerce").sum()
+    return f"emae_sec:{len(wide)}:{wide['indice_tiempo'].max()}:{float(total):.6f}"
+
+
+class EmaeSectorPanel:
+    MODES = ("mensual", "acum", "anual")
+
+    def __init__(self, wide: pd.DataFrame):
+        w = wide.set_index("indice_tiempo")
+        w.index = pd.to_datetime(w.index, errors="coerce")
+        w = w[w.index.notna()].apply(pd.to_numeric, errors="coerce")
+        w = w.loc[:, sorted(w.columns)]
+        w = w[w.notna().any(axis=1)].sort_index()
+
+        self.dates = w.index
+        self.sectors = np.asarray(w.columns, dtype=object)
+        self.labels = np.asarray([emae_sector_label(s) for s in self.sectors], dtype=object)
+        self.values = w.to_numpy(dtype="float64")
+
+        self._year = self.dates.year.to_numpy()
+        self._month = self.dates.month.to_numpy()
+        self.max_date = self.dates.max() if len(self.dates) else pd.NaT
+        self.last_month = int(self.max_date.month) if len(self.dates) else 12
+
+        self._lock = threading.Lock()
+        self._memo: dict[tuple, pd.DataFrame] = {}
+
+    @property
+    def empty(self) -> bool:
+        return self.values.size == 0
+
+    def years(self) -> list[int]:
+        """Años con datos (más reciente primero)."""
+        return sorted(set(self._year.tolist()), reverse=True)
+
+    def month_dates(self, month: int | None = None) -> list[pd.Timestamp]:
+        """Fechas del mes `month` (default: último mes disponible), más reciente primero."""
+        m = self.last_month if month is None else int(month)
+        return sorted(self.dates[self._month == m], reverse=True)
+
+    def _rows(self, mode: str, period) -> np.ndarray:
+        if mode == "mensual":
+            return self.dates == pd.Timestamp(period)
+        if mode == "acum":
+            return (self._year == int(period)) & (self._month <= self.last_month)
+        if mode == "anual":
+            return self._year == int(period)
+        raise ValueError(f"mode inválido: {mode!r} ({' | '.join(self.MODES)})")
+
+    def level(self, mode: str, period) -> np.ndarray:
+        """Promedio por sector de las filas del período (NaN si no hay datos)."""
+        v = self.values[self._rows(mode, period)]
+        n = np.isfinite(v).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, np.nansum(v, axis=0) / n, np.nan)
+
+    def compare(self, mode: str, a, b) -> pd.DataFrame:
+        """
+        Sector, Sector_label, A, B, pct (solo sectores con A y B > 0),
+        ordenado por pct descendente.
+        """
+        key = (mode, str(a), str(b))
+        with self._lock:
+            hit = self._memo.get(key)
+        if hit is not None:
+            return hit.copy()
+
+        A = self.level(mode, a)
+        B = self.level(mode, b)
+        ok = np.isfinite(A) & np.isfinite(B) & (A > 0) & (B > 0)
+        out = pd.DataFrame({
+            "Sector": self.sectors[ok],
+            "A": A[ok],
+            "B": B[ok],
+            "pct": (A[ok] / B[ok] - 1.0) * 100.0,
+            "Sector_label": self.labels[ok],
+        })
+        out = out.sort_values("pct", ascending=False).reset_index(drop=True)
+
+        with self._lock:
+            self._memo[key] = out
+        return out.copy()
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _emae_sector_panel(version: str, _wide: pd.DataFrame) -> EmaeSectorPanel:
+    return EmaeSectorPanel(_wide)
+
+
+def get_emae_sector_panel() -> EmaeSectorPanel | None:
+    """Motor de comparación A / B del EMAE por sectores (None si no hay datos)."""
     wide = get_emae_sectores_wide()
-    if wide is None or wide.empty:
-        return pd.DataFrame(columns=["Date", "Sector", "Value"])
+    if wide is None or wide.empty or "indice_tiempo" not in wide.columns:
+        return None
+    panel = _emae_sector_panel(emae_sectores_version(wide), wide)
+    return None if panel.empty else panel
 
-    long_df = (
-        wide.melt(id_vars=["indice_tiempo"], var_name="Sector", value_name="Value")
-        .rename(columns={"indice_tiempo": "Date"})
-        .dropna(subset=["Date", "Value"])
-        .sort_values(["Sector", "Date"])
-        .reset_index(drop=True)
-    )
-    return long_df
 
 # ============================================================
 # BCRA — Calidad de cartera por líneas
@@ -919,13 +1327,14 @@ def get_calidad_cartera_long() -> pd.DataFrame:
 
             dfs.append(tmp)
 
-        return (
+        cartera = (
             pd.concat(dfs, ignore_index=True)
             [["Date", "agente", "concepto", "value"]]
             .dropna(subset=["Date", "agente", "concepto", "value"])
             .sort_values(["agente", "concepto", "Date"])
             .reset_index(drop=True)
         )
+        return lean_frame(cartera, "calidad_cartera", category=["agente", "concepto"])
 
     except Exception as e:
         st.warning(f"BCRA Calidad de cartera error: {e}")
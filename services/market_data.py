@@ -4,52 +4,22 @@ from __future__ import annotations
 import pandas as pd
 import streamlit as st
 
-# yfinance opcional
-try:
-    import yfinance as yf
-except Exception:
-    yf = None
+from services.market_provider import period_start
+from services.shared import shared_dataset
+from services.yahoo_scheduler import pick_close, yahoo_fetch
 
 
-
-
-
-import time
-
 def _history_one(ticker: str, start: str) -> pd.DataFrame:
-    if yf is None:
-        raise RuntimeError("yfinance no está disponible (pip install yfinance).")
-
-    t = yf.Ticker(ticker)
-
-    last_err = None
-    for _ in range(2):  # 2 intentos
-        try:
-            df = t.history(start=start, auto_adjust=False)  # daily
-            if df is None or df.empty:
-                raise RuntimeError(f"Yahoo devolvió vacío para {ticker}")
-            df = df.copy()
-
-            idx = pd.to_datetime(df.index, errors="coerce")
-            # quitar tz solo si existe
-            try:
-                if getattr(idx, "tz", None) is not None:
-                    idx = idx.tz_convert(None)
-            except Exception:
-                try:
-                    idx = idx.tz_localize(None)
-                except Exception:
-                    pass
-
-            df.index = idx
-            return df
-
-        except Exception as e:
-            last_err = e
-            time.sleep(0.3)  # micro pausa
+    # vía scheduler: proveedor del entorno (Yahoo o fixtures), con reintentos
+    try:
+        df = yahoo_fetch([ticker], start=start).get(ticker)
+    except Exception as e:
+        raise RuntimeError(f"history() falló para {ticker}: {e}")
 
-    # IMPORTANTE: tirar error para NO cachear vacío
-    raise RuntimeError(f"history() falló para {ticker}: {last_err}")
+    if df is None or df.empty:
+        # IMPORTANTE: tirar error para NO cachear vacío
+        raise RuntimeError(f"Yahoo devolvió vacío para {ticker}")
+    return df
 
 
 
@@ -67,36 +37,73 @@ def _pick_price_single(df: pd.DataFrame, prefer_adj: bool = False) -> pd.Series:
     raise KeyError(f"No encuentro columnas de precio. cols={list(df.columns)}")
 
 
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
+# ============================================================
+# CCL proxy YPF — serie canónica
+# Una sola descarga (period="max") de YPFD.BA / YPF, cerrada y ajustada.
+# Todas las variantes (period/start, prefer_adj) salen por slicing.
+# ============================================================
+CCL_TICKER_ARS = "YPFD.BA"
+CCL_TICKER_USD = "YPF"
+
+@shared_dataset("mercado", ttl=60 * 60, pin=True)
+def _ccl_ypf_base() -> pd.DataFrame:
+    """
+    Serie canónica diaria (historia completa), cacheada una sola vez.
+    Índice: Date. Columnas:
+      YPF_ARS, YPF_USD, YPF_ARS_ADJ, YPF_USD_ADJ, CCL, CCL_ADJ
+    Tira error si Yahoo no devuelve nada (así NO se cachea vacío).
+    """
+    # scheduler: se agrupa con otros pedidos period="max" (ej. Merval en macro_home)
+    data = yahoo_fetch([CCL_TICKER_ARS, CCL_TICKER_USD], period="max")
+    ars = data.get(CCL_TICKER_ARS)
+    usd = data.get(CCL_TICKER_USD)
+
+    df = pd.concat(
+        {
+            "YPF_ARS": pick_close(ars),
+            "YPF_USD": pick_close(usd),
+            "YPF_ARS_ADJ": pick_close(ars, prefer_adj=True),
+            "YPF_USD_ADJ": pick_close(usd, prefer_adj=True),
+        },
+        axis=1,
+    ).sort_index()
+    df.index.name = "Date"
+
+    if df[["YPF_ARS", "YPF_USD"]].dropna().empty:
+        # IMPORTANTE: tirar error para NO cachear vacío
+        raise RuntimeError("CCL YPF: download devolvió vacío para YPFD.BA/YPF")
+
+    inf = [float("inf"), -float("inf")]
+    df["CCL"] = (df["YPF_ARS"] / df["YPF_USD"]).replace(inf, float("nan"))
+    df["CCL_ADJ"] = (df["YPF_ARS_ADJ"] / df["YPF_USD_ADJ"]).replace(inf, float("nan"))
+    return df
+
+
+def _ccl_base_col(col: str, start=None) -> pd.Series:
+    """Columna de la serie canónica, sin NaN, desde `start` (inclusive)."""
+    s = _ccl_ypf_base()[col].dropna()
+    if start is not None:
+        s = s.loc[pd.Timestamp(start):]
+    return s
+
+
 def get_ypf_ars_history(start: str = "2000-01-01", prefer_adj: bool = False) -> pd.Series:
-    df = _history_one("YPFD.BA", start=start)
-    s = _pick_price_single(df, prefer_adj=prefer_adj)
-    s.name = "YPF_ARS"
-    return s.dropna()
+    s = _ccl_base_col("YPF_ARS_ADJ" if prefer_adj else "YPF_ARS", start=start)
+    return s.rename("YPF_ARS")
 
 
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
 def get_ypf_usd_history(start: str = "1993-01-01", prefer_adj: bool = False) -> pd.Series:
-    df = _history_one("YPF", start=start)
-    s = _pick_price_single(df, prefer_adj=prefer_adj)
-    s.name = "YPF_USD"
-    return s.dropna()
+    s = _ccl_base_col("YPF_USD_ADJ" if prefer_adj else "YPF_USD", start=start)
+    return s.rename("YPF_USD")
 
 
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
 def get_ccl_ypf_history(start: str = "2000-01-01", prefer_adj: bool = False) -> pd.Series:
     """
     CCL proxy diario: YPFD.BA (ARS) / YPF (USD)
+    Derivado de la serie canónica (sin descarga extra).
     """
-    s_ars = get_ypf_ars_history(start=start, prefer_adj=prefer_adj)
-    s_usd = get_ypf_usd_history(start="1993-01-01", prefer_adj=prefer_adj)
-
-    df = pd.concat([s_ars, s_usd], axis=1, join="inner").dropna()
-    df["CCL_YPF"] = df["YPF_ARS"] / df["YPF_USD"]
-
-    out = df["CCL_YPF"].replace([float("inf"), -float("inf")], pd.NA).dropna()
-    out.name = "CCL_YPF"
-    return out
+    s = _ccl_base_col("CCL_ADJ" if prefer_adj else "CCL", start=start)
+    return s.rename("CCL_YPF")
 
 
 def get_ccl_ypf_df(start: str = "2000-01-01", prefer_adj: bool = False) -> pd.DataFrame:
@@ -104,83 +111,27 @@ def get_ccl_ypf_df(start: str = "2000-01-01", prefer_adj: bool = False) -> pd.Da
     Devuelve DataFrame con columnas Date, value (estándar para tus plots).
     """
     s = get_ccl_ypf_history(start=start, prefer_adj=prefer_adj)
-    return s.rename("value").reset_index().rename(columns={"index": "Date"})
+    return s.rename("value").reset_index()
 
 
-import time
-
-@st.cache_data(ttl=60 * 60, show_spinner=False)
 def get_ccl_ypf_df_fast(period: str = "2y", prefer_adj: bool = False) -> pd.DataFrame:
     """
-    CCL proxy diario liviano (igual estilo que macro_home):
-    usa yf.download con period corto para evitar history(start=1993).
+    CCL proxy diario para cualquier horizonte ("2y", "5y", "max", ...).
+    Recorta la serie canónica por fecha: no hace otra descarga.
     Devuelve DataFrame: Date, value
     """
-    if yf is None:
+    try:
+        s = get_ccl_ypf_history(start=period_start(period), prefer_adj=prefer_adj)
+    except Exception:
+        # No caches vacío “silencioso”: devolvemos vacío pero con columnas
         return pd.DataFrame(columns=["Date", "value"])
 
-    def _get_close(dl, ticker: str) -> pd.Series:
-        # dl es DataFrame con MultiIndex cols cuando pedís varios tickers
-        # Queremos Close de cada ticker
-        if dl is None or dl.empty:
-            return pd.Series(dtype="float64")
-
-        if isinstance(dl.columns, pd.MultiIndex):
-            # formato: (campo, ticker) o (ticker, campo) depende
-            if ("Close", ticker) in dl.columns:
-                s = dl[("Close", ticker)]
-            elif (ticker, "Close") in dl.columns:
-                s = dl[(ticker, "Close")]
-            else:
-                # fallback: buscar "Close" en el segundo nivel
-                candidates = [c for c in dl.columns if "Close" in c]
-                s = dl[candidates[0]] if candidates else pd.Series(dtype="float64")
-        else:
-            # si viniera plano (raro en multi-ticker), probar Close
-            s = dl["Close"] if "Close" in dl.columns else pd.Series(dtype="float64")
-
-        s = s.copy()
-        s.index = pd.to_datetime(s.index, errors="coerce")
-        try:
-            s.index = s.index.tz_localize(None)
-        except Exception:
-            pass
-        s.index = s.index.normalize()
-        return pd.to_numeric(s, errors="coerce").dropna()
-
-    last_err = None
-    for _ in range(2):  # reintento rápido
-        try:
-            dl = yf.download(
-                ["YPFD.BA", "YPF"],
-                period=period,
-                progress=False,
-                auto_adjust=False,
-                group_by="column",
-                threads=False,     # clave: no más subthreads
-            )
-            s_ars = _get_close(dl, "YPFD.BA")
-            s_usd = _get_close(dl, "YPF")
-
-            df = pd.concat([s_ars.rename("YPF_ARS"), s_usd.rename("YPF_USD")], axis=1).dropna()
-            if df.empty:
-                raise RuntimeError("download devolvió vacío para YPFD.BA/YPF")
-
-            df["value"] = (df["YPF_ARS"] / df["YPF_USD"]).replace([float("inf"), -float("inf")], pd.NA)
-            out = df[["value"]].dropna().reset_index().rename(columns={"index": "Date"})
-            return out
-
-        except Exception as e:
-            last_err = e
-            time.sleep(0.25)
-
-    # No caches vacío “silencioso”: devolvemos vacío pero con columnas
-    return pd.DataFrame(columns=["Date", "value"])
-
-
-
-
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
+    return s.rename("value").reset_index()
+
+
+
+
+@shared_dataset("mercado", ttl=6 * 60 * 60)
 def get_ticker_history(
     ticker: str,
     start: str = "2000-01-01",
@@ -210,7 +161,7 @@ def get_ticker_df(
     return series_to_df(get_ticker_history(ticker, start=start, prefer_adj=prefer_adj))
 
 
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
+@shared_dataset("mercado", ttl=6 * 60 * 60)
 def get_ratio_history(
     num_ticker: str,
     den_ticker: str,
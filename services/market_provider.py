@@ -0,0 +1,219 @@
+# services/market_provider.py
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+# yfinance opcional
+try:
+    import yfinance as yf
+except Exception:
+    yf = None
+
+
+# ============================================================
+# Proveedor de datos de mercado (OHLC diario)
+# - "yfinance": Yahoo Finance (producción).
+# - "fixture":  historias OHLC grabadas en disco (CSV por ticker),
+#               con latencia configurable. Sin red: staging / load tests.
+#
+# Selección por entorno:
+#   MARKET_DATA_PROVIDER      yfinance (default) | fixture
+#   MARKET_DATA_FIXTURES_DIR  carpeta de CSV (default assets/market_fixtures)
+#   MARKET_DATA_LATENCY_MS    latencia simulada por descarga (default 0)
+#   MARKET_DATA_REPLAY_DATE   "hoy" del replay (AAAA-MM-DD); default: última
+#                             fecha grabada de cada ticker
+#
+# Contrato: download(tickers, period, start, interval) -> yf.download-like
+# DataFrame (columnas MultiIndex (ticker, campo)). Tickers sin datos no
+# aparecen. El scheduler (services/yahoo_scheduler.py) lo separa por ticker.
+# ============================================================
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent.parent / "assets" / "market_fixtures"
+OHLC_COLS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_start(period: str | None, today: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """
+    Traduce un period estilo yfinance ("2y", "6mo", "ytd", "max", ...)
+    a fecha de inicio. None => sin recorte.
+    """
+    p = str(period or "max").strip().lower()
+    if p == "max":
+        return None
+
+    today = (today or pd.Timestamp.today()).normalize()
+    if p == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+
+    m = _PERIOD_RE.match(p)
+    if m is None:
+        raise ValueError(f"period inválido: {period!r}")
+
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "d":
+        return today - pd.DateOffset(days=n)
+    if unit == "wk":
+        return today - pd.DateOffset(weeks=n)
+    if unit == "mo":
+        return today - pd.DateOffset(months=n)
+    return today - pd.DateOffset(years=n)
+
+
+def _fixture_name(ticker: str) -> str:
+    """Nombre de archivo seguro para el ticker (^MERV -> _MERV.csv)."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", ticker) + ".csv"
+
+
+class MarketDataProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def download(
+        self,
+        tickers: list[str],
+        period: str | None = None,
+        start: str | None = None,
+        interval: str = "1d",
+    ) -> pd.DataFrame:
+        """Ver contrato en el encabezado del módulo."""
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def download(self, tickers, period=None, start=None, interval="1d") -> pd.DataFrame:
+        if yf is None:
+            raise RuntimeError("yfinance no está disponible (pip install yfinance).")
+        return yf.download(
+            tickers=list(tickers),
+            period=period,
+            start=start,
+            interval=interval,
+            auto_adjust=False,
+            progress=False,
+            group_by="ticker",
+            threads=False,
+        )
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Reproduce historias OHLC grabadas: <root>/<ticker>.csv con columna Date
+    + OHLC_COLS. Recorta por period/start como haría Yahoo y duerme
+    `latency_sec` por descarga (determinístico, sin red).
+    period se resuelve contra `replay_date` (y no se devuelve nada
+    posterior) o, si no se indica, contra la última fecha grabada del
+    ticker: un fixture viejo sigue respondiendo period="10d".
+    """
+
+    name = "fixture"
+
+    def __init__(self, root: str | Path = DEFAULT_FIXTURES_DIR, latency_sec: float = 0.0, replay_date=None):
+        self.root = Path(root)
+        self.latency_sec = float(latency_sec)
+        self.replay_date = pd.Timestamp(replay_date).normalize() if replay_date else None
+        self._lock = threading.Lock()
+        self._frames: dict[str, pd.DataFrame | None] = {}
+
+    def _load(self, ticker: str) -> pd.DataFrame | None:
+        with self._lock:
+            if ticker in self._frames:
+                return self._frames[ticker]
+
+        path = self.root / _fixture_name(ticker)
+        df = None
+        if path.exists():
+            df = pd.read_csv(path, parse_dates=["Date"]).set_index("Date").sort_index()
+            df = df[[c for c in OHLC_COLS if c in df.columns]]
+
+        with self._lock:
+            self._frames[ticker] = df
+        return df
+
+    def download(self, tickers, period=None, start=None, interval="1d") -> pd.DataFrame:
+        if interval != "1d":
+            raise ValueError(f"FixtureProvider solo soporta interval='1d' (pedido: {interval!r})")
+        if self.latency_sec > 0:
+            time.sleep(self.latency_sec)
+
+        out = {}
+        for t in tickers:
+            df = self._load(t)
+            if df is None or df.empty:
+                continue
+            if self.replay_date is not None:
+                df = df.loc[:self.replay_date]
+                if df.empty:
+                    continue
+            today = self.replay_date if self.replay_date is not None else df.index.max()
+            since = pd.Timestamp(start) if start is not None else period_start(period, today=today)
+            if since is not None:
+                df = df.loc[since:]
+            if not df.empty:
+                out[t] = df
+
+        if not out:
+            return pd.DataFrame()
+        return pd.concat(out, axis=1)
+
+
+def record_fixtures(
+    tickers: list[str],
+    root: str | Path = DEFAULT_FIXTURES_DIR,
+    period: str = "max",
+    source: MarketDataProvider | None = None,
+) -> dict[str, Path]:
+    """Graba historias OHLC (por defecto desde Yahoo) como fixtures CSV. {ticker: archivo}."""
+    from services.yahoo_scheduler import split_by_ticker
+
+    source = source or YFinanceProvider()
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    written = {}
+    data = split_by_ticker(source.download(list(tickers), period=period), list(tickers))
+    for t, df in data.items():
+        path = root / _fixture_name(t)
+        df[[c for c in OHLC_COLS if c in df.columns]].to_csv(path, index_label="Date")
+        written[t] = path
+    return written
+
+
+def provider_from_env() -> MarketDataProvider:
+    kind = os.environ.get("MARKET_DATA_PROVIDER", "yfinance").strip().lower()
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "fixture":
+        root = os.environ.get("MARKET_DATA_FIXTURES_DIR") or DEFAULT_FIXTURES_DIR
+        latency_ms = float(os.environ.get("MARKET_DATA_LATENCY_MS", "0") or 0)
+        replay_date = os.environ.get("MARKET_DATA_REPLAY_DATE") or None
+        return FixtureProvider(root, latency_sec=latency_ms / 1000.0, replay_date=replay_date)
+    raise ValueError(f"MARKET_DATA_PROVIDER inválido: {kind!r} (yfinance | fixture)")
+
+
+_PROVIDER: MarketDataProvider | None = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_market_provider() -> MarketDataProvider:
+    """Proveedor único por proceso, elegido por variables de entorno."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        if _PROVIDER is None:
+            _PROVIDER = provider_from_env()
+        return _PROVIDER
+
+
+def set_market_provider(provider: MarketDataProvider | None) -> None:
+    """Reemplaza el proveedor del proceso (None => volver a leer el entorno)."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        _PROVIDER = provider
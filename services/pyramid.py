@@ -0,0 +1,111 @@
+# services/pyramid.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.alignment import date_keys, keys_to_dates, prepare
+from services.resample import day_to_month, series_version
+
+
+# ============================================================
+# Pirámide multi-resolución para series diarias largas
+# - Niveles: "D" (dato original), "W" (semanas lun-dom), "M" (meses).
+# - Cada nivel agregado guarda, por período: fechas del primer y último
+#   dato, último valor (cierre) y envolvente mín / máx de los diarios.
+# - Recorte por rango: entran los períodos que se solapan con [start, end]
+#   (el cierre del último período puede caer después de `end`).
+# - Se construye UNA vez por versión de la serie (cache); por render solo
+#   se elige el nivel y se recorta el rango con searchsorted.
+# - Nivel elegido: el más fino cuyo número de puntos en el rango visible
+#   entra en el presupuesto (si ninguno entra, el más grueso).
+# ============================================================
+LEVELS = ("D", "W", "M")
+LEVEL_LABELS = {"D": "diario", "W": "semanal", "M": "mensual"}
+POINT_BUDGET = 1500
+
+
+def _period_ids(days: np.ndarray, level: str) -> np.ndarray:
+    if level == "W":
+        # 1970-01-01 fue jueves: +3 => semanas que empiezan el lunes
+        return (days + 3) // 7
+    if level == "M":
+        return day_to_month(days)
+    raise ValueError(f"nivel inválido: {level!r} ({' | '.join(LEVELS)})")
+
+
+def build_levels(days: np.ndarray, vals: np.ndarray) -> dict:
+    """(keys ordenadas y únicas, valores) -> {nivel: {"first", "keys", "value", "lo", "hi"}}."""
+    out = {"D": {"first": days, "keys": days, "value": vals, "lo": vals, "hi": vals}}
+    for level in LEVELS[1:]:
+        if days.size == 0:
+            out[level] = out["D"]
+            continue
+        pid = _period_ids(days, level)
+        start = np.flatnonzero(np.r_[True, pid[1:] != pid[:-1]])
+        last = np.r_[start[1:], days.size] - 1
+        out[level] = {
+            "first": days[start],
+            "keys": days[last],
+            "value": vals[last],
+            "lo": np.minimum.reduceat(vals, start),
+            "hi": np.maximum.reduceat(vals, start),
+        }
+    return out
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=64, show_spinner=False)
+def _pyramid_cached(version: str, _s: pd.Series) -> dict:
+    """Clave de cache = versión de la serie. La serie no se hashea."""
+    return build_levels(*prepare(_s))
+
+
+def get_pyramid(s: pd.Series) -> dict:
+    """Pirámide de una serie diaria (Series indexada por fecha o TimeSeries)."""
+    return _pyramid_cached(series_version(s), s)
+
+
+def _span(lvl: dict, k0: int | None, k1: int | None) -> tuple[int, int]:
+    """Posiciones [i0, i1) de los períodos que se solapan con [k0, k1]."""
+    i0 = 0 if k0 is None else int(np.searchsorted(lvl["keys"], k0, side="left"))
+    i1 = lvl["first"].size if k1 is None else int(np.searchsorted(lvl["first"], k1, side="right"))
+    return i0, max(i0, i1)
+
+
+def _range_keys(start, end) -> tuple[int | None, int | None]:
+    k0 = None if start is None else int(date_keys([start])[0])
+    k1 = None if end is None else int(date_keys([end])[0])
+    return k0, k1
+
+
+def pick_level(pyramids, start=None, end=None, budget: int = POINT_BUDGET) -> str:
+    """Nivel más fino en el que ninguna de las pirámides supera `budget` puntos en [start, end]."""
+    pyramids = [pyramids] if isinstance(pyramids, dict) else list(pyramids)
+    k0, k1 = _range_keys(start, end)
+    for level in LEVELS:
+        n = max((i1 - i0 for i0, i1 in (_span(p[level], k0, k1) for p in pyramids)), default=0)
+        if n <= budget:
+            return level
+    return LEVELS[-1]
+
+
+def view(pyr: dict, start=None, end=None, level: str = "D") -> pd.DataFrame:
+    """Recorte [start, end] de un nivel: Date, value, lo, hi."""
+    lvl = pyr[level]
+    i0, i1 = _span(lvl, *_range_keys(start, end))
+    return pd.DataFrame(
+        {
+            "Date": keys_to_dates(lvl["keys"][i0:i1]),
+            "value": lvl["value"][i0:i1],
+            "lo": lvl["lo"][i0:i1],
+            "hi": lvl["hi"][i0:i1],
+        }
+    )
+
+
+def first_value(pyr: dict, start=None, end=None) -> float:
+    """Primer dato diario en [start, end] (base de la variación acumulada)."""
+    lvl = pyr["D"]
+    i0, i1 = _span(lvl, *_range_keys(start, end))
+    return float(lvl["value"][i0]) if i1 > i0 else np.nan
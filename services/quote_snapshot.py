@@ -0,0 +1,107 @@
+# services/quote_snapshot.py
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.yahoo_scheduler import pick_close, yahoo_fetch
+
+
+# ============================================================
+# Snapshot de cotizaciones (visor de precios)
+# Un hilo en segundo plano consulta Yahoo cada N segundos y guarda
+# último y anterior cierre en memoria. El render lee el snapshot:
+# cero red en el camino del request.
+# ============================================================
+SNAPSHOT_REFRESH_SEC = 5 * 60   # refresco normal
+SNAPSHOT_RETRY_SEC = 60         # si falló la última consulta
+
+
+def _get_last_prev_close(df: pd.DataFrame | None) -> tuple[float | None, float | None]:
+    s = pick_close(df, prefer_adj=True)
+    if s.empty:
+        return (None, None)
+    last = float(s.iloc[-1])
+    prev = float(s.iloc[-2]) if len(s) >= 2 else None
+    return (last, prev)
+
+
+class QuoteSnapshotService:
+    """
+    Mantiene {ticker: (last, prev)} en memoria, refrescado en background.
+    snapshot() nunca toca la red.
+    """
+
+    def __init__(
+        self,
+        tickers: tuple[str, ...],
+        refresh_sec: int = SNAPSHOT_REFRESH_SEC,
+        retry_sec: int = SNAPSHOT_RETRY_SEC,
+    ):
+        self.tickers = tuple(tickers)
+        self.refresh_sec = refresh_sec
+        self.retry_sec = retry_sec
+
+        self._lock = threading.Lock()
+        self._quotes: dict[str, tuple[float | None, float | None]] = {}
+        self._updated_at: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="quote-snapshot", daemon=True)
+        self._thread.start()
+
+    def _poll_once(self) -> bool:
+        try:
+            data = yahoo_fetch(list(self.tickers), period="10d")
+        except Exception:
+            return False
+        quotes = {t: _get_last_prev_close(data.get(t)) for t in self.tickers}
+        if not any(last is not None for last, _ in quotes.values()):
+            return False  # conservar el snapshot anterior
+
+        with self._lock:
+            # si un ticker vino vacío, mantener su último valor conocido
+            for t, q in quotes.items():
+                if q[0] is not None or t not in self._quotes:
+                    self._quotes[t] = q
+            self._updated_at = time.time()
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ok = self._poll_once()
+            except Exception:
+                ok = False
+            self._stop.wait(self.refresh_sec if ok else self.retry_sec)
+
+    def snapshot(self) -> tuple[dict[str, tuple[float | None, float | None]], float | None]:
+        """Devuelve (quotes, age_sec). age_sec=None si todavía no hubo datos."""
+        with self._lock:
+            quotes = dict(self._quotes)
+            updated_at = self._updated_at
+        age = None if updated_at is None else max(0.0, time.time() - updated_at)
+        return quotes, age
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+@st.cache_resource(show_spinner=False)
+def get_quote_snapshot_service(tickers: tuple[str, ...]) -> QuoteSnapshotService:
+    """Un servicio por proceso (y por set de tickers), compartido entre sesiones."""
+    return QuoteSnapshotService(tickers)
+
+
+def fmt_snapshot_age(age_sec: float | None) -> str:
+    if age_sec is None or (isinstance(age_sec, float) and np.isnan(age_sec)):
+        return "actualizando…"
+    mins = int(age_sec // 60)
+    if mins < 1:
+        return "hace instantes"
+    if mins < 60:
+        return f"hace {mins} min"
+    return f"hace {mins // 60} h {mins % 60:02d} min"
@@ -0,0 +1,123 @@
+# services/resample.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.alignment import _NAT_KEY, asof_lookup, date_keys, keys_to_dates, prepare
+
+
+# ============================================================
+# Conversión de frecuencias diaria <-> mensual
+# - Claves int64: días desde epoch (services/alignment.py) y meses
+#   desde 1970-01. Sin calendarios intermedios ni merges de pandas.
+# - mensual -> diaria (valor del mes en cada día):
+#     "step":  solo el mes exacto (mes sin dato => NaN)
+#     "ffill": último mes publicado <= mes del día (huecos y días
+#              posteriores al último mes quedan con el último valor)
+# - diaria -> mensual: "mean" (promedio), "last" (fin de período),
+#   "first" (inicio de período). Índice = primer día del mes.
+# - Resultados cacheados por versión de la serie fuente.
+# ============================================================
+MONTHLY_HOW = ("step", "ffill")
+DAILY_HOW = ("mean", "last", "first")
+
+
+def day_to_month(days: np.ndarray) -> np.ndarray:
+    """Días desde epoch -> meses desde 1970-01 (int64)."""
+    d = np.asarray(days, dtype="int64")
+    out = d.astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+    out[d == _NAT_KEY] = _NAT_KEY
+    return out
+
+
+def month_to_day(months: np.ndarray) -> np.ndarray:
+    """Meses desde 1970-01 -> día 1 de cada mes (días desde epoch)."""
+    return np.asarray(months, dtype="int64").astype("datetime64[M]").astype("datetime64[D]").astype("int64")
+
+
+def prepare_monthly(s: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Series mensual (cualquier día del mes) -> (meses únicos, valores). Repetidos: queda el último."""
+    days, vals = prepare(s)
+    if days.size == 0:
+        return days, vals
+    months = day_to_month(days)
+    last = np.r_[months[1:] != months[:-1], True]
+    return months[last], vals[last]
+
+
+def monthly_at(s: pd.Series, dates, how: str = "ffill") -> np.ndarray:
+    """Valor mensual de `s` para cada fecha de `dates` (alineado posición a posición)."""
+    if how not in MONTHLY_HOW:
+        raise ValueError(f"how inválido: {how!r} ({' | '.join(MONTHLY_HOW)})")
+    months, vals = prepare_monthly(s)
+    target = day_to_month(date_keys(dates))
+    return asof_lookup(target, months, vals, direction="backward", tolerance=0 if how == "step" else None)
+
+
+def monthly_to_daily(s: pd.Series, start=None, end=None, how: str = "ffill") -> pd.Series:
+    """
+    Serie mensual -> diaria entre start y end (default: del primer día del
+    primer mes al último día del último mes).
+    """
+    months, _ = prepare_monthly(s)
+    if months.size == 0 and (start is None or end is None):
+        return pd.Series(dtype="float64")
+
+    d0 = date_keys([start])[0] if start is not None else month_to_day(months[:1])[0]
+    d1 = date_keys([end])[0] if end is not None else month_to_day(months[-1:] + 1)[0] - 1
+    days = np.arange(d0, d1 + 1, dtype="int64")
+    return pd.Series(monthly_at(s, keys_to_dates(days), how=how), index=keys_to_dates(days))
+
+
+def daily_to_monthly(s: pd.Series, how: str = "mean") -> pd.Series:
+    """Serie diaria -> mensual (índice = primer día del mes). Meses sin datos no aparecen."""
+    if how not in DAILY_HOW:
+        raise ValueError(f"how inválido: {how!r} ({' | '.join(DAILY_HOW)})")
+    days, vals = prepare(s)
+    if days.size == 0:
+        return pd.Series(dtype="float64")
+
+    months = day_to_month(days)
+    uniq, first_pos, inv = np.unique(months, return_index=True, return_inverse=True)
+    if how == "mean":
+        out = np.bincount(inv, weights=vals) / np.bincount(inv)
+    elif how == "first":
+        out = vals[first_pos]
+    else:
+        last_pos = np.r_[first_pos[1:], days.size] - 1
+        out = vals[last_pos]
+    return pd.Series(out, index=keys_to_dates(month_to_day(uniq)))
+
+
+def series_version(s: pd.Series) -> str:
+    """Versión de una serie fuente = largo + primera / última fecha + suma de valores."""
+    if s is None or len(s) == 0:
+        return "serie:vacía"
+    days, vals = prepare(s)
+    if days.size == 0:
+        return f"serie:{len(s)}:sin-datos"
+    return f"serie:{days.size}:{days[0]}:{days[-1]}:{float(vals.sum()):.6f}"
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=32, show_spinner=False)
+def _to_daily_cached(version: str, start, end, how: str, _s: pd.Series) -> pd.Series:
+    return monthly_to_daily(_s, start=start, end=end, how=how)
+
+
+@st.cache_data(ttl=12 * 60 * 60, max_entries=32, show_spinner=False)
+def _to_monthly_cached(version: str, how: str, _s: pd.Series) -> pd.Series:
+    return daily_to_monthly(_s, how=how)
+
+
+def to_daily(s: pd.Series, start=None, end=None, how: str = "ffill") -> pd.Series:
+    """monthly_to_daily cacheado por (versión de s, start, end, how)."""
+    start = None if start is None else pd.Timestamp(start).normalize()
+    end = None if end is None else pd.Timestamp(end).normalize()
+    return _to_daily_cached(series_version(s), start, end, how, s)
+
+
+def to_monthly(s: pd.Series, how: str = "mean") -> pd.Series:
+    """daily_to_monthly cacheado por (versión de s, how)."""
+    return _to_monthly_cached(series_version(s), how, s)
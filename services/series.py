@@ -0,0 +1,155 @@
+# services/series.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from services.alignment import _NAT_KEY, asof_lookup, date_keys, keys_to_dates, prepare, series_from_df
+
+
+# ============================================================
+# Serie de tiempo compacta (arrays, inmutable)
+# - keys: int64 días desde epoch (services/alignment.py), estrictamente
+#   crecientes (ordenadas y sin duplicados: garantizado al construir).
+# - values: float64 sin NaN.
+# - freq: "D" | "W" | "M" | "Q" | "A" (inferida si no se indica).
+# - Arrays de solo lectura: se puede compartir la misma instancia entre
+#   páginas / reruns sin copias defensivas.
+# - La limpieza (fechas, numéricos, NaN, orden, duplicados) se hace UNA
+#   vez en from_frame / from_series (alignment.prepare); las páginas no
+#   re-limpian y el motor as-of usa los arrays tal cual.
+# ============================================================
+FREQS = ("D", "W", "M", "Q", "A")
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    """Array de solo lectura (copia si el original todavía se puede escribir)."""
+    if a.flags.writeable:
+        a = a.copy()
+        a.flags.writeable = False
+    return a
+
+
+def infer_freq(keys: np.ndarray) -> str:
+    """Frecuencia por la mediana de la distancia entre fechas (en días)."""
+    if keys.size < 2:
+        return "D"
+    step = float(np.median(np.diff(keys)))
+    if step <= 1.5:
+        return "D"
+    if step <= 8:
+        return "W"
+    if step <= 31:
+        return "M"
+    if step <= 92:
+        return "Q"
+    return "A"
+
+
+class TimeSeries:
+    __slots__ = ("keys", "values", "freq", "name")
+
+    def __init__(self, keys: np.ndarray, values: np.ndarray, freq: str | None = None, name: str | None = None):
+        keys = np.asarray(keys, dtype="int64")
+        values = np.asarray(values, dtype="float64")
+        if keys.shape != values.shape or keys.ndim != 1:
+            raise ValueError("keys y values deben ser arrays 1-D del mismo largo")
+        if keys.size > 1 and not np.all(keys[1:] > keys[:-1]):
+            raise ValueError("keys debe ser estrictamente creciente (usar from_frame / from_series)")
+        if freq is not None and freq not in FREQS:
+            raise ValueError(f"freq inválida: {freq!r} ({' | '.join(FREQS)})")
+
+        object.__setattr__(self, "keys", _readonly(keys))
+        object.__setattr__(self, "values", _readonly(values))
+        object.__setattr__(self, "freq", freq or infer_freq(keys))
+        object.__setattr__(self, "name", name)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("TimeSeries es inmutable")
+
+    def __reduce__(self):
+        return (TimeSeries, (self.keys, self.values, self.freq, self.name))
+
+    def __len__(self) -> int:
+        return int(self.keys.size)
+
+    def __repr__(self) -> str:
+        if self.empty:
+            return f"TimeSeries({self.name!r}, vacía)"
+        return (
+            f"TimeSeries({self.name!r}, n={len(self)}, freq={self.freq}, "
+            f"{self.first_date:%Y-%m-%d}..{self.last_date:%Y-%m-%d})"
+        )
+
+    # ------------------------------------------------------------
+    # Construcción (única limpieza)
+    # ------------------------------------------------------------
+    @classmethod
+    def from_series(cls, s: pd.Series, freq: str | None = None, name: str | None = None, keep: str = "last") -> "TimeSeries":
+        """Series indexada por fecha -> TimeSeries. keep: duplicado que queda ("last" | "first")."""
+        keys, vals = prepare(s, keep=keep)
+        return cls(keys, vals, freq=freq, name=name if name is not None else getattr(s, "name", None))
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        value_col: str,
+        date_col: str = "Date",
+        freq: str | None = None,
+        name: str | None = None,
+        keep: str = "last",
+    ) -> "TimeSeries":
+        """DataFrame fecha / valor -> TimeSeries."""
+        return cls.from_series(series_from_df(df, value_col, date_col), freq=freq, name=name or value_col, keep=keep)
+
+    # ------------------------------------------------------------
+    # Acceso
+    # ------------------------------------------------------------
+    @property
+    def empty(self) -> bool:
+        return self.keys.size == 0
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return keys_to_dates(self.keys)
+
+    @property
+    def first_date(self) -> pd.Timestamp | None:
+        return None if self.empty else keys_to_dates(self.keys[:1])[0]
+
+    @property
+    def last_date(self) -> pd.Timestamp | None:
+        return None if self.empty else keys_to_dates(self.keys[-1:])[0]
+
+    @property
+    def last_value(self) -> float | None:
+        return None if self.empty else float(self.values[-1])
+
+    def asof(self, date) -> float | None:
+        """Último valor con fecha <= date (None si no hay)."""
+        k = date_keys([date])[0]
+        pos = int(np.searchsorted(self.keys, k, side="right")) - 1
+        if k == _NAT_KEY or pos < 0:
+            return None
+        return float(self.values[pos])
+
+    def asof_values(self, dates, direction: str = "backward", tolerance: int | None = None, clip: bool = False) -> np.ndarray:
+        """Valores as-of sobre `dates` (alineados posición a posición, NaN sin match)."""
+        return asof_lookup(date_keys(dates), self.keys, self.values, direction=direction, tolerance=tolerance, clip=clip)
+
+    def between(self, start=None, end=None) -> "TimeSeries":
+        """Recorte [start, end] (vistas de los mismos arrays, sin copiar)."""
+        i0 = 0 if start is None else int(np.searchsorted(self.keys, date_keys([start])[0], side="left"))
+        i1 = self.keys.size if end is None else int(np.searchsorted(self.keys, date_keys([end])[0], side="right"))
+        return TimeSeries(self.keys[i0:i1], self.values[i0:i1], freq=self.freq, name=self.name)
+
+    # ------------------------------------------------------------
+    # pandas bajo demanda
+    # ------------------------------------------------------------
+    def to_series(self) -> pd.Series:
+        return pd.Series(self.values, index=self.dates, name=self.name, copy=False)
+
+    def to_frame(self, value_col: str = "value", date_col: str = "Date") -> pd.DataFrame:
+        """DataFrame Date / valor (formato de las páginas)."""
+        return pd.DataFrame({date_col: self.dates, value_col: self.values})
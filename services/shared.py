@@ -0,0 +1,283 @@
+# services/shared.py
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.dtypes import frame_bytes
+from services.series import TimeSeries
+
+
+# ============================================================
+# Datasets compartidos de solo lectura (uno por proceso)
+# - st.cache_data guarda el resultado serializado y en cada llamada lo
+#   des-serializa: cada rerun de cada sesión paga tiempo + una copia
+#   completa del DataFrame.
+# - Los datasets grandes van por el administrador de cache de abajo: se
+#   construyen una vez y TODAS las sesiones comparten los mismos arrays.
+# - Para que compartir sea seguro, los arrays quedan protegidos contra
+#   escritura (flags.writeable = False): escribir sobre los buffers
+#   compartidos (.values / .to_numpy(copy=False) / .iloc[...] =) falla en
+#   vez de contaminar a las otras sesiones.
+# - Cada llamada recibe una copia superficial (DataFrame / Series): mismo
+#   buffer, objeto propio. Agregar o reasignar columnas afecta solo a esa
+#   copia (Copy-on-Write); filtros, assign, groupby, etc. igual que antes.
+#   Requiere pandas >= 3 (CoW siempre activo; ver requirements.txt): sin
+#   CoW una escritura in-place sobre la copia iría al buffer compartido.
+# - dict -> mappingproxy y list -> tuple (contenedores de solo lectura).
+# ============================================================
+_ARRAY_ATTRS = ("_ndarray", "_codes", "_data", "_mask")
+
+
+def _lock(values) -> None:
+    """Protege el buffer numpy de un bloque (ndarray o extension array)."""
+    if isinstance(values, np.ndarray):
+        values.flags.writeable = False
+        return
+    # datetime/timedelta (_ndarray), category (_codes), nullable (_data/_mask).
+    # Los arrays de arrow (str) ya son inmutables.
+    for attr in _ARRAY_ATTRS:
+        arr = getattr(values, attr, None)
+        if isinstance(arr, np.ndarray):
+            arr.flags.writeable = False
+
+
+def freeze(obj):
+    """Deja `obj` de solo lectura (in-place para pandas / numpy) y lo devuelve."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        for blk in getattr(obj._mgr, "blocks", ()):
+            _lock(blk.values)
+        return obj
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+        return obj
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def _handout(obj):
+    """Lo que recibe cada llamada: copia superficial de frames (sin copiar datos)."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=False)
+    return obj
+
+
+def sizeof(obj) -> int:
+    """Memoria real del objeto cacheado (frames: memory_usage deep)."""
+    if isinstance(obj, pd.DataFrame):
+        return frame_bytes(obj)
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (dict, MappingProxyType)):
+        return sum(sizeof(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(sizeof(v) for v in obj)
+    if isinstance(obj, TimeSeries):
+        return int(obj.keys.nbytes + obj.values.nbytes)
+    return sys.getsizeof(obj)
+
+
+# ============================================================
+# Administrador de cache con presupuesto de memoria
+# - Un presupuesto global (CACHE_BUDGET_MB) y una cuota por namespace
+#   (fuente de datos), medidos con la memoria real de los objetos.
+# - Al insertar: primero se respeta la cuota del namespace y después el
+#   presupuesto global, desalojando la entrada usada hace más tiempo (LRU).
+# - pin=True: datasets núcleo (IPC, EMAE, morosidad, CCL canónico) que
+#   cuentan para el tamaño pero nunca se desalojan. Se fija la última
+#   clave cargada de cada función (versiones viejas vuelven al LRU).
+# - La entrada recién cargada no se desaloja en su propia inserción (si
+#   sola supera la cuota queda hasta la próxima carga del namespace).
+# - ttl por función (vencimiento perezoso, al acceder). Si el loader tira
+#   error no se cachea nada (mismo criterio que st.cache_data).
+# - Una carga por clave a la vez: sesiones concurrentes esperan el
+#   resultado en vez de descargar dos veces.
+# ============================================================
+CACHE_BUDGET_MB = float(os.environ.get("CACHE_BUDGET_MB", "256") or 256)
+
+NAMESPACE_QUOTAS_MB = {
+    "bcra": 48,        # BCRA Monetarias por id + derivados
+    "datos_gob": 24,   # datos.gob.ar por id de serie
+    "mercado": 96,     # Yahoo por ticker / start, CCL canónico
+    "indec": 64,       # IPC, EMAE
+    "morosidad": 32,   # cubo por versión del Excel
+}
+
+_MB = 2**20
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires", "pinned")
+
+    def __init__(self, value, size: int, expires: float | None, pinned: bool):
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.pinned = pinned
+
+
+class CacheManager:
+    def __init__(self, budget_mb: float = CACHE_BUDGET_MB, quotas_mb: dict | None = None):
+        self.budget = int(budget_mb * _MB)
+        self.quotas = {ns: int(mb * _MB) for ns, mb in (quotas_mb or NAMESPACE_QUOTAS_MB).items()}
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()  # orden = LRU -> MRU
+        self._sizes = dict.fromkeys(self.quotas, 0)
+        self._stats = {ns: {"hits": 0, "misses": 0, "evictions": 0} for ns in self.quotas}
+        self._lock = threading.Lock()
+        self._loading: dict[tuple, threading.Lock] = {}
+
+    # ------------------------------------------------------------
+    # Acceso
+    # ------------------------------------------------------------
+    def _get(self, key: tuple):
+        """Entrada vigente (y la marca como recién usada) o None. Con _lock tomado."""
+        e = self._entries.get(key)
+        if e is None:
+            return None
+        if e.expires is not None and time.monotonic() >= e.expires:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return e
+
+    def get_or_load(self, key: tuple, loader, ttl: float | None = None, pin: bool = False):
+        """key = (namespace, ...). Devuelve el objeto compartido (congelado)."""
+        ns = key[0]
+        with self._lock:
+            e = self._get(key)
+            if e is not None:
+                self._stats[ns]["hits"] += 1
+                return e.value
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                e = self._get(key)  # la cargó otra sesión mientras esperábamos
+                if e is not None:
+                    self._stats[ns]["hits"] += 1
+                    return e.value
+                self._stats[ns]["misses"] += 1
+            try:
+                value = freeze(loader())
+                expires = None if ttl is None else time.monotonic() + ttl
+                with self._lock:
+                    self._put(key, _Entry(value, sizeof(value), expires, pin))
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+            return value
+
+    # ------------------------------------------------------------
+    # Inserción / desalojo (con _lock tomado)
+    # ------------------------------------------------------------
+    def _put(self, key: tuple, entry: _Entry) -> None:
+        ns = key[0]
+        if key in self._entries:
+            self._drop(key)
+        if entry.pinned:
+            # solo la última clave de cada función queda fijada (p. ej. el cubo
+            # de la versión vigente); las anteriores pasan a desalojables
+            for k, e in self._entries.items():
+                if k[:2] == key[:2]:
+                    e.pinned = False
+        self._entries[key] = entry
+        self._sizes[ns] += entry.size
+        self._evict(lambda: self._sizes[ns] > self.quotas[ns], keep=key, ns=ns)
+        self._evict(lambda: sum(self._sizes.values()) > self.budget, keep=key)
+
+    def _evict(self, over, keep: tuple, ns: str | None = None) -> None:
+        if not over():
+            return
+        victims = [
+            k for k, e in self._entries.items()
+            if k != keep and not e.pinned and (ns is None or k[0] == ns)
+        ]
+        for k in victims:  # de menos a más recientemente usada
+            self._stats[k[0]]["evictions"] += 1
+            self._drop(k)
+            if not over():
+                return
+
+    def _drop(self, key: tuple) -> None:
+        e = self._entries.pop(key)
+        self._sizes[key[0]] -= e.size
+
+    def clear(self, namespace: str | None = None) -> None:
+        with self._lock:
+            for k in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._drop(k)
+
+    # ------------------------------------------------------------
+    # Tamaños actuales
+    # ------------------------------------------------------------
+    def report(self) -> pd.DataFrame:
+        """Por namespace: entradas, MB usados / cuota, MB fijados, hits / misses / desalojos."""
+        with self._lock:
+            rows = []
+            for ns, quota in self.quotas.items():
+                ents = [e for k, e in self._entries.items() if k[0] == ns]
+                rows.append({
+                    "namespace": ns,
+                    "entradas": len(ents),
+                    "mb": self._sizes[ns] / _MB,
+                    "cuota_mb": quota / _MB,
+                    "fijado_mb": sum(e.size for e in ents if e.pinned) / _MB,
+                    **self._stats[ns],
+                })
+            total = sum(self._sizes.values())
+        rep = pd.DataFrame(rows).round(3)
+        rep.attrs.update(total_mb=total / _MB, presupuesto_mb=self.budget / _MB)
+        return rep
+
+
+@st.cache_resource(show_spinner=False)
+def get_cache_manager() -> CacheManager:
+    """Administrador único por proceso (sobrevive a los reruns)."""
+    return CacheManager()
+
+
+def cache_report() -> pd.DataFrame:
+    """Tamaños actuales del cache (attrs: total_mb, presupuesto_mb)."""
+    return get_cache_manager().report()
+
+
+def shared_dataset(namespace: str, ttl: float | None = None, pin: bool = False):
+    """
+    Reemplazo de @st.cache_data para datasets grandes o parametrizados:
+    un objeto congelado por clave y por proceso, dentro del presupuesto de
+    memoria del namespace. Clave = función + argumentos (con defaults);
+    como en st.cache_data, los parámetros que empiezan con "_" no entran.
+    """
+    if namespace not in NAMESPACE_QUOTAS_MB:
+        raise ValueError(f"namespace inválido: {namespace!r} ({' | '.join(NAMESPACE_QUOTAS_MB)})")
+
+    def deco(fn):
+        sig = inspect.signature(fn)
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (namespace, name) + tuple(v for k, v in bound.arguments.items() if not k.startswith("_"))
+            value = get_cache_manager().get_or_load(key, lambda: fn(*args, **kwargs), ttl=ttl, pin=pin)
+            return _handout(value)
+
+        return wrapper
+
+    return deco
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -55,4 +56,151 @@ def cargar_sipa_excel():
             pd.DataFrame(),
             pd.DataFrame(),
             pd.DataFrame(),
-        )
\ No newline at end of file
+        )
+
+# ============================================================
+# Tabla de KPIs (todas las series a la vez)
+# - Frames anchos indexados por fecha: una columna por sector / subsector.
+# - Mensual (m_e / m_p): último dato s.e. vs. el anterior.
+# - Interanual (i_e / i_p): último dato original vs. misma fecha del año
+#   anterior (sin dato exacto => NaN).
+# - Desde 2023 (v23_e / v23_p): último dato s.e. vs. KPI_BASE_2023.
+# - Cache por versión de los CSV (mtime): se recalcula solo si cambian.
+# ============================================================
+SIPA_FILES = (
+    "sipa_total.csv",
+    "sipa_sec_orig.csv",
+    "sipa_sec_sa.csv",
+    "sipa_sub_orig.csv",
+    "sipa_sub_sa.csv",
+)
+KPI_BASE_2023 = pd.Timestamp("2023-08-01")
+KPI_COLS = ["abs_val", "m_p", "m_e", "i_p", "i_e", "v23_p", "v23_e"]
+
+
+def sipa_version() -> str:
+    """Versión de los assets SIPA (mtime de cada CSV)."""
+    parts = []
+    for name in SIPA_FILES:
+        try:
+            parts.append(str((SIPA_DIR / name).stat().st_mtime_ns))
+        except OSError:
+            parts.append("0")
+    return "-".join(parts)
+
+
+def _wide_pair(df_orig: pd.DataFrame, df_sa: pd.DataFrame, excluir_total: bool = True):
+    """
+    orig / s.e. -> dos frames anchos sobre las fechas comunes, mismas columnas.
+    Con excluir_total se descartan las columnas "total" que vienen en los datos.
+    """
+    if df_orig.empty or df_sa.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    o = df_orig.set_index("fecha")
+    s = df_sa.set_index("fecha")
+    cols = [c for c in o.columns if c in s.columns]
+    if excluir_total:
+        cols = [c for c in cols if "total" not in str(c).lower()]
+
+    fechas = o.index.intersection(s.index).sort_values()
+    o = o.loc[fechas, cols].apply(pd.to_numeric, errors="coerce")
+    s = s.loc[fechas, cols].apply(pd.to_numeric, errors="coerce")
+    return o, s
+
+
+def _kpi_table(orig: pd.DataFrame, sa: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """KPIs de todas las columnas de un par orig / s.e. (una fila por serie)."""
+    out = pd.DataFrame(np.nan, index=orig.columns, columns=KPI_COLS)
+    n = len(orig)
+    if n == 0 or orig.shape[1] == 0:
+        return out
+
+    o = orig.to_numpy(dtype="float64")
+    s = sa.to_numpy(dtype="float64")
+
+    # mensual: posición (último vs. anterior)
+    if n >= 2:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            m_e = np.where(s[-2] != 0, (s[-1] / s[-2] - 1.0) * 100.0, np.nan)
+        out["m_e"] = m_e
+        out["m_p"] = (s[-1] - s[-2]) * scale
+
+    # interanual: en el último dato original válido de cada columna
+    prev = orig.reindex(orig.index - pd.DateOffset(years=1)).to_numpy(dtype="float64")
+    has = np.isfinite(o)
+    last = n - 1 - has[::-1].argmax(axis=0)
+    cols = np.arange(o.shape[1])
+    cur_o, prev_o = o[last, cols], prev[last, cols]
+    cur_o[~has.any(axis=0)] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        i_e = (cur_o / prev_o - 1.0) * 100.0
+    i_e[~np.isfinite(i_e)] = np.nan
+    out["i_e"] = i_e
+    out["i_p"] = (cur_o - prev_o) * scale
+
+    # desde 2023: último s.e. vs. KPI_BASE_2023
+    if KPI_BASE_2023 in sa.index:
+        base = sa.loc[KPI_BASE_2023].to_numpy(dtype="float64")
+        if base.ndim > 1:
+            base = base[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["v23_e"] = np.where(base != 0, (s[-1] / base - 1.0) * 100.0, np.nan)
+        out["v23_p"] = (s[-1] - base) * scale
+
+    out["abs_val"] = o[-1] * scale
+    return out
+
+
+def _rows(tabla: pd.DataFrame) -> list[dict]:
+    return [{"name": name, **{k: float(v) for k, v in r.items()}} for name, r in tabla.iterrows()]
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _build_sipa_kpis(version: str) -> dict:
+    df_total, df_sec_orig, df_sec_sa, df_sub_orig, df_sub_sa = cargar_sipa_excel()
+    if df_total.empty:
+        return {}
+
+    try:
+        scale = 1000 if pd.to_numeric(df_total["sa"].dropna()).median() < 1_000_000 else 1
+    except Exception:
+        scale = 1000
+
+    tot_o = df_total.set_index("fecha")[["orig"]].rename(columns={"orig": "Total Empleo Privado"})
+    tot_s = df_total.set_index("fecha")[["sa"]].rename(columns={"sa": "Total Empleo Privado"})
+    total = _rows(_kpi_table(tot_o, tot_s, scale))[0]
+
+    sec_o, sec_s = _wide_pair(df_sec_orig, df_sec_sa)
+    sub_o, sub_s = _wide_pair(df_sub_orig, df_sub_sa)
+    sectores = _rows(_kpi_table(sec_o, sec_s, scale))
+    subsectores = _rows(_kpi_table(sub_o, sub_s, scale))
+
+    # industria: última columna de sectores que la menciona
+    ind = [c for c in sec_o.columns if "industria" in str(c).lower()]
+    ind_name = ind[-1] if ind else None
+    industria = next((r for r in sectores if r["name"] == ind_name), None)
+
+    return {
+        "scale": scale,
+        "ultima_fecha": df_total["fecha"].iloc[-1],
+        "total": total,
+        "total_sa": df_total[["fecha", "sa"]].rename(columns={"sa": "valor"}),
+        "sectores": sectores,
+        "sectores_ok": not (df_sec_orig.empty or df_sec_sa.empty),
+        "industria": industria,
+        "industria_sa": (
+            pd.DataFrame({"fecha": sec_s.index, "valor": sec_s[ind_name].to_numpy()})
+            if ind_name is not None else None
+        ),
+        "subsectores": subsectores,
+        "subsectores_ok": not (df_sub_orig.empty or df_sub_sa.empty),
+    }
+
+
+def get_sipa_kpis() -> dict:
+    """
+    KPIs de empleo SIPA (total, sectores, industria y subsectores), listos
+    para formatear. {} si no hay datos.
+    """
+    return _build_sipa_kpis(sipa_version())
@@ -0,0 +1,268 @@
+# services/transforms.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Transformaciones de series de tiempo (frames anchos)
+# - Entrada: DataFrame indexado por fecha, una columna por serie.
+# - Todas las columnas se transforman en una sola operación.
+# - Rezagos por CALENDARIO (no por posición): si falta un mes, la
+#   variación de ese mes y la del mes que lo usa como base quedan NaN
+#   en lugar de comparar contra un dato equivocado (shift(12) ciego).
+# - freq: "M" mensual, "Q" trimestral, "D" diaria.
+# ============================================================
+_PERIODS_PER_YEAR = {"M": 12, "Q": 4}
+
+
+def to_wide(
+    df: pd.DataFrame,
+    date_col: str = "Date",
+    value_col: str = "Value",
+    series_col: str | None = None,
+    name: str | None = None,
+) -> pd.DataFrame:
+    """
+    Largo (Date, [Serie], Value) -> ancho indexado por Date (ordenado, sin duplicados).
+    Sin series_col: una sola columna llamada `name` (o value_col).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name=date_col))
+
+    t = pd.DataFrame({
+        date_col: pd.to_datetime(df[date_col], errors="coerce"),
+        value_col: pd.to_numeric(df[value_col], errors="coerce"),
+    })
+    if series_col is not None:
+        t[series_col] = df[series_col].to_numpy()
+    t = t.dropna(subset=[date_col, value_col])
+
+    if series_col is None:
+        w = t.drop_duplicates(date_col, keep="last").set_index(date_col)[[value_col]]
+        w.columns = [name or value_col]
+    else:
+        w = t.pivot_table(index=date_col, columns=series_col, values=value_col, aggfunc="last")
+        w.columns.name = None
+    return w.sort_index()
+
+
+def from_wide(wide: pd.DataFrame, col: str, name: str = "Value", date_col: str = "Date") -> pd.DataFrame:
+    """Una columna del frame ancho -> DataFrame Date/Value sin NaN (formato de las páginas)."""
+    if wide is None or col not in wide.columns:
+        return pd.DataFrame(columns=[date_col, name])
+    s = wide[col].dropna()
+    return pd.DataFrame({date_col: s.index, name: s.to_numpy()})
+
+
+def _keys(index: pd.Index, freq: str) -> np.ndarray:
+    """Fechas -> enteros consecutivos por período (mes, trimestre o día)."""
+    d = pd.DatetimeIndex(index)
+    if freq == "M":
+        return (d.year * 12 + d.month - 1).to_numpy(dtype="int64")
+    if freq == "Q":
+        return (d.year * 4 + (d.month - 1) // 3).to_numpy(dtype="int64")
+    if freq == "D":
+        return d.normalize().values.astype("datetime64[D]").astype("int64")
+    raise ValueError(f"freq inválida: {freq!r} (M | Q | D)")
+
+
+def _take_rows(wide: pd.DataFrame, target: np.ndarray, keys: np.ndarray, tolerance: int = 0) -> np.ndarray:
+    """
+    Filas de `wide` en las claves `target` (as-of hacia atrás con tolerancia).
+    keys debe ser creciente y sin duplicados. Sin match => NaN.
+    """
+    vals = wide.to_numpy(dtype="float64")
+    out = np.full((len(target), vals.shape[1]), np.nan)
+    if len(keys) == 0 or len(target) == 0:
+        return out
+
+    pos = np.searchsorted(keys, target, side="right") - 1
+    ok = pos >= 0
+    pos_c = np.clip(pos, 0, len(keys) - 1)
+    ok &= (target - keys[pos_c]) <= tolerance
+    out[ok] = vals[pos_c[ok]]
+    return out
+
+
+def _prepare(wide: pd.DataFrame) -> pd.DataFrame:
+    w = wide
+    if not isinstance(w.index, pd.DatetimeIndex):
+        w = w.set_axis(pd.to_datetime(w.index, errors="coerce"), axis=0)
+    if not w.index.is_monotonic_increasing:
+        w = w.sort_index()
+    if w.index.has_duplicates:
+        w = w[~w.index.duplicated(keep="last")]
+    return w
+
+
+def lag(wide: pd.DataFrame, periods: int = 1, freq: str = "M", tolerance: int = 0) -> pd.DataFrame:
+    """
+    Valor de cada serie `periods` períodos de calendario antes.
+    freq="D": periods en días; tolerance (días) toma el último dato previo
+    (ej. fines de semana / feriados).
+    """
+    w = _prepare(wide)
+    keys = _keys(w.index, freq)
+    prev = _take_rows(w, keys - int(periods), keys, tolerance=tolerance)
+    return pd.DataFrame(prev, index=w.index, columns=w.columns)
+
+
+def _pct(cur: np.ndarray, prev: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (cur / prev - 1.0) * 100.0
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def pct_change(wide: pd.DataFrame, periods: int = 1, freq: str = "M", tolerance: int = 0) -> pd.DataFrame:
+    """Variación % contra `periods` períodos de calendario antes (todas las columnas)."""
+    w = _prepare(wide)
+    prev = lag(w, periods=periods, freq=freq, tolerance=tolerance)
+    return pd.DataFrame(_pct(w.to_numpy(dtype="float64"), prev.to_numpy()), index=w.index, columns=w.columns)
+
+
+def mom(wide: pd.DataFrame, freq: str = "M") -> pd.DataFrame:
+    """Variación % contra el período anterior (mes / trimestre)."""
+    return pct_change(wide, periods=1, freq=freq)
+
+
+def yoy(wide: pd.DataFrame, freq: str = "M", tolerance: int = 0) -> pd.DataFrame:
+    """
+    Variación % interanual.
+    M / Q: mismo período del año anterior.
+    D: misma fecha del año anterior (tolerance en días => último dato previo).
+    """
+    if freq in _PERIODS_PER_YEAR:
+        return pct_change(wide, periods=_PERIODS_PER_YEAR[freq], freq=freq)
+
+    w = _prepare(wide)
+    keys = _keys(w.index, "D")
+    target = _keys(w.index - pd.DateOffset(years=1), "D")
+    prev = _take_rows(w, target, keys, tolerance=tolerance)
+    return pd.DataFrame(_pct(w.to_numpy(dtype="float64"), prev), index=w.index, columns=w.columns)
+
+
+def ytd(wide: pd.DataFrame, freq: str = "M", flow: bool = False) -> pd.DataFrame:
+    """
+    Variación acumulada en el año.
+    flow=False (niveles/índices): valor vs. último período del año anterior.
+    flow=True (flujos, ej. exportaciones): suma ene..mes vs. misma suma del
+    año anterior. Si falta algún mes del acumulado (en cualquiera de los dos
+    años), el resultado es NaN.
+    """
+    w = _prepare(wide)
+    ppy = _PERIODS_PER_YEAR.get(freq)
+    if ppy is None:
+        raise ValueError("ytd requiere freq='M' o 'Q'")
+
+    keys = _keys(w.index, freq)
+    if not flow:
+        base = keys - (keys % ppy) - 1   # último período del año anterior
+        prev = _take_rows(w, base, keys)
+        return pd.DataFrame(_pct(w.to_numpy(dtype="float64"), prev), index=w.index, columns=w.columns)
+
+    # flujos: acumulado por año sobre el calendario completo (huecos => NaN)
+    full = np.arange(keys.min() - keys.min() % ppy, keys.max() + 1, dtype="int64")
+    grid = _take_rows(w, full, keys)
+    year = full // ppy
+    csum = np.array(pd.DataFrame(grid).groupby(year).cumsum(), dtype="float64")
+    gaps = np.array(pd.DataFrame(np.isnan(grid)).groupby(year).cumsum()) > 0
+    csum[gaps] = np.nan
+
+    cur = _take_rows(pd.DataFrame(csum), keys, full)
+    prev = _take_rows(pd.DataFrame(csum), keys - ppy, full)
+    return pd.DataFrame(_pct(cur, prev), index=w.index, columns=w.columns)
+
+
+def rolling_sum(wide: pd.DataFrame, window: int = 12, freq: str = "M") -> pd.DataFrame:
+    """
+    Suma móvil de `window` períodos de calendario (ej. acumulado 12 meses
+    de un flujo). Si falta algún período de la ventana, el resultado es NaN.
+    """
+    w = _prepare(wide)
+    if w.empty:
+        return w.astype("float64")
+
+    keys = _keys(w.index, freq)
+    full = np.arange(keys.min(), keys.max() + 1, dtype="int64")
+    grid = pd.DataFrame(_take_rows(w, full, keys))
+    roll = grid.rolling(int(window), min_periods=int(window)).sum()
+    return pd.DataFrame(_take_rows(roll, keys, full), index=w.index, columns=w.columns)
+
+
+def rebase(wide: pd.DataFrame, base, end=None, base_value: float = 100.0) -> pd.DataFrame:
+    """
+    Rebasea todas las columnas: base = fecha puntual, o promedio entre
+    base y end (ej. rebase(w, "2023-01-01", "2023-12-31")).
+    Columnas sin dato en la base quedan como estaban.
+    """
+    w = _prepare(wide)
+    if end is None:
+        b = w.loc[w.index == pd.Timestamp(base)]
+        b = b.iloc[-1] if not b.empty else pd.Series(np.nan, index=w.columns)
+    else:
+        b = w.loc[pd.Timestamp(base):pd.Timestamp(end)].mean()
+
+    b = b.to_numpy(dtype="float64")
+    ok = np.isfinite(b) & (b != 0)
+    out = w.astype("float64").copy()
+    out.loc[:, ok] = w.loc[:, ok].to_numpy(dtype="float64") / b[ok] * base_value
+    return out
+
+
+def cumulative(wide: pd.DataFrame, start=None) -> pd.DataFrame:
+    """
+    Variación % acumulada desde `start` (o desde el primer dato de cada
+    columna): valor / primer valor válido - 1.
+    """
+    w = _prepare(wide)
+    if start is not None:
+        w = w.loc[pd.Timestamp(start):]
+    vals = w.to_numpy(dtype="float64")
+    if vals.size == 0:
+        return w.astype("float64")
+
+    has = np.isfinite(vals)
+    first_pos = np.where(has.any(axis=0), has.argmax(axis=0), 0)
+    first = vals[first_pos, np.arange(vals.shape[1])]
+    first[~has.any(axis=0)] = np.nan
+    return pd.DataFrame(_pct(vals, first[None, :]), index=w.index, columns=w.columns)
+
+
+def compound(pct_wide: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variaciones % por período -> variación % acumulada compuesta.
+    Un NaN corta la cadena: desde ahí el acumulado queda NaN.
+    """
+    w = _prepare(pct_wide)
+    g = 1.0 + w.to_numpy(dtype="float64") / 100.0
+    return pd.DataFrame((np.cumprod(g, axis=0) - 1.0) * 100.0, index=w.index, columns=w.columns)
+
+
+def last_valid(wide: pd.DataFrame) -> pd.Series:
+    """Último valor no-NaN de cada columna (NaN si no hay)."""
+    w = _prepare(wide)
+    vals = w.to_numpy(dtype="float64")
+    out = np.full(vals.shape[1], np.nan)
+    if vals.shape[0]:
+        has = np.isfinite(vals)
+        last_pos = vals.shape[0] - 1 - has[::-1].argmax(axis=0)
+        ok = has.any(axis=0)
+        out[ok] = vals[last_pos[ok], np.arange(vals.shape[1])[ok]]
+    return pd.Series(out, index=w.columns)
+
+
+def on_long(df: pd.DataFrame, fn, value_col: str = "Value", date_col: str = "Date", **kwargs) -> np.ndarray:
+    """
+    Aplica una transformación de este módulo a un DataFrame Date/Value
+    (una serie) y devuelve el resultado alineado fila a fila con `df`.
+    """
+    w = pd.DataFrame(
+        {value_col: pd.to_numeric(df[value_col], errors="coerce").to_numpy()},
+        index=pd.to_datetime(df[date_col], errors="coerce"),
+    )
+    w = w[w.index.notna()]
+    out = fn(w, **kwargs)[value_col]
+    return out.reindex(pd.to_datetime(df[date_col], errors="coerce")).to_numpy()
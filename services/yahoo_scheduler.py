@@ -0,0 +1,209 @@
+# services/yahoo_scheduler.py
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+from services.market_provider import get_market_provider
+
+
+# ============================================================
+# Scheduler de descargas Yahoo
+# - Agrupa los pedidos que llegan dentro de una ventana corta
+#   (mismos parámetros period/start/interval) en UN yf.download.
+# - Limita la concurrencia de llamadas a Yahoo en todo el proceso.
+# - Reintenta con backoff exponencial + jitter ante 429 / vacío.
+# - La descarga la hace el proveedor del entorno (Yahoo o fixtures).
+# ============================================================
+BATCH_WINDOW_SEC = 0.15
+MAX_CONCURRENCY = 2
+MAX_RETRIES = 4
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_CAP_SEC = 20.0
+FETCH_TIMEOUT_SEC = 120.0
+
+
+def _is_rate_limited(err: Exception) -> bool:
+    txt = f"{type(err).__name__} {err}".lower()
+    return "ratelimit" in txt or "429" in txt or "too many requests" in txt
+
+
+def _normalize_index(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    idx = pd.to_datetime(df.index, errors="coerce")
+    try:
+        idx = idx.tz_localize(None)
+    except Exception:
+        pass
+    df.index = idx.normalize()
+    df.index.name = "Date"
+    df = df[df.index.notna()]
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(how="all")
+
+
+def split_by_ticker(dl: pd.DataFrame, tickers: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    yf.download (1 o N tickers, cualquier group_by) -> {ticker: OHLC DataFrame}.
+    Tickers sin datos no aparecen en el dict.
+    """
+    out: dict[str, pd.DataFrame] = {}
+    if dl is None or getattr(dl, "empty", True):
+        return out
+
+    # 1 ticker, columnas planas
+    if not isinstance(dl.columns, pd.MultiIndex):
+        df = _normalize_index(dl)
+        if not df.empty and len(tickers) == 1:
+            out[tickers[0]] = df
+        return out
+
+    lvl0 = set(map(str, dl.columns.get_level_values(0)))
+    lvl1 = set(map(str, dl.columns.get_level_values(1)))
+    for t in tickers:
+        if t in lvl0:
+            df = dl[t]                          # (ticker, field)
+        elif t in lvl1:
+            df = dl.xs(t, axis=1, level=1)      # (field, ticker)
+        else:
+            continue
+        df = _normalize_index(df)
+        if not df.empty:
+            out[t] = df
+    return out
+
+
+class YahooBatchScheduler:
+    def __init__(
+        self,
+        batch_window: float = BATCH_WINDOW_SEC,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE_SEC,
+        backoff_cap: float = BACKOFF_CAP_SEC,
+    ):
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._sem = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._pending: dict[tuple, list[tuple[tuple[str, ...], Future]]] = {}
+        self.calls = 0  # descargas efectivas a Yahoo (diagnóstico)
+
+    # ---------- API ----------
+    def submit(
+        self,
+        tickers,
+        period: str | None = None,
+        start: str | None = None,
+        interval: str = "1d",
+    ) -> Future:
+        """Encola el pedido; devuelve Future -> {ticker: OHLC DataFrame}."""
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        tickers = tuple(dict.fromkeys(tickers))
+        if period is None and start is None:
+            period = "max"
+        key = (period, start, interval)
+
+        fut: Future = Future()
+        with self._lock:
+            first = key not in self._pending
+            self._pending.setdefault(key, []).append((tickers, fut))
+        if first:
+            timer = threading.Timer(self.batch_window, self._flush, args=(key,))
+            timer.daemon = True
+            timer.start()
+        return fut
+
+    def fetch(self, tickers, period=None, start=None, interval="1d", timeout=FETCH_TIMEOUT_SEC):
+        return self.submit(tickers, period=period, start=start, interval=interval).result(timeout=timeout)
+
+    # ---------- interno ----------
+    def _flush(self, key: tuple) -> None:
+        with self._lock:
+            reqs = self._pending.pop(key, [])
+        if not reqs:
+            return
+
+        union = list(dict.fromkeys(t for tks, _ in reqs for t in tks))
+        try:
+            data = self._download(union, *key)
+        except Exception as e:
+            for _, fut in reqs:
+                fut.set_exception(e)
+            return
+
+        for tks, fut in reqs:
+            fut.set_result({t: data[t] for t in tks if t in data})
+
+    def _sleep_backoff(self, attempt: int) -> None:
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        time.sleep(delay * (0.5 + random.random()))  # jitter ±50%
+
+    def _download(self, tickers: list[str], period, start, interval) -> dict[str, pd.DataFrame]:
+        provider = get_market_provider()
+
+        got: dict[str, pd.DataFrame] = {}
+        remaining = list(tickers)
+        last_err: Exception | None = None
+
+        for attempt in range(self.max_retries):
+            if attempt:
+                self._sleep_backoff(attempt - 1)
+            try:
+                with self._sem:
+                    self.calls += 1
+                    dl = provider.download(remaining, period=period, start=start, interval=interval)
+            except Exception as e:
+                last_err = e
+                if _is_rate_limited(e):
+                    continue
+                break
+
+            new = split_by_ticker(dl, remaining)
+            got.update(new)
+            remaining = [t for t in remaining if t not in got]
+            # vacío total => probable throttling: reintentar.
+            # parcial => los faltantes no existen en Yahoo: no insistir.
+            if not remaining or new:
+                break
+
+        if not got and last_err is not None:
+            raise RuntimeError(f"Yahoo download falló ({', '.join(tickers)}): {last_err}")
+        return got
+
+
+_SCHEDULER: YahooBatchScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_yahoo_scheduler() -> YahooBatchScheduler:
+    """Scheduler único por proceso (compartido entre sesiones y threads)."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = YahooBatchScheduler()
+        return _SCHEDULER
+
+
+def yahoo_fetch(tickers, period=None, start=None, interval="1d") -> dict[str, pd.DataFrame]:
+    """Atajo: pedido batcheado y bloqueante. {ticker: OHLC DataFrame}."""
+    return get_yahoo_scheduler().fetch(tickers, period=period, start=start, interval=interval)
+
+
+def pick_close(df: pd.DataFrame | None, prefer_adj: bool = False) -> pd.Series:
+    """Close (o Adj Close) como Series float sin NaN."""
+    if df is None or df.empty:
+        return pd.Series(dtype="float64")
+    cols = ["Adj Close", "Close"] if prefer_adj else ["Close", "Adj Close"]
+    for c in cols:
+        if c in df.columns:
+            return pd.to_numeric(df[c], errors="coerce").dropna()
+    return pd.Series(dtype="float64")
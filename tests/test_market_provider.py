@@ -0,0 +1,53 @@
+"""
+Tests de services/market_provider.py: el FixtureProvider resuelve period
+contra la fecha grabada (o MARKET_DATA_REPLAY_DATE), no contra hoy.
+
+Uso:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import market_provider as mp
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path):
+    """^MERV grabado en el primer semestre de 2026 (ya viejo para period="10d")."""
+    idx = pd.bdate_range("2026-01-02", "2026-06-30", name="Date")
+    px = np.linspace(100.0, 200.0, len(idx))
+    df = pd.DataFrame({c: px for c in mp.OHLC_COLS}, index=idx)
+    df.to_csv(tmp_path / mp._fixture_name("^MERV"), index_label="Date")
+    return tmp_path
+
+
+def test_old_fixture_short_period_not_empty(fixtures_dir):
+    out = mp.FixtureProvider(fixtures_dir).download(["^MERV"], period="10d")
+    assert not out.empty
+    assert out.index.max() == pd.Timestamp("2026-06-30")
+    assert out.index.min() >= pd.Timestamp("2026-06-20")
+
+
+def test_replay_date_cuts_and_anchors(fixtures_dir):
+    out = mp.FixtureProvider(fixtures_dir, replay_date="2026-03-31").download(["^MERV"], period="1mo")
+    assert out.index.max() == pd.Timestamp("2026-03-31")
+    assert out.index.min() >= pd.Timestamp("2026-02-28")
+
+
+def test_start_overrides_period(fixtures_dir):
+    out = mp.FixtureProvider(fixtures_dir).download(["^MERV"], period="10d", start="2026-06-01")
+    assert out.index.min() == pd.Timestamp("2026-06-01")
+
+
+def test_replay_date_from_env(fixtures_dir, monkeypatch):
+    monkeypatch.setenv("MARKET_DATA_PROVIDER", "fixture")
+    monkeypatch.setenv("MARKET_DATA_FIXTURES_DIR", str(fixtures_dir))
+    monkeypatch.setenv("MARKET_DATA_REPLAY_DATE", "2026-02-15")
+    out = mp.provider_from_env().download(["^MERV"], period="ytd")
+    assert out.index.min() == pd.Timestamp("2026-01-02")
+    assert out.index.max() <= pd.Timestamp("2026-02-15")
+
+
+def test_missing_ticker_is_empty(fixtures_dir):
+    assert mp.FixtureProvider(fixtures_dir).download(["NOPE"], period="10d").empty
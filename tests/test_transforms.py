@@ -0,0 +1,136 @@
+"""
+Tests de services/transforms.py: rezagos por calendario (huecos => NaN),
+acumulados, rebase y sumas móviles.
+
+Uso:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import transforms as tf
+
+
+def _monthly(start: str, end: str, values=None, drop=()) -> pd.DataFrame:
+    idx = pd.date_range(start, end, freq="MS")
+    vals = np.arange(1, len(idx) + 1, dtype="float64") * 10 if values is None else np.asarray(values, dtype="float64")
+    w = pd.DataFrame({"x": vals}, index=idx)
+    return w.drop(index=pd.to_datetime(list(drop)))
+
+
+def _at(w: pd.DataFrame, date: str, col: str = "x") -> float:
+    return float(w.loc[pd.Timestamp(date), col])
+
+
+# ------------------------------------------------------------
+# Huecos de calendario: NaN, no resultado corrido
+# ------------------------------------------------------------
+def test_mom_gap_is_nan():
+    w = _monthly("2023-01-01", "2023-12-01", drop=["2023-06-01"])
+    out = tf.mom(w)
+
+    # 2023-07 usaría 2023-05 con shift(1) ciego
+    assert np.isnan(_at(out, "2023-07-01"))
+    assert _at(out, "2023-05-01") == pytest.approx((_at(w, "2023-05-01") / _at(w, "2023-04-01") - 1) * 100)
+    assert _at(out, "2023-08-01") == pytest.approx((_at(w, "2023-08-01") / _at(w, "2023-07-01") - 1) * 100)
+
+
+def test_yoy_gap_is_nan():
+    w = _monthly("2022-01-01", "2024-12-01", drop=["2023-06-01"])
+    out = tf.yoy(w)
+
+    assert np.isnan(_at(out, "2024-06-01"))   # base (2023-06) faltante
+    assert np.isnan(_at(out, "2022-12-01"))   # sin año anterior
+    assert _at(out, "2024-07-01") == pytest.approx((_at(w, "2024-07-01") / _at(w, "2023-07-01") - 1) * 100)
+    assert _at(out, "2023-07-01") == pytest.approx((_at(w, "2023-07-01") / _at(w, "2022-07-01") - 1) * 100)
+
+
+# ------------------------------------------------------------
+# ytd
+# ------------------------------------------------------------
+def test_ytd_flow_missing_month():
+    w = _monthly("2022-01-01", "2023-12-01", values=np.ones(24) * 10, drop=["2023-03-01"])
+    w.loc[pd.Timestamp("2023-01-01"), "x"] = 20.0
+    out = tf.ytd(w, flow=True)
+
+    # ene-feb 2023 = 30 vs ene-feb 2022 = 20
+    assert _at(out, "2023-02-01") == pytest.approx(50.0)
+    # desde el mes faltante, el acumulado del año queda incompleto
+    assert out.loc["2023-04-01":"2023-12-01", "x"].isna().all()
+
+
+def test_ytd_flow_missing_month_previous_year():
+    w = _monthly("2022-01-01", "2023-12-01", values=np.ones(24) * 10, drop=["2022-05-01"])
+    out = tf.ytd(w, flow=True)
+
+    assert _at(out, "2023-04-01") == pytest.approx(0.0)
+    assert out.loc["2023-05-01":"2023-12-01", "x"].isna().all()
+
+
+def test_ytd_level_uses_december():
+    w = _monthly("2022-01-01", "2023-06-01")
+    out = tf.ytd(w)
+    assert _at(out, "2023-03-01") == pytest.approx((_at(w, "2023-03-01") / _at(w, "2022-12-01") - 1) * 100)
+
+
+# ------------------------------------------------------------
+# rebase
+# ------------------------------------------------------------
+def test_rebase_without_data_at_base():
+    w = _monthly("2023-01-01", "2023-12-01")
+    w["y"] = w["x"] * 2
+    w.loc[pd.Timestamp("2023-06-01"), "y"] = np.nan
+    out = tf.rebase(w, "2023-06-01")
+
+    assert _at(out, "2023-06-01", "x") == pytest.approx(100.0)
+    # "y" sin dato en la base: queda como estaba
+    pd.testing.assert_series_equal(out["y"], w["y"].astype("float64"))
+
+
+def test_rebase_date_not_in_index():
+    w = _monthly("2023-01-01", "2023-12-01")
+    out = tf.rebase(w, "2023-06-15")
+    pd.testing.assert_frame_equal(out, w.astype("float64"))
+
+
+# ------------------------------------------------------------
+# yoy diario con tolerancia
+# ------------------------------------------------------------
+def test_daily_yoy_tolerance():
+    idx = pd.bdate_range("2023-01-02", "2024-12-31")
+    w = pd.DataFrame({"x": np.linspace(100, 200, len(idx))}, index=idx)
+
+    # 2024-03-04 (lunes) -> 2023-03-04 fue sábado: sin dato exacto
+    day = pd.Timestamp("2024-03-04")
+    exact = tf.yoy(w, freq="D")
+    tol = tf.yoy(w, freq="D", tolerance=3)
+
+    assert np.isnan(exact.loc[day, "x"])
+    prev = w.loc[pd.Timestamp("2023-03-03"), "x"]   # viernes previo
+    assert tol.loc[day, "x"] == pytest.approx((w.loc[day, "x"] / prev - 1) * 100)
+
+    # alcanza con 1 día: el viernes queda a 1 día del sábado
+    assert not np.isnan(tf.yoy(w, freq="D", tolerance=1).loc[day, "x"])
+
+
+# ------------------------------------------------------------
+# rolling_sum
+# ------------------------------------------------------------
+def test_rolling_sum_windows():
+    w = _monthly("2023-01-01", "2023-08-01", values=[1, 2, 3, 4, 5, 6, 7, 8])
+    out = tf.rolling_sum(w, window=3)
+
+    assert out.loc["2023-01-01":"2023-02-01", "x"].isna().all()
+    assert out["x"].loc["2023-03-01":].tolist() == [6.0, 9.0, 12.0, 15.0, 18.0, 21.0]
+
+
+def test_rolling_sum_gap_is_nan():
+    w = _monthly("2023-01-01", "2023-08-01", values=[1, 2, 3, 4, 5, 6, 7, 8], drop=["2023-04-01"])
+    out = tf.rolling_sum(w, window=3)
+
+    # ventanas que incluyen abril (faltante): may, jun
+    assert np.isnan(_at(out, "2023-05-01")) and np.isnan(_at(out, "2023-06-01"))
+    assert _at(out, "2023-03-01") == pytest.approx(6.0)
+    assert _at(out, "2023-07-01") == pytest.approx(18.0)
+    assert pd.Timestamp("2023-04-01") not in out.index
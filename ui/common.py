@@ -1,7 +1,12 @@
 import pandas as pd
+import plotly.colors as pc
+import plotly.graph_objects as go
 import streamlit as st
 
 
+SERIES_COLORS = pc.qualitative.Plotly
+
+
 def topbar_logo() -> None:
     """Logo institucional arriba a la derecha."""
     _, col_logo = st.columns([10, 2], vertical_alignment="top")
@@ -40,3 +45,34 @@ def go_to(section: str):
     st.query_params["section"] = section  # mantiene URL consistente
     st.rerun()
 
+
+
+def add_pyramid_trace(
+    fig: go.Figure, v: pd.DataFrame, name: str, level: str, color: str, hovertemplate: str | None, dash: str | None = None, **kw
+) -> None:
+    """Línea de un nivel de services/pyramid (Date, value, lo, hi) + envolvente mín / máx si es agregado."""
+    if level != "D":
+        r, g, b = pc.hex_to_rgb(color)
+        band = dict(mode="lines", line=dict(width=0, color=color), legendgroup=name, showlegend=False, hoverinfo="skip")
+        fig.add_trace(go.Scatter(x=v["Date"], y=v["hi"], **band))
+        fig.add_trace(go.Scatter(x=v["Date"], y=v["lo"], fill="tonexty", fillcolor=f"rgba({r},{g},{b},0.15)", **band))
+    fig.add_trace(
+        go.Scatter(
+            x=v["Date"], y=v["value"], mode="lines", name=name, legendgroup=name,
+            line=dict(color=color, dash=dash), hovertemplate=hovertemplate, **kw,
+        )
+    )
+
+
+def pyramid_note(level: str) -> None:
+    """Aclaración de resolución cuando el gráfico muestra un nivel agregado."""
+    if level == "D":
+        return
+    label = {"W": "semanal", "M": "mensual"}.get(level, level)
+    st.markdown(
+        "<div style='color:rgba(20,50,79,0.70); font-size:12px;'>"
+        f"Resolución {label} por la amplitud del rango: cierre del período y banda mín–máx. "
+        "Acortá el rango para ver el dato diario."
+        "</div>",
+        unsafe_allow_html=True,
+    )